@@ -10,6 +10,7 @@ from models import (
     UserRole, OrgType, AwardLevel, ApplicationStatus
 )
 from crud.user import get_password_hash
+from crud.statistics import date_backfill_statement, rebuild_statements
 
 
 def add_extended_data():
@@ -252,6 +253,11 @@ def add_extended_data():
         
         for app in new_applications:
             db.add(app)
+        db.flush()
+        # 直接插入的申报不经过CRUD，补齐日期字段并重建统计汇总
+        db.execute(date_backfill_statement())
+        for statement in rebuild_statements():
+            db.execute(statement)
         db.commit()
         print(f"✓ 添加了 {len(new_applications)} 个申报")
         
@@ -358,7 +364,7 @@ def add_extended_data():
         print("\u8bc4委账号: committee02 / comm123")
         print("=" * 60)
         print_statistics(db)
-        
+    
     except Exception as e:
         print(f"\n✗ 扩展数据添加失败: {e}")
         db.rollback()
@@ -0,0 +1,140 @@
+"""
+基准测试 - 申报Excel导入内存占用
+Benchmark: peak RSS and time of the application import on large workbooks
+
+生成按申报模板填写的合成工作簿（默认5万行），对比以下方式的峰值内存(RSS)与耗时：
+- full-load: 普通模式加载整个工作簿并读出全部行（不做校验，作为对照）
+- dry-run:   导入接口的处理流程，只读流式模式分批读取 + 校验 + 单位批量查询，不写入
+- import:    同上并批量写入当前配置的数据库（项目名称带 [bench] 前缀）
+
+每种方式在独立子进程中执行，峰值RSS互不影响。
+--cleanup 删除 import 写入的申报并重建申报统计。请勿对生产库使用。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_application_import --rows 50000
+    python -m benchmarks.bench_application_import --modes dry-run import
+    python -m benchmarks.bench_application_import --cleanup
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from openpyxl import Workbook, load_workbook
+from sqlalchemy import delete, select
+from database import SessionLocal, engine
+from models import Application, AwardCycle, Organization, User, UserRole
+from crud.statistics import rebuild_statements
+from utils.excel_utils import APPLICATION_TEMPLATE_HEADERS
+from benchmarks.bench_export import BENCH_TITLE_PREFIX, peak_rss_mb
+
+
+def create_workbook(path: str, rows: int, unit_names) -> None:
+    """write-only 模式生成合成工作簿，每100行含一行不合格数据"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("申报信息")
+    ws.append(APPLICATION_TEMPLATE_HEADERS)
+    for i in range(rows):
+        title = "x" if i % 100 == 99 else f"{BENCH_TITLE_PREFIX}导入申报项目 {i}"
+        ws.append([
+            unit_names[i % len(unit_names)], title, f"负责人{i % 997}", "研究员",
+            "张三,李四", "基准测试合成数据", "创新点", "经济效益", "社会效益",
+            "成果A,成果B", "专利1", f"联系人{i % 97}", "13800000000", "bench@example.com"
+        ])
+    wb.save(path)
+
+
+def load_full(path: str) -> int:
+    """对照：普通模式加载后读出全部行，返回行数"""
+    wb = load_workbook(path)
+    rows = [[cell.value for cell in row] for row in wb.active.iter_rows(min_row=2)]
+    return len(rows)
+
+
+async def run_import(path: str, dry_run: bool) -> int:
+    """调用导入流程，返回导入行数"""
+    from database import AsyncSessionLocal, async_engine
+    from utils.application_import import import_applications
+    
+    async with AsyncSessionLocal() as db:
+        cycle_id = await db.scalar(select(AwardCycle.id).limit(1))
+        user_id = await db.scalar(select(User.id).filter(User.role == UserRole.ADMIN).limit(1))
+        result = await import_applications(db, path, cycle_id, user_id, dry_run=dry_run)
+    await async_engine.dispose()
+    return result["imported"]
+
+
+def run_mode(mode: str, path: str, queue) -> None:
+    """子进程入口：执行一次导入并回报结果"""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "full-load":
+        rows = load_full(path)
+    else:
+        rows = asyncio.run(run_import(path, dry_run=mode == "dry-run"))
+    queue.put({
+        "mode": mode,
+        "elapsed_s": time.perf_counter() - start,
+        "rows": rows,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb()
+    })
+
+
+def cleanup() -> None:
+    """删除导入的合成申报并重建统计"""
+    with engine.begin() as conn:
+        result = conn.execute(delete(Application).where(Application.title.startswith(BENCH_TITLE_PREFIX)))
+        for statement in rebuild_statements():
+            conn.execute(statement)
+    print(f"deleted {result.rowcount} applications")
+
+
+def main(rows: int, modes) -> None:
+    with SessionLocal() as db:
+        unit_names = list(db.scalars(select(Organization.name)))
+        if db.scalar(select(AwardCycle.id).limit(1)) is None or not unit_names:
+            raise SystemExit("请先初始化数据库: python setup_database.py")
+    
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        create_workbook(path, rows, unit_names)
+        print(f"rows={rows} file_mb={os.path.getsize(path) / (1024 * 1024):.1f} "
+              f"generated_s={time.perf_counter() - start:.1f}")
+        
+        ctx = multiprocessing.get_context("spawn")
+        results = []
+        for mode in modes:
+            queue = ctx.Queue()
+            process = ctx.Process(target=run_mode, args=(mode, path, queue))
+            process.start()
+            results.append(queue.get())
+            process.join()
+    finally:
+        os.remove(path)
+    
+    print(f"{'mode':<12}{'elapsed_s':>12}{'rows':>10}{'baseline_mb':>14}{'peak_rss_mb':>14}")
+    for r in results:
+        print(
+            f"{r['mode']:<12}{r['elapsed_s']:>12.2f}{r['rows']:>10}"
+            f"{r['baseline_rss_mb']:>14.1f}{r['peak_rss_mb']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="申报导入内存基准测试")
+    parser.add_argument("--rows", type=int, default=50000, help="合成工作簿的数据行数")
+    parser.add_argument("--cleanup", action="store_true", help="删除导入的合成申报后退出")
+    parser.add_argument(
+        "--modes", nargs="+", choices=["full-load", "dry-run", "import"],
+        default=["full-load", "dry-run", "import"], help="要对比的方式"
+    )
+    args = parser.parse_args()
+    
+    if args.cleanup:
+        cleanup()
+    else:
+        main(args.rows, args.modes)
@@ -0,0 +1,108 @@
+"""
+基准测试 - 批量专家分配
+Benchmark: bulk expert assignment planner and bulk insert
+
+使用固定随机种子生成合成申报与专家，测量：
+- 分配计算耗时（utils.assignment.plan_assignments）
+- 评审记录批量插入耗时（内存SQLite，与 bulk_assign_experts 相同的 insert(Review) 写法）
+并校验分配结果：无本单位专家、类别匹配、工作量均衡。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_assignment --applications 10000 --experts 1000 --per-app 5
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+from sqlalchemy import create_engine, insert
+from database import Base
+from models import Review
+from utils.assignment import ApplicationSlot, ExpertSlot, plan_assignments
+
+CATEGORIES = ["技术发明", "科技进步", "基础研究", "标准制定", "工艺改进", "装备研制", "节能环保", "新材料"]
+
+
+def generate(app_count: int, expert_count: int, org_count: int, per_app: int, seed: int):
+    """生成合成数据"""
+    rng = random.Random(seed)
+    applications = [
+        ApplicationSlot(
+            id=i,
+            organization_id=rng.randint(1, org_count),
+            category=rng.choice(CATEGORIES),
+            needed=per_app
+        )
+        for i in range(1, app_count + 1)
+    ]
+    experts = []
+    for i in range(1, expert_count + 1):
+        # 约三成专家不限类别，其余擅长1~3个类别
+        categories = set() if rng.random() < 0.3 else set(rng.sample(CATEGORIES, rng.randint(1, 3)))
+        experts.append(ExpertSlot(id=i, organization_id=rng.randint(1, org_count), categories=categories))
+    return applications, experts
+
+
+def validate(applications, experts, plan) -> int:
+    """校验约束，返回违规数"""
+    apps = {app.id: app for app in applications}
+    experts_by_id = {expert.id: expert for expert in experts}
+    violations = 0
+    seen = set()
+    for app_id, expert_id in plan.pairs:
+        app, expert = apps[app_id], experts_by_id[expert_id]
+        if (app_id, expert_id) in seen:
+            violations += 1
+        seen.add((app_id, expert_id))
+        if expert.organization_id == app.organization_id:
+            violations += 1
+        if expert.categories and app.category not in expert.categories:
+            violations += 1
+    return violations
+
+
+def bulk_insert(pairs) -> float:
+    """将分配结果批量插入内存SQLite，返回耗时"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Review.__table__])
+    now = datetime.now()
+    rows = [
+        {"application_id": app_id, "expert_id": expert_id, "status": "pending", "created_at": now}
+        for app_id, expert_id in pairs
+    ]
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Review), rows)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return elapsed
+
+
+def main(app_count, expert_count, org_count, per_app, seed):
+    applications, experts = generate(app_count, expert_count, org_count, per_app, seed)
+
+    start = time.perf_counter()
+    plan = plan_assignments(applications, experts)
+    plan_elapsed = time.perf_counter() - start
+
+    insert_elapsed = bulk_insert(plan.pairs)
+    loads = list(plan.loads.values())
+
+    print(f"applications={app_count} experts={expert_count} organizations={org_count} per_app={per_app} seed={seed}")
+    print(f"assigned:        {len(plan.pairs)}")
+    print(f"shortfall apps:  {len(plan.shortfall)}")
+    print(f"violations:      {validate(applications, experts, plan)}")
+    print(f"load min/max:    {min(loads)}/{max(loads)}  (mean {statistics.mean(loads):.1f}, stdev {statistics.pstdev(loads):.2f})")
+    print(f"plan time:       {plan_elapsed:.3f}s")
+    print(f"bulk insert:     {insert_elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量专家分配基准测试")
+    parser.add_argument("--applications", type=int, default=10000, help="申报数")
+    parser.add_argument("--experts", type=int, default=1000, help="专家数")
+    parser.add_argument("--organizations", type=int, default=300, help="组织数")
+    parser.add_argument("--per-app", type=int, default=5, help="每个申报的专家数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+    main(args.applications, args.experts, args.organizations, args.per_app, args.seed)
@@ -0,0 +1,90 @@
+"""
+基准测试 - 同步会话 vs 异步会话
+Benchmark: blocking Session vs AsyncSession under concurrent load
+
+在同一事件循环内并发请求两个端点：
+- /blocking: async def 处理函数中调用同步 Session（改造前的写法）
+- /async:    async def 处理函数中 await AsyncSession（改造后的写法）
+
+每个请求先执行 SLEEP(delay) 模拟慢查询，再读取最近的申报列表。
+MySQL 直接使用内置 SLEEP()；SQLite 在连接上注册同名函数。
+
+注意：并发数不要超过连接池容量(pool_size + max_overflow，默认15)。
+同步会话的连接在依赖清理阶段才归还，超过容量时 /blocking 会在事件循环中
+阻塞等待连接直至 pool_timeout，这本身就是改造前写法的问题之一。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_async_db --concurrency 10 --requests 500 --delay 0.02
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import engine, async_engine, get_db, get_async_db
+from models import Application
+from benchmarks.common import run_concurrent, summarize, print_table
+
+
+def register_sqlite_sleep() -> None:
+    """为SQLite连接注册 SLEEP() 函数，用于模拟慢查询"""
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("SLEEP", 1, lambda seconds: time.sleep(seconds) or 0)
+    
+    for sync_engine in (engine, async_engine.sync_engine):
+        if sync_engine.dialect.name == "sqlite":
+            event.listen(sync_engine, "connect", on_connect)
+
+
+def build_app(delay: float) -> FastAPI:
+    """构建基准测试应用"""
+    app = FastAPI()
+    slow_query = text("SELECT SLEEP(:delay)")
+    list_query = select(Application.id).order_by(Application.created_at.desc()).limit(20)
+    
+    @app.get("/blocking")
+    async def blocking(db: Session = Depends(get_db)):
+        if delay:
+            db.execute(slow_query, {"delay": delay})
+        return {"ids": list(db.scalars(list_query))}
+    
+    @app.get("/async")
+    async def non_blocking(db: AsyncSession = Depends(get_async_db)):
+        if delay:
+            await db.execute(slow_query, {"delay": delay})
+        return {"ids": list(await db.scalars(list_query))}
+    
+    return app
+
+
+async def main(concurrency: int, total: int, delay: float) -> None:
+    register_sqlite_sleep()
+    app = build_app(delay)
+    transport = httpx.ASGITransport(app=app)
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path, name in (("/blocking", "before: sync Session"), ("/async", "after: AsyncSession")):
+            async def request():
+                response = await client.get(path)
+                response.raise_for_status()
+            
+            # 预热连接池
+            await run_concurrent(request, concurrency, concurrency)
+            latencies, elapsed = await run_concurrent(request, concurrency, total)
+            rows.append(summarize(name, latencies, elapsed))
+    
+    print(f"dialect={engine.dialect.name} concurrency={concurrency} requests={total} delay={delay}s")
+    print_table(rows)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="同步/异步数据库会话并发基准测试")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=500, help="每个场景的请求总数")
+    parser.add_argument("--delay", type=float, default=0.02, help="每次查询模拟的数据库耗时(秒)")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.delay))
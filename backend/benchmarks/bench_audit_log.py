@@ -0,0 +1,107 @@
+"""
+基准测试 - 操作日志开销
+Benchmark: request overhead of AuditLogMiddleware (off / inline commit / buffered batch)
+
+用一个不访问数据库的最小增改接口测量中间件本身的开销，对比：
+- off:      不记录操作日志
+- inline:   每个请求单独插入并提交一条日志（未启动后台写入任务时的行为）
+- buffered: 日志放入缓冲，后台任务批量写入（改造后）
+- buffered, small queue: 缓冲很小时的背压表现（等待 AUDIT_LOG_FULL_WAIT 后丢弃）
+日志写入临时SQLite文件。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_audit_log --concurrency 20 --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import utils.audit_log
+from config import settings
+from models import Log
+from utils.audit_log import AuditLogMiddleware
+from utils.batch_writer import BatchWriter
+from benchmarks.common import run_concurrent, summarize, print_table
+
+
+def create_bench_app() -> FastAPI:
+    """只有一个增改接口的最小应用"""
+    bench_app = FastAPI()
+    bench_app.add_middleware(AuditLogMiddleware)
+    
+    @bench_app.put("/api/items/{item_id}")
+    async def update_item(item_id: int):
+        return {"id": item_id}
+    
+    return bench_app
+
+
+async def run_scenario(client, name, writer, enabled, buffered, concurrency, total, item_count):
+    """执行一个场景 Returns: (结果行, 写入统计)"""
+    settings.AUDIT_LOG_ENABLED = enabled
+    utils.audit_log.audit_writer = writer
+    counter = 0
+    
+    async def update():
+        nonlocal counter
+        counter += 1
+        response = await client.put(f"/api/items/{counter % item_count}?source=bench")
+        response.raise_for_status()
+    
+    if buffered:
+        writer.start()
+    latencies, elapsed = await run_concurrent(update, concurrency, total)
+    await writer.stop()
+    return summarize(name, latencies, elapsed), writer.stats()
+
+
+async def main(concurrency, total, batch_size, flush_interval):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_audit_"), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Log.__table__.create(sync_conn))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    
+    def writer(max_queue):
+        return BatchWriter("bench-audit", session_factory, lambda: insert(Log), batch_size, flush_interval, max_queue)
+    
+    original = (settings.AUDIT_LOG_ENABLED, utils.audit_log.audit_writer)
+    scenarios = [
+        ("off", writer(0), False, False),
+        ("inline", writer(0), True, False),
+        ("buffered", writer(settings.AUDIT_LOG_QUEUE_SIZE), True, True),
+        ("buffered, small queue", writer(64), True, True),
+    ]
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_bench_app()), base_url="http://bench") as client:
+        for name, scenario_writer, enabled, buffered in scenarios:
+            row, stats = await run_scenario(
+                client, name, scenario_writer, enabled, buffered, concurrency, total, 1000
+            )
+            rows.append(row)
+            print(f"{name}: written={stats['written']} dropped={stats['full']} batches={stats['batches']}")
+    settings.AUDIT_LOG_ENABLED, utils.audit_log.audit_writer = original
+    
+    async with session_factory() as db:
+        print(f"logs written: {await db.scalar(select(func.count()).select_from(Log))}")
+    print(f"concurrency={concurrency} requests={total} batch_size={batch_size} flush_interval={flush_interval}s")
+    print_table(rows)
+    baseline = rows[0]["p50_ms"]
+    for row in rows[1:]:
+        print(f"{row['name']:<30} p50 overhead {(row['p50_ms'] - baseline) * 1000:8.0f} µs")
+    await engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="操作日志开销基准测试")
+    parser.add_argument("--concurrency", type=int, default=20, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=5000, help="每个场景的请求总数")
+    parser.add_argument("--batch-size", type=int, default=settings.AUDIT_LOG_BATCH_SIZE, help="每批写入条数")
+    parser.add_argument("--flush-interval", type=float, default=settings.AUDIT_LOG_FLUSH_INTERVAL, help="写入间隔（秒）")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.batch_size, args.flush_interval))
@@ -0,0 +1,178 @@
+"""
+基准测试 - 申报列表Excel导出内存占用
+Benchmark: peak RSS of the application export, in-memory vs streaming
+
+对比两种导出方式的峰值内存(RSS)与耗时：
+- in-memory: 加载全部 Application 实体 → 字典列表 → 普通工作簿写入 BytesIO（改造前）
+- streaming: 服务端游标分批读取所需列 → write-only 工作簿 → 临时文件分块返回（改造后）
+
+每种方式在独立子进程中执行，峰值RSS互不影响。
+--seed 会向当前配置的数据库批量插入合成申报（标题带 [bench] 前缀），
+--cleanup 删除这些数据。请勿对生产库使用。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_export --seed 200000
+    python -m benchmarks.bench_export
+    python -m benchmarks.bench_export --cleanup
+"""
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import sys
+import time
+from io import BytesIO
+from openpyxl import Workbook
+from sqlalchemy import delete, func, insert, select
+from database import SessionLocal, engine
+from models import Application, AwardCycle, Organization, ApplicationStatus
+
+BENCH_TITLE_PREFIX = "[bench] "
+
+
+def peak_rss_mb() -> float:
+    """当前进程峰值RSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def seed(count: int, batch_size: int = 5000) -> None:
+    """批量插入合成申报数据"""
+    with SessionLocal() as db:
+        cycle_id = db.scalar(select(AwardCycle.id).limit(1))
+        org_ids = list(db.scalars(select(Organization.id)))
+        if cycle_id is None or not org_ids:
+            raise SystemExit("请先初始化数据库: python setup_database.py")
+    
+    statuses = list(ApplicationStatus)
+    with engine.begin() as conn:
+        for offset in range(0, count, batch_size):
+            rows = [
+                {
+                    "award_cycle_id": cycle_id,
+                    "applicant_unit_id": org_ids[i % len(org_ids)],
+                    "title": f"{BENCH_TITLE_PREFIX}合成申报项目 {i}",
+                    "leader_name": f"负责人{i % 997}",
+                    "summary": "基准测试合成数据",
+                    "submission_status": statuses[i % len(statuses)],
+                    "current_stage": "formal_review",
+                    "score_summary_json": {"average_score": 60 + i % 40, "review_count": 5}
+                }
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            conn.execute(insert(Application), rows)
+    print(f"seeded {count} applications")
+
+
+def cleanup() -> None:
+    """删除合成申报数据"""
+    with engine.begin() as conn:
+        result = conn.execute(delete(Application).where(Application.title.startswith(BENCH_TITLE_PREFIX)))
+    print(f"deleted {result.rowcount} applications")
+
+
+def export_in_memory() -> int:
+    """改造前的导出方式，返回文件字节数"""
+    with SessionLocal() as db:
+        app_data = []
+        for app in db.scalars(select(Application)):
+            app_data.append({
+                "title": app.title,
+                "unit_name": app.applicant_unit.name if app.applicant_unit else "",
+                "leader_name": app.leader_name,
+                "status": str(app.submission_status),
+                "submission_time": app.submission_time,
+                "current_stage": app.current_stage,
+                "score_summary_json": app.score_summary_json,
+                "final_result": app.final_result
+            })
+    
+    wb = Workbook()
+    ws = wb.active
+    for idx, app in enumerate(app_data, 1):
+        score_summary = app.get("score_summary_json") or {}
+        ws.append([
+            idx, app["title"], app["unit_name"], app["leader_name"], app["status"],
+            str(app["submission_time"]), app["current_stage"],
+            score_summary.get("average_score", ""), app["final_result"]
+        ])
+    output = BytesIO()
+    wb.save(output)
+    return output.getbuffer().nbytes
+
+
+async def export_streaming() -> int:
+    """调用导出接口处理函数并按块读取响应文件，返回文件字节数"""
+    import os
+    from database import AsyncSessionLocal, async_engine
+    from routers.statistics import export_applications
+    
+    async with AsyncSessionLocal() as db:
+        response = await export_applications(db=db, current_user=None)
+    size = 0
+    try:
+        with open(response.path, "rb") as f:
+            while chunk := f.read(response.chunk_size):
+                size += len(chunk)
+    finally:
+        os.remove(response.path)
+    await async_engine.dispose()
+    return size
+
+
+def run_mode(mode: str, queue) -> None:
+    """子进程入口：执行一次导出并回报结果"""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "streaming":
+        size = asyncio.run(export_streaming())
+    else:
+        size = export_in_memory()
+    queue.put({
+        "mode": mode,
+        "elapsed_s": time.perf_counter() - start,
+        "file_mb": size / (1024 * 1024),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb()
+    })
+
+
+def main(modes) -> None:
+    with SessionLocal() as db:
+        total = db.scalar(select(func.count(Application.id)))
+    print(f"applications={total}")
+    
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for mode in modes:
+        queue = ctx.Queue()
+        process = ctx.Process(target=run_mode, args=(mode, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    
+    print(f"{'mode':<12}{'elapsed_s':>12}{'file_mb':>10}{'baseline_mb':>14}{'peak_rss_mb':>14}")
+    for r in results:
+        print(
+            f"{r['mode']:<12}{r['elapsed_s']:>12.2f}{r['file_mb']:>10.1f}"
+            f"{r['baseline_rss_mb']:>14.1f}{r['peak_rss_mb']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="申报导出内存基准测试")
+    parser.add_argument("--seed", type=int, default=0, help="插入指定数量的合成申报后退出")
+    parser.add_argument("--cleanup", action="store_true", help="删除合成申报后退出")
+    parser.add_argument(
+        "--modes", nargs="+", choices=["in-memory", "streaming"],
+        default=["in-memory", "streaming"], help="要对比的导出方式"
+    )
+    args = parser.parse_args()
+    
+    if args.seed:
+        seed(args.seed)
+    elif args.cleanup:
+        cleanup()
+    else:
+        main(args.modes)
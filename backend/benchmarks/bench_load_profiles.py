@@ -0,0 +1,332 @@
+"""
+基准测试 - 三类业务高峰的HTTP负载
+Benchmark: per-endpoint latency and throughput under the three seasonal load profiles
+
+按实际高峰建模，每类高峰由若干并发虚拟用户重复执行一组操作：
+- deadline:  申报截止日，申报人创建申报 → 修改 → 上传附件 → 提交
+- review:    专家评审期，专家查看我的评审任务 → 填写评分 → 提交评审（同一批申报由全部专家评审）
+- publicity: 公示期，公众浏览公示列表与详情，每隔若干次浏览提交一条异议（每个访客使用不同的 X-Real-IP）
+
+默认通过 ASGI 在进程内调用 main.app（包括中间件与启动任务）；指定 --base-url 时改为请求已启动的 uvicorn，
+此时两者须使用同一数据库配置。每次运行向当前配置的数据库写入带 [bench] 前缀的单位、奖项、公示和 bench_ 开头的用户，
+附件写入 UPLOAD_DIR，不做清理，请使用单独的数据库，例如:
+    DB_BACKEND=sqlite SQLITE_PATH=/tmp/bench.db python setup_database.py
+令牌直接签发，不经过登录接口（登录开销见 bench_login_storm）。
+
+结果按接口输出 p50/p95/p99 延迟与吞吐量，并保存为JSON；指定 --baseline 时与之前的结果逐接口对比。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_load_profiles --concurrency 20 --iterations 10 --output before.json
+    python -m benchmarks.bench_load_profiles --profiles review publicity --baseline before.json --output after.json
+    python -m benchmarks.bench_load_profiles --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import httpx
+from sqlalchemy import insert
+from database import SessionLocal, engine
+from models import (
+    Announcement, Application, ApplicationStatus, Award, AwardCycle, Organization, Review, User, UserRole
+)
+from crud.statistics import rebuild_statements
+from crud.user import get_password_hash
+from utils.auth import create_access_token
+from benchmarks.common import summarize, print_table
+
+BENCH_PREFIX = "[bench] "
+PROFILES = ("deadline", "review", "publicity")
+
+
+class EndpointStats:
+    """按接口记录请求延迟与失败数"""
+    
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+    
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        name: str,
+        method: str,
+        url: str,
+        expected: tuple = (200,),
+        **kwargs
+    ) -> httpx.Response:
+        """发送请求并记录延迟，状态码不在 expected 中计为失败"""
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if response.status_code not in expected:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+    
+    def summary(self, elapsed: float) -> List[Dict]:
+        """各接口的延迟分位数与吞吐量"""
+        rows = []
+        for name, latencies in self.latencies.items():
+            row = summarize(name, latencies, elapsed)
+            row["errors"] = self.errors.get(name, 0)
+            rows.append(row)
+        return rows
+
+
+def auth_header(user: User) -> Dict[str, str]:
+    """直接签发访问令牌"""
+    token = create_access_token(data={"sub": user.username, "role": user.role}, expires_delta=timedelta(hours=2))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed(run_id: str, concurrency: int, iterations: int, announcements: int) -> Dict:
+    """写入本次运行所需的单位、奖项轮次、用户、待评审申报和公示"""
+    now = datetime.now()
+    password_hash = get_password_hash(f"bench-{run_id}")
+    with SessionLocal() as db:
+        org = Organization(name=f"{BENCH_PREFIX}负载测试单位 {run_id}")
+        award = Award(name=f"{BENCH_PREFIX}负载测试奖 {run_id}", year=now.year)
+        db.add_all([org, award])
+        db.flush()
+        cycle = AwardCycle(
+            award_id=award.id, cycle_name=f"{BENCH_PREFIX}{run_id}",
+            start_date=now - timedelta(days=30), end_date=now + timedelta(days=30)
+        )
+        applicants = [
+            User(username=f"bench_{run_id}_app{i}", password_hash=password_hash, real_name=f"申报人{i}",
+                 role=UserRole.APPLICANT, organization_id=org.id)
+            for i in range(concurrency)
+        ]
+        experts = [
+            User(username=f"bench_{run_id}_exp{i}", password_hash=password_hash, real_name=f"专家{i}",
+                 role=UserRole.EXPERT)
+            for i in range(concurrency)
+        ]
+        db.add(cycle)
+        db.add_all(applicants + experts)
+        db.flush()
+        
+        # 评审期：iterations 个申报，每个申报分配给全部专家
+        review_apps = [
+            Application(
+                award_cycle_id=cycle.id, applicant_unit_id=org.id, applicant_user_id=applicants[0].id,
+                title=f"{BENCH_PREFIX}待评审申报 {run_id}-{i}", summary="负载测试",
+                submission_status=ApplicationStatus.EXPERT_REVIEW,
+                submission_time=now, submission_date=now.date(), created_at=now, created_date=now.date()
+            )
+            for i in range(iterations)
+        ]
+        db.add_all(review_apps)
+        db.flush()
+        db.execute(insert(Review), [
+            {"application_id": app.id, "expert_id": expert.id, "status": "pending", "created_at": now}
+            for app in review_apps for expert in experts
+        ])
+        
+        notices = [
+            Announcement(
+                title=f"{BENCH_PREFIX}公示 {run_id}-{i}", content="负载测试公示内容。" * 20,
+                announcement_type="拟授奖项目", status="active",
+                start_time=now - timedelta(days=1), end_time=now + timedelta(days=7)
+            )
+            for i in range(announcements)
+        ]
+        db.add_all(notices)
+        db.commit()
+        fixtures = {
+            "cycle_id": cycle.id,
+            "org_id": org.id,
+            "applicants": [auth_header(user) for user in applicants],
+            "experts": [auth_header(user) for user in experts],
+            "announcement_ids": [notice.id for notice in notices],
+        }
+    # 直接插入的待评审申报计入统计
+    with engine.begin() as conn:
+        for statement in rebuild_statements():
+            conn.execute(statement)
+    return fixtures
+
+
+async def deadline_user(client, stats: EndpointStats, fixtures: Dict, index: int, iterations: int, payload: bytes):
+    """申报人：创建 → 修改 → 上传附件 → 提交"""
+    headers = fixtures["applicants"][index]
+    for i in range(iterations):
+        response = await stats.request(client, "POST /api/applications/", "POST", "/api/applications/", headers=headers, json={
+            "award_cycle_id": fixtures["cycle_id"],
+            "applicant_unit_id": fixtures["org_id"],
+            "title": f"{BENCH_PREFIX}截止日申报 {index}-{i}",
+            "category": "技术发明",
+            "summary": "负载测试申报摘要"
+        })
+        if response.status_code != 200:
+            continue
+        app_id = response.json()["id"]
+        await stats.request(client, "PUT /api/applications/{id}", "PUT", f"/api/applications/{app_id}", headers=headers, json={
+            "leader_name": f"负责人{index}",
+            "technical_details": "技术详情" * 200,
+            "innovation_points": "创新点" * 50
+        })
+        # 内容各不相同，避免附件去重跳过写入
+        content = f"{index}-{i}\n".encode() + payload
+        await stats.request(
+            client, "POST /api/applications/{id}/attachments", "POST", f"/api/applications/{app_id}/attachments",
+            headers=headers, files={"file": (f"材料{i}.pdf", content, "application/pdf")}
+        )
+        await stats.request(client, "POST /api/applications/{id}/submit", "POST", f"/api/applications/{app_id}/submit", headers=headers)
+
+
+async def review_user(client, stats: EndpointStats, fixtures: Dict, index: int, iterations: int, rng: random.Random):
+    """专家：查看评审任务 → 评分 → 提交"""
+    headers = fixtures["experts"][index]
+    for _ in range(iterations):
+        response = await stats.request(client, "GET /api/reviews/my-reviews", "GET", "/api/reviews/my-reviews", headers=headers)
+        pending = [review["id"] for review in response.json() if review["status"] == "pending"] if response.status_code == 200 else []
+        if not pending:
+            continue
+        review_id = pending[0]
+        scores = {"innovation": rng.randint(20, 40), "value": rng.randint(15, 30), "benefit": rng.randint(15, 30)}
+        await stats.request(client, "PUT /api/reviews/{id}", "PUT", f"/api/reviews/{review_id}", headers=headers, json={
+            "scores_json": scores,
+            "total_score": sum(scores.values()),
+            "comment": "评审意见" * 30
+        })
+        await stats.request(client, "POST /api/reviews/{id}/submit", "POST", f"/api/reviews/{review_id}/submit", headers=headers)
+
+
+async def publicity_user(client, stats: EndpointStats, fixtures: Dict, index: int, iterations: int,
+                         rng: random.Random, objection_every: int):
+    """公众：浏览公示列表与详情，定期提交异议"""
+    headers = {"X-Real-IP": f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"}
+    for i in range(iterations):
+        await stats.request(client, "GET /api/announcements/", "GET", "/api/announcements/", headers=headers)
+        announcement_id = rng.choice(fixtures["announcement_ids"])
+        await stats.request(client, "GET /api/announcements/{id}", "GET", f"/api/announcements/{announcement_id}", headers=headers)
+        if objection_every and (i + 1) % objection_every == 0:
+            await stats.request(
+                client, "POST /api/announcements/{id}/objections", "POST", f"/api/announcements/{announcement_id}/objections",
+                expected=(202,), headers=headers, json={
+                    "announcement_id": announcement_id,
+                    "objector_name": f"访客{index}",
+                    "objection_content": f"对公示项目的异议 {index}-{i}：{rng.random():.6f}"
+                }
+            )
+
+
+async def run_profile(client, profile: str, fixtures: Dict, args) -> Dict:
+    """以 concurrency 个虚拟用户并发执行一类高峰"""
+    stats = EndpointStats()
+    payload = bytes(random.Random(args.seed).getrandbits(8) for _ in range(args.attachment_kb * 1024))
+    users = []
+    for index in range(args.concurrency):
+        rng = random.Random(f"{args.seed}-{profile}-{index}")
+        if profile == "deadline":
+            users.append(deadline_user(client, stats, fixtures, index, args.iterations, payload))
+        elif profile == "review":
+            users.append(review_user(client, stats, fixtures, index, args.iterations, rng))
+        else:
+            users.append(publicity_user(client, stats, fixtures, index, args.iterations, rng, args.objection_every))
+    start = time.perf_counter()
+    await asyncio.gather(*users)
+    elapsed = time.perf_counter() - start
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "errors": sum(stats.errors.values()),
+        "endpoints": stats.summary(elapsed),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """当前代码版本，便于对比结果时区分"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results: Dict, baseline: Dict) -> None:
+    """逐接口对比 p95 延迟与吞吐量的变化（p95 上升或吞吐量下降即为退化）"""
+    print(f"\n对比基线 {baseline['meta'].get('revision')} ({baseline['meta'].get('started_at')})")
+    print(f"{'profile / endpoint':<52}{'p95(ms)':>10}{'base':>10}{'Δp95':>9}{'req/s':>10}{'base':>10}{'Δrps':>9}")
+    for profile, result in results["profiles"].items():
+        base_rows = {row["name"]: row for row in baseline["profiles"].get(profile, {}).get("endpoints", [])}
+        for row in result["endpoints"]:
+            base = base_rows.get(row["name"])
+            if not base:
+                continue
+            p95_change = (row["p95_ms"] / base["p95_ms"] - 1) * 100 if base["p95_ms"] else 0.0
+            rps_change = (row["rps"] / base["rps"] - 1) * 100 if base["rps"] else 0.0
+            print(
+                f"{profile + ' ' + row['name']:<52}{row['p95_ms']:>10}{base['p95_ms']:>10}{p95_change:>8.1f}%"
+                f"{row['rps']:>10}{base['rps']:>10}{rps_change:>8.1f}%"
+            )
+
+
+async def main(args) -> None:
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    fixtures = seed(run_id, args.concurrency, args.iterations, args.announcements)
+    results = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "dialect": engine.dialect.name,
+            "target": args.base_url or "in-process",
+            "python": platform.python_version(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "profiles": {},
+    }
+    
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            for profile in args.profiles:
+                results["profiles"][profile] = await run_profile(client, profile, fixtures, args)
+    else:
+        from main import app
+        from database import async_engine
+        # 来自可信代理地址，X-Real-IP 视为客户端IP
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                for profile in args.profiles:
+                    results["profiles"][profile] = await run_profile(client, profile, fixtures, args)
+        await async_engine.dispose()
+    
+    print(f"dialect={engine.dialect.name} target={results['meta']['target']} "
+          f"concurrency={args.concurrency} iterations={args.iterations}")
+    for profile, result in results["profiles"].items():
+        print(f"\n[{profile}] requests={result['requests']} elapsed={result['elapsed_s']}s "
+              f"req/s={result['rps']} errors={result['errors']}")
+        print_table(result["endpoints"])
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存: {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="业务高峰HTTP负载基准测试")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES), help="执行的高峰类型")
+    parser.add_argument("--concurrency", type=int, default=20, help="每类高峰的并发虚拟用户数")
+    parser.add_argument("--iterations", type=int, default=10, help="每个虚拟用户重复执行的次数")
+    parser.add_argument("--announcements", type=int, default=10, help="公示条数")
+    parser.add_argument("--objection-every", type=int, default=5, help="公众每浏览几次提交一条异议，0表示不提交")
+    parser.add_argument("--attachment-kb", type=int, default=256, help="附件大小（KB）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--base-url", help="请求已启动的服务，例如 http://127.0.0.1:8000；默认进程内调用")
+    parser.add_argument("--output", default="load_profiles.json", help="结果JSON文件")
+    parser.add_argument("--baseline", help="用于对比的历史结果JSON文件")
+    asyncio.run(main(parser.parse_args()))
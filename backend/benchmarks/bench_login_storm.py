@@ -0,0 +1,83 @@
+"""
+基准测试 - 登录风暴
+Benchmark: concurrent logins with inline bcrypt vs the bounded hash pool
+
+模拟申报开放时大量用户同时登录，对比两种情况：
+- inline: bcrypt 在事件循环内同步计算（改造前）
+- pool:   bcrypt 派发到 PasswordHashPool（改造后）
+
+登录请求的同时持续探测 /health，用其延迟衡量事件循环是否被阻塞。
+需要已初始化的数据库（python setup_database.py）。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_login_storm --concurrency 50 --requests 200 --workers 4
+"""
+import argparse
+import asyncio
+import time
+import httpx
+import crud.user
+from main import app
+from database import async_engine
+from utils.password_pool import PasswordHashPool
+from benchmarks.common import run_concurrent, summarize, print_table
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list) -> None:
+    """持续探测健康检查接口，延迟包含事件循环调度等待时间"""
+    interval = 0.01
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start - interval)
+
+
+async def run_scenario(client, name, pool, concurrency, total, username, password):
+    """执行一个登录风暴场景"""
+    crud.user.password_pool = pool
+    
+    async def login():
+        response = await client.post("/api/auth/login", data={"username": username, "password": password})
+        response.raise_for_status()
+    
+    stop = asyncio.Event()
+    health_latencies: list = []
+    probe = asyncio.create_task(probe_health(client, stop, health_latencies))
+    latencies, elapsed = await run_concurrent(login, concurrency, total)
+    stop.set()
+    await probe
+    pool.shutdown()
+    return (
+        summarize(f"{name}: login", latencies, elapsed),
+        summarize(f"{name}: /health probe", health_latencies, elapsed),
+        pool.stats()
+    )
+
+
+async def main(concurrency, total, workers, username, password):
+    original_pool = crud.user.password_pool
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, pool in (("inline", PasswordHashPool(0)), ("pool", PasswordHashPool(workers))):
+            login_row, health_row, stats = await run_scenario(
+                client, name, pool, concurrency, total, username, password
+            )
+            rows.extend([login_row, health_row])
+            print(f"{name} pool stats: {stats}")
+    crud.user.password_pool = original_pool
+    
+    print(f"concurrency={concurrency} requests={total} workers={workers}")
+    print_table(rows)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="登录风暴基准测试")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发登录数")
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的登录总数")
+    parser.add_argument("--workers", type=int, default=4, help="哈希工作池线程数")
+    parser.add_argument("--username", default="admin", help="登录用户名")
+    parser.add_argument("--password", default="admin123", help="登录密码")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.workers, args.username, args.password))
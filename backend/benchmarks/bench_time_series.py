@@ -0,0 +1,114 @@
+"""
+基准测试 - 申报时间序列统计
+Benchmark: date-function grouping vs. range scan on the stored date column
+
+在临时SQLite文件中生成合成申报（固定随机种子），对比：
+- date-function: 对 created_at 取年/月分组（改造前 func.year 的写法，无法使用索引）
+- date-column: 按 created_date 做索引范围扫描并按日分组，再由 utils.time_buckets 归并（改造后）
+分别测量全部历史按年、最近12个月按月、单个轮次最近12个月按月三种查询。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_time_series --rows 500000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, extract, func, insert, select
+from database import Base
+from models import Application, ApplicationStatus
+from utils.time_buckets import Granularity, fill_buckets, previous_buckets
+
+CYCLES = 20
+YEARS = 8
+
+
+def seed(engine, rows: int, seed_value: int, batch_size: int = 20000) -> None:
+    """生成合成申报"""
+    rng = random.Random(seed_value)
+    Base.metadata.create_all(engine, tables=[Application.__table__])
+    now = datetime.now()
+    span = YEARS * 365 * 86400
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, rows)):
+                created_at = now - timedelta(seconds=rng.randrange(span))
+                batch.append({
+                    "award_cycle_id": rng.randint(1, CYCLES),
+                    "applicant_unit_id": rng.randint(1, 500),
+                    "title": f"synthetic {i}",
+                    "submission_status": ApplicationStatus.SUBMITTED,
+                    "created_at": created_at,
+                    "created_date": created_at.date()
+                })
+            conn.execute(insert(Application), batch)
+
+
+def timed(label: str, func_, repeat: int = 3):
+    """取多次执行的最短耗时"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func_()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<14} {best * 1000:8.1f} ms")
+    return result
+
+
+def by_function(conn, granularity: Granularity, start: date, award_cycle_id=None):
+    """改造前：对时间字段取年/月分组"""
+    parts = [extract("year", Application.created_at)]
+    if granularity == Granularity.MONTH:
+        parts.append(extract("month", Application.created_at))
+    query = select(*parts, func.count(Application.id))\
+        .filter(Application.created_at >= datetime.combine(start, datetime.min.time()))
+    if award_cycle_id:
+        query = query.filter(Application.award_cycle_id == award_cycle_id)
+    return sum(count for *_, count in conn.execute(query.group_by(*parts)))
+
+
+def by_date_column(conn, granularity: Granularity, start: date, end: date, award_cycle_id=None):
+    """改造后：按日期字段范围扫描后归并"""
+    query = select(Application.created_date, func.count())\
+        .filter(Application.created_date >= start, Application.created_date <= end)
+    if award_cycle_id:
+        query = query.filter(Application.award_cycle_id == award_cycle_id)
+    daily_counts = conn.execute(query.group_by(Application.created_date)).all()
+    return sum(point["count"] for point in fill_buckets(daily_counts, start, end, granularity))
+
+
+def main(rows: int, seed_value: int):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_ts_"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    start = time.perf_counter()
+    seed(engine, rows, seed_value)
+    print(f"rows={rows} seed={seed_value} (seeded in {time.perf_counter() - start:.1f}s, {path})")
+    
+    end = date.today()
+    cases = [
+        ("all years by year", Granularity.YEAR, previous_buckets(end, Granularity.YEAR, YEARS + 1), None),
+        ("12 months by month", Granularity.MONTH, previous_buckets(end, Granularity.MONTH, 12), None),
+        ("1 cycle, 12 months", Granularity.MONTH, previous_buckets(end, Granularity.MONTH, 12), 1),
+    ]
+    with engine.connect() as conn:
+        for label, granularity, case_start, cycle in cases:
+            print(f"{label}:")
+            old = timed("date-function", lambda: by_function(conn, granularity, case_start, cycle))
+            new = timed("date-column", lambda: by_date_column(conn, granularity, case_start, end, cycle))
+            if old != new:
+                print(f"  结果不一致: {old} != {new}")
+    
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="申报时间序列统计基准测试")
+    parser.add_argument("--rows", type=int, default=500000, help="合成申报数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+    main(args.rows, args.seed)
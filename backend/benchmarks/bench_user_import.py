@@ -0,0 +1,93 @@
+"""
+基准测试 - 批量导入用户
+Benchmark: provisioning N users one by one vs bulk roster import
+
+对比两种方式创建同样数量用户的总耗时：
+- per-row: 与逐个调用 POST /api/users/ 相同，每个用户查询用户名、邮箱，哈希一个密码并提交一次
+- bulk:    utils.user_import.import_users，一次查询判断唯一性，批量哈希工作池并行计算，一次批量插入
+用户写入临时SQLite文件。bcrypt 默认12轮，单个哈希约0.2~0.4秒，可用 --rounds 调低以缩短测试时间。
+
+用法 / Usage (在 backend 目录下运行):
+    python -m benchmarks.bench_user_import --users 2000
+    python -m benchmarks.bench_user_import --users 500 --rounds 10
+"""
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+import time
+from passlib.context import CryptContext
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import crud.user
+from database import Base
+from models import User
+from schemas import UserCreate
+from utils.password_pool import bulk_password_pool
+from utils.user_import import import_users
+
+
+def write_roster(path: str, prefix: str, count: int) -> None:
+    """生成名单CSV"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["用户名", "姓名", "初始密码", "角色", "电子邮箱"])
+        for i in range(count):
+            writer.writerow([f"{prefix}{i}", f"专家{i}", f"secret{i}", "专家", f"{prefix}{i}@example.com"])
+
+
+async def create_per_row(session_factory, prefix: str, count: int) -> None:
+    """逐个创建（与单个创建接口的处理相同）"""
+    for i in range(count):
+        user = UserCreate(
+            username=f"{prefix}{i}", real_name=f"专家{i}", password=f"secret{i}",
+            role="expert", email=f"{prefix}{i}@example.com"
+        )
+        async with session_factory() as db:
+            if await crud.user.get_user_by_username(db, user.username):
+                raise RuntimeError("用户名已存在")
+            if await crud.user.get_user_by_email(db, user.email):
+                raise RuntimeError("邮箱已被使用")
+            await crud.user.create_user(db, user)
+
+
+async def main(count: int, rounds: int) -> None:
+    crud.user.pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    workdir = tempfile.mkdtemp(prefix="bench_users_")
+    path = os.path.join(workdir, "bench.db")
+    roster = os.path.join(workdir, "roster.csv")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    
+    start = time.perf_counter()
+    await create_per_row(session_factory, "row_", count)
+    per_row = time.perf_counter() - start
+    
+    write_roster(roster, "bulk_", count)
+    start = time.perf_counter()
+    async with session_factory() as db:
+        result = await import_users(db, roster, "roster.csv")
+    bulk = time.perf_counter() - start
+    
+    async with session_factory() as db:
+        total = await db.scalar(select(func.count()).select_from(User))
+    print(f"users={count} bcrypt_rounds={rounds} bulk_workers={bulk_password_pool.max_workers} created={total}")
+    print(f"{'mode':<12}{'elapsed_s':>12}{'users/s':>10}")
+    print(f"{'per-row':<12}{per_row:>12.2f}{count / per_row:>10.1f}")
+    print(f"{'bulk':<12}{bulk:>12.2f}{result['imported'] / bulk:>10.1f}")
+    
+    bulk_password_pool.shutdown()
+    await engine.dispose()
+    os.remove(path)
+    os.remove(roster)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量导入用户基准测试")
+    parser.add_argument("--users", type=int, default=2000, help="创建的用户数")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt 轮数")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.rounds))
@@ -0,0 +1,64 @@
+"""
+基准测试公共工具
+Benchmark helpers
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+async def run_concurrent(
+    request_fn: Callable[[], Awaitable[None]],
+    concurrency: int,
+    total: int
+) -> Tuple[List[float], float]:
+    """
+    以固定并发数执行请求
+    Returns: (latencies_seconds, elapsed_seconds)
+    """
+    latencies: List[float] = []
+    remaining = total
+    
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await request_fn()
+            latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def summarize(name: str, latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """汇总延迟与吞吐量"""
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def print_table(rows: List[Dict[str, float]]) -> None:
+    """打印结果表格"""
+    width = max([30] + [len(row["name"]) + 2 for row in rows])
+    print(f"{'scenario':<{width}}{'requests':>10}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for row in rows:
+        print(
+            f"{row['name']:<{width}}{row['requests']:>10}{row['rps']:>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
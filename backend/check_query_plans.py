@@ -0,0 +1,314 @@
+"""
+CRUD查询执行计划检查
+Check that every query issued by backend/crud uses an index
+
+逐个调用 crud 模块中的公开异步函数，捕获其发出的 SELECT/UPDATE/DELETE 语句并执行 EXPLAIN：
+- MySQL: EXPLAIN 中 type=ALL 且没有 possible_keys 的表视为全表扫描
+  （有可用索引但因数据量小而选择全表扫描的不计）
+- SQLite: EXPLAIN QUERY PLAN 中不带索引的 "SCAN <table>" 视为全表扫描
+同时检查 CHECKS 是否覆盖了 crud 模块的全部公开异步函数，新增函数须在此登记。
+
+所有调用在一个最终回滚的事务中执行，不会修改数据；需要已初始化的数据库（python setup_database.py）。
+
+用法 / Usage:
+    python check_query_plans.py
+"""
+import asyncio
+import hashlib
+import inspect
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import async_engine
+from models import User, UserRole, Application, ApplicationStat, ApplicationStatus, Organization, Review, OrgType
+from schemas import (
+    ApplicationCreate, ApplicationUpdate, OrganizationCreate, OrganizationUpdate,
+    ReviewCreate, ReviewUpdate, UserCreate, UserUpdate
+)
+import crud.application
+import crud.blob
+import crud.log
+import crud.organization
+import crud.review
+import crud.statistics
+import crud.user
+
+CRUD_MODULES = (crud.application, crud.blob, crud.log, crud.organization, crud.review, crud.statistics, crud.user)
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@dataclass
+class Check:
+    """一个待检查的CRUD调用"""
+    name: str
+    call: Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+    # 允许全表扫描的表及原因
+    allow_scan: Dict[str, str] = field(default_factory=dict)
+
+
+def _upload(content: bytes) -> Path:
+    """在上传临时目录中生成一个文件"""
+    from utils import blob_store
+    path = blob_store.temp_dir() / f"{hashlib.sha256(content).hexdigest()}.part"
+    path.write_bytes(content)
+    return path
+
+
+async def _with_application(db: AsyncSession, app_id: int, func: Callable, *args) -> Any:
+    """以已加载的申报对象调用"""
+    return await func(db, await crud.application.get_application(db, app_id), *args)
+
+
+CHECKS: List[Check] = [
+    # ---------------- crud.user ----------------
+    Check("get_user", lambda db, s: crud.user.get_user(db, s["expert_id"])),
+    Check("get_user_by_username", lambda db, s: crud.user.get_user_by_username(db, "admin")),
+    Check("get_user_by_email", lambda db, s: crud.user.get_user_by_email(db, "nobody@example.com")),
+    Check("get_users", lambda db, s: crud.user.get_users(db, role=UserRole.EXPERT)),
+    Check("get_users_page", lambda db, s: crud.user.get_users_page(db, organization_id=s["org_id"])),
+    Check("create_user", lambda db, s: crud.user.create_user(db, UserCreate(
+        username="plan_check_user", real_name="检查用户", password="plan-check", organization_id=s["org_id"]
+    ))),
+    Check("get_taken_usernames_and_emails", lambda db, s: crud.user.get_taken_usernames_and_emails(
+        db, {"admin", "plan_check_bulk"}, {"nobody@example.com"}
+    )),
+    Check("bulk_create_users", lambda db, s: crud.user.bulk_create_users(db, [
+        UserCreate(username=f"plan_check_bulk{i}", real_name="检查用户", password="plan-check") for i in range(3)
+    ], ["plan-check-hash"] * 3)),
+    Check("update_user", lambda db, s: crud.user.update_user(db, s["expert_id"], UserUpdate(mobile="13800000000"))),
+    Check("update_user_password", lambda db, s: crud.user.update_user_password(db, s["expert_id"], "plan-check")),
+    Check("delete_user", lambda db, s: crud.user.delete_user(db, 0)),
+    Check("authenticate_user", lambda db, s: crud.user.authenticate_user(db, "admin", "wrong-password")),
+    # ---------------- crud.organization ----------------
+    Check("get_organization", lambda db, s: crud.organization.get_organization(db, s["org_id"])),
+    Check("get_organization_by_name", lambda db, s: crud.organization.get_organization_by_name(db, "不存在的单位")),
+    Check("get_organization_by_code", lambda db, s: crud.organization.get_organization_by_code(db, "NONE")),
+    Check("get_organizations", lambda db, s: crud.organization.get_organizations(db, org_type=OrgType.ENTERPRISE)),
+    Check("get_organizations_by_names", lambda db, s: crud.organization.get_organizations_by_names(
+        db, ["不存在的单位", "另一个单位"]
+    )),
+    Check("create_organization", lambda db, s: crud.organization.create_organization(
+        db, OrganizationCreate(name="执行计划检查单位")
+    )),
+    Check("update_organization", lambda db, s: crud.organization.update_organization(
+        db, s["org_id"], OrganizationUpdate(address="检查地址")
+    )),
+    Check("delete_organization", lambda db, s: crud.organization.delete_organization(db, 0)),
+    # ---------------- crud.application ----------------
+    Check("get_application", lambda db, s: crud.application.get_application(db, s["app_id"])),
+    Check("get_applications", lambda db, s: crud.application.get_applications(
+        db, award_cycle_id=s["cycle_id"], status=ApplicationStatus.SUBMITTED
+    )),
+    Check("get_applications_page", lambda db, s: crud.application.get_applications_page(
+        db, applicant_unit_id=s["org_id"]
+    )),
+    Check(
+        "search_applications",
+        lambda db, s: crud.application.search_applications(db, "合金", award_cycle_id=s["cycle_id"]),
+        allow_scan={"applications": "非MySQL数据库退化为LIKE匹配；MySQL使用全文索引"}
+    ),
+    Check("create_application", lambda db, s: crud.application.create_application(db, ApplicationCreate(
+        award_cycle_id=s["cycle_id"], applicant_unit_id=s["org_id"], title="执行计划检查申报"
+    ), s["expert_id"])),
+    Check("bulk_create_applications", lambda db, s: crud.application.bulk_create_applications(db, [
+        ApplicationCreate(award_cycle_id=s["cycle_id"], applicant_unit_id=s["org_id"], title=f"批量检查申报{i}")
+        for i in range(3)
+    ], {s["org_id"]: OrgType.ENTERPRISE}, s["expert_id"])),
+    Check("update_application", lambda db, s: crud.application.update_application(
+        db, s["app_id"], ApplicationUpdate(leader_title="研究员")
+    )),
+    Check("submit_application", lambda db, s: crud.application.submit_application(db, s["app_id"])),
+    Check("update_application_status", lambda db, s: crud.application.update_application_status(
+        db, s["app_id"], ApplicationStatus.EXPERT_REVIEW
+    )),
+    Check("delete_application", lambda db, s: crud.application.delete_application(db, s["app_id"])),
+    Check("add_attachment", lambda db, s: crud.application.add_attachment(
+        db, s["app_id"], "check.pdf", _upload(b"plan-check"), "pdf", 10,
+        hashlib.sha256(b"plan-check").hexdigest(), s["expert_id"]
+    )),
+    Check("get_attachments", lambda db, s: crud.application.get_attachments(db, s["app_id"])),
+    Check("delete_attachment", lambda db, s: crud.application.delete_attachment(db, s["app_id"], 0)),
+    # ---------------- crud.review ----------------
+    Check("get_review", lambda db, s: crud.review.get_review(db, s["review_id"])),
+    Check("get_review_by_expert_and_app", lambda db, s: crud.review.get_review_by_expert_and_app(
+        db, s["expert_id"], s["app_id"]
+    )),
+    Check("get_reviews_by_expert", lambda db, s: crud.review.get_reviews_by_expert(db, s["expert_id"])),
+    Check("get_reviews_by_expert_page", lambda db, s: crud.review.get_reviews_by_expert_page(db, s["expert_id"])),
+    Check("get_reviews_by_application", lambda db, s: crud.review.get_reviews_by_application(db, s["app_id"])),
+    Check("create_review", lambda db, s: crud.review.create_review(
+        db, ReviewCreate(application_id=s["app_id"], scores_json={"innovation": 30}, total_score=85), s["expert_id"]
+    )),
+    Check("update_review", lambda db, s: crud.review.update_review(db, s["review_id"], ReviewUpdate(total_score=80))),
+    Check("submit_review", lambda db, s: crud.review.submit_review(db, s["review_id"])),
+    Check("update_application_scores", lambda db, s: crud.review.update_application_scores(db, s["app_id"])),
+    Check("assign_expert_to_application", lambda db, s: crud.review.assign_expert_to_application(
+        db, s["app_id"], s["expert_id"]
+    )),
+    Check("bulk_assign_experts", lambda db, s: crud.review.bulk_assign_experts(db, s["cycle_id"], 3, dry_run=True)),
+    Check("get_application_score_summary", lambda db, s: crud.review.get_application_score_summary(db, s["app_id"])),
+    # ---------------- crud.blob ----------------
+    Check("acquire_blob", lambda db, s: crud.blob.acquire_blob(
+        db, _upload(b"plan-check-blob"), hashlib.sha256(b"plan-check-blob").hexdigest(), 15
+    )),
+    Check("release_blobs", lambda db, s: crud.blob.release_blobs(db, ["0" * 64])),
+    Check(
+        "get_storage_usage",
+        lambda db, s: crud.blob.get_storage_usage(db),
+        allow_scan={
+            "file_blobs": "全量占用统计，管理员按需调用",
+            "attachments": "全量占用统计，管理员按需调用"
+        }
+    ),
+    Check("collect_garbage", lambda db, s: crud.blob.collect_garbage(db, dry_run=True)),
+    # ---------------- crud.statistics ----------------
+    Check("record_application_created", lambda db, s: _with_application(
+        db, s["app_id"], crud.statistics.record_application_created, OrgType.ENTERPRISE
+    )),
+    Check("record_applications_created", lambda db, s: crud.statistics.record_applications_created(
+        db, s["cycle_id"], ApplicationStatus.DRAFT, {(OrgType.ENTERPRISE, 2025): 3, (None, 2025): 1}
+    )),
+    Check("record_application_deleted", lambda db, s: _with_application(
+        db, s["app_id"], crud.statistics.record_application_deleted
+    )),
+    Check("record_status_change", lambda db, s: _with_application(
+        db, s["app_id"], crud.statistics.record_status_change, ApplicationStatus.DRAFT
+    )),
+    Check("record_org_type_change", lambda db, s: crud.statistics.record_org_type_change(
+        db, s["org_id"], OrgType.ENTERPRISE, OrgType.INSTITUTE
+    )),
+    Check(
+        "rebuild_application_stats",
+        lambda db, s: crud.statistics.rebuild_application_stats(db),
+        allow_scan={
+            "applications": "全量重建，管理员按需调用",
+            "application_stats": "全量重建，管理员按需调用"
+        }
+    ),
+    Check(
+        "count_applications_by",
+        lambda db, s: crud.statistics.count_applications_by(db, ApplicationStat.submission_status),
+        allow_scan={"application_stats": "汇总表行数为 轮次×状态×单位类型×年度，不随申报数增长"}
+    ),
+    Check("count_applications", lambda db, s: crud.statistics.count_applications(db, s["cycle_id"])),
+    Check("count_applications_by_date", lambda db, s: crud.statistics.count_applications_by_date(
+        db, "submitted", date(2020, 1, 1), date.today(), award_cycle_id=s["cycle_id"]
+    )),
+    # ---------------- crud.log ----------------
+    Check("get_logs_page", lambda db, s: crud.log.get_logs_page(
+        db, datetime.now() - timedelta(days=30), datetime.now(), user_id=s["expert_id"]
+    )),
+    Check("get_logs_page (action_type)", lambda db, s: crud.log.get_logs_page(
+        db, datetime.now() - timedelta(days=30), datetime.now(), action_type="login"
+    )),
+    Check("get_logs_page (time range)", lambda db, s: crud.log.get_logs_page(
+        db, datetime.now() - timedelta(days=30), datetime.now()
+    )),
+]
+
+
+def uncovered_functions() -> List[str]:
+    """crud 模块中未登记检查的公开异步函数"""
+    checked = {check.name for check in CHECKS}
+    missing = []
+    for module in CRUD_MODULES:
+        for name, func in inspect.getmembers(module, inspect.iscoroutinefunction):
+            if not name.startswith("_") and func.__module__ == module.__name__ and name not in checked:
+                missing.append(f"{module.__name__}.{name}")
+    return missing
+
+
+async def explain(conn, dialect: str, statement: str, parameters) -> List[str]:
+    """返回语句中发生全表扫描的表"""
+    if dialect == "mysql":
+        result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        return [
+            row["table"] for row in result.mappings()
+            if row["type"] == "ALL" and not row["possible_keys"]
+        ]
+    if dialect == "sqlite":
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [
+            match.group(1) for *_, detail in result
+            if (match := SQLITE_FULL_SCAN.match(detail))
+        ]
+    raise SystemExit(f"不支持的数据库: {dialect}")
+
+
+async def sample_ids(db: AsyncSession) -> Dict[str, Any]:
+    """取演示数据中的样例ID"""
+    review = (await db.execute(select(Review.id, Review.expert_id, Review.application_id).limit(1))).first()
+    if not review:
+        raise SystemExit("请先初始化数据库: python setup_database.py")
+    return {
+        "review_id": review.id,
+        "expert_id": review.expert_id,
+        "app_id": review.application_id,
+        "cycle_id": await db.scalar(select(Application.award_cycle_id).filter(Application.id == review.application_id)),
+        "org_id": await db.scalar(select(Organization.id).limit(1))
+    }
+
+
+async def main() -> int:
+    missing = uncovered_functions()
+    settings.UPLOAD_DIR = tempfile.mkdtemp(prefix="plan_check_")
+    
+    captured: List[tuple] = []
+    capturing = False
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing and not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            captured.append((statement, parameters))
+    
+    sync_engine = async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    dialect = sync_engine.dialect.name
+    failures = []
+    
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        async with AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False) as db:
+            samples = await sample_ids(db)
+            for check in CHECKS:
+                captured.clear()
+                capturing = True
+                try:
+                    await check.call(db, samples)
+                finally:
+                    capturing = False
+                await db.rollback()
+                
+                scans = []
+                for statement, parameters in captured:
+                    for table in await explain(conn, dialect, statement, parameters):
+                        if table not in check.allow_scan:
+                            scans.append((table, " ".join(statement.split())[:160]))
+                status = "FAIL" if scans else "ok"
+                print(f"[{status:>4}] {check.name} ({len(captured)} queries)")
+                for table, statement in scans:
+                    print(f"         full scan on {table}: {statement}")
+                if scans:
+                    failures.append(check.name)
+        await transaction.rollback()
+    
+    event.remove(sync_engine, "before_cursor_execute", capture)
+    await async_engine.dispose()
+    
+    if missing:
+        print("\n未登记检查的CRUD函数:")
+        for name in missing:
+            print(f"  {name}")
+    print(f"\n{len(CHECKS)} checks, {len(failures)} with full scans, {len(missing)} unchecked functions ({dialect})")
+    return 1 if failures or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -15,17 +15,55 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     
     # 数据库配置
+    DB_BACKEND: str = "mysql"  # mysql / sqlite（本地开发、离线基准测试，无需数据库服务）
     DB_HOST: str = "localhost"
     DB_PORT: int = 3306
     DB_USER: str = "root"
     DB_PASSWORD: str = "root"
     DB_NAME: str = "nonferrous_award_system"
+    SQLITE_PATH: str = "./nonferrous_award.db"  # DB_BACKEND=sqlite 时的数据库文件，":memory:" 为进程内存数据库
+    DB_RAISE_ON_LAZY_LOAD: bool = False  # 访问未预加载的关系时抛出异常，用于发现N+1查询
     
     # JWT 配置
     SECRET_KEY: str = "your-secret-key-change-in-production-nonferrous-award-2024"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24小时
     
+    # 认证用户缓存配置
+    AUTH_USER_CACHE_TTL: int = 60  # 秒，0表示禁用
+    AUTH_USER_CACHE_SIZE: int = 10000
+    
+    # 公开公示接口缓存配置
+    ANNOUNCEMENT_CACHE_TTL: int = 60  # 进程内缓存秒数，0表示禁用；公示变更时本进程立即失效
+    ANNOUNCEMENT_CACHE_SIZE: int = 256
+    ANNOUNCEMENT_MAX_AGE: int = 30  # Cache-Control max-age，浏览器及nginx可缓存的秒数
+    ANNOUNCEMENT_SNAPSHOT_DIR: str = ""  # 公示静态快照目录（由nginx直接提供），为空表示不发布
+    
+    # 公开异议提交配置
+    OBJECTION_BATCH_SIZE: int = 200  # 每次批量写入的最大条数
+    OBJECTION_FLUSH_INTERVAL: float = 1.0  # 秒，缓冲的异议最长等待多久写入
+    OBJECTION_QUEUE_SIZE: int = 10000  # 缓冲上限，超过返回503
+    OBJECTION_DEDUP_TTL: int = 3600  # 秒，进程内记住已收到的异议内容，重复提交直接返回
+    OBJECTION_RATE_PER_MINUTE: float = 5  # 每个IP每分钟可提交的异议数，0表示不限制
+    OBJECTION_RATE_BURST: int = 5  # 每个IP允许的突发提交数（令牌桶容量）
+    TRUSTED_PROXY_IPS: set = {"127.0.0.1"}  # 可信反向代理，来自这些地址的请求按 X-Real-IP / X-Forwarded-For 识别客户端
+    
+    # 操作日志配置
+    AUDIT_LOG_ENABLED: bool = True  # 记录 /api 下的增删改请求
+    AUDIT_LOG_BATCH_SIZE: int = 500  # 每次批量写入的最大条数
+    AUDIT_LOG_FLUSH_INTERVAL: float = 2.0  # 秒，缓冲的日志最长等待多久写入
+    AUDIT_LOG_QUEUE_SIZE: int = 50000  # 缓冲上限
+    AUDIT_LOG_FULL_WAIT: float = 0.05  # 秒，缓冲已满时请求最多等待多久，超时后丢弃该条日志
+    LOG_RETENTION_MONTHS: int = 12  # 数据库中保留的日志月数，更早的日志归档后删除
+    LOG_ARCHIVE_DIR: str = "./archives/logs"  # 日志归档目录（每月一个 .jsonl.gz）
+    LOG_PARTITIONS_AHEAD: int = 3  # MySQL 预先创建的未来月份分区数
+    LOG_QUERY_MAX_DAYS: int = 366  # 日志查询的最大时间跨度（天）
+    
+    # 密码哈希工作池配置
+    PASSWORD_HASH_WORKERS: int = 4  # 并发bcrypt计算上限，0表示在事件循环内同步执行
+    PASSWORD_HASH_MAX_QUEUE: int = 256  # 排队上限，超过返回503，0表示不限制
+    PASSWORD_BULK_HASH_WORKERS: int = 0  # 批量导入用户时的bcrypt并发数，0表示CPU核数
+    
     # 文件上传配置
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
@@ -50,11 +88,32 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    @property
+    def SQLITE_IN_MEMORY(self) -> bool:
+        """是否使用 SQLite 内存数据库"""
+        return self.DB_BACKEND == "sqlite" and self.SQLITE_PATH == ":memory:"
+    
+    @property
+    def _sqlite_database(self) -> str:
+        """SQLite 数据库路径；内存数据库使用共享缓存，同步与异步引擎访问同一个库"""
+        if self.SQLITE_IN_MEMORY:
+            return f"file:{self.DB_NAME}?mode=memory&cache=shared&uri=true"
+        return self.SQLITE_PATH
+    
     @property
     def DATABASE_URL(self) -> str:
         """生成数据库连接URL"""
+        if self.DB_BACKEND == "sqlite":
+            return f"sqlite:///{self._sqlite_database}"
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """生成异步数据库连接URL"""
+        if self.DB_BACKEND == "sqlite":
+            return f"sqlite+aiosqlite:///{self._sqlite_database}"
+        return f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}?charset=utf8mb4"
+    
     
     model_config = {"env_file": ".env", "case_sensitive": True}
 
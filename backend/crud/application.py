@@ -2,29 +2,52 @@
 CRUD操作 - 申报管理
 Application CRUD operations
 """
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from pathlib import Path
+from sqlalchemy import Select, select, case, func, insert, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from models import Application, ApplicationStatus, Attachment
+from models import Application, ApplicationStatus, Attachment, Organization, OrgType
 from schemas import ApplicationCreate, ApplicationUpdate
+from crud.blob import acquire_blob, release_blobs
+from crud import statistics
+from utils.pagination import paginate_keyset
 
+# ApplicationResponse 内嵌申报单位；列表中多个申报常属同一单位，selectinload 按ID去重后一次取回
+APPLICATION_LOAD_OPTIONS = (selectinload(Application.applicant_unit),)
 
-def get_application(db: Session, app_id: int) -> Optional[Application]:
+# 状态变更后的阶段说明
+STAGE_LABELS = {
+    ApplicationStatus.SUBMITTED: "已提交待推荐",
+    ApplicationStatus.RECOMMENDED: "推荐通过待初审",
+    ApplicationStatus.PRELIMINARY_APPROVED: "初审通过待专家评审",
+    ApplicationStatus.PRELIMINARY_REJECTED: "初审不通过",
+    ApplicationStatus.EXPERT_REVIEW: "专家评审中",
+    ApplicationStatus.COMMITTEE_REVIEW: "评委会终审中",
+    ApplicationStatus.APPROVED: "终审通过",
+    ApplicationStatus.REJECTED: "终审不通过",
+    ApplicationStatus.ANNOUNCED: "公示中",
+    ApplicationStatus.ARCHIVED: "已归档"
+}
+
+
+async def get_application(db: AsyncSession, app_id: int) -> Optional[Application]:
     """根据ID获取申报"""
-    return db.query(Application).filter(Application.id == app_id).first()
+    return await db.scalar(
+        select(Application).options(*APPLICATION_LOAD_OPTIONS).filter(Application.id == app_id)
+    )
 
 
-def get_applications(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+def _applications_query(
     award_cycle_id: Optional[int] = None,
     applicant_unit_id: Optional[int] = None,
     status: Optional[ApplicationStatus] = None,
     title: Optional[str] = None
-) -> List[Application]:
-    """获取申报列表"""
-    query = db.query(Application)
+) -> Select:
+    """构建申报列表查询"""
+    query = select(Application).options(*APPLICATION_LOAD_OPTIONS)
     
     if award_cycle_id:
         query = query.filter(Application.award_cycle_id == award_cycle_id)
@@ -35,33 +58,147 @@ def get_applications(
     if title:
         query = query.filter(Application.title.like(f'%{title}%'))
     
-    return query.order_by(Application.created_at.desc()).offset(skip).limit(limit).all()
+    return query
 
 
-def create_application(
-    db: Session, 
+async def get_applications(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    award_cycle_id: Optional[int] = None,
+    applicant_unit_id: Optional[int] = None,
+    status: Optional[ApplicationStatus] = None,
+    title: Optional[str] = None
+) -> List[Application]:
+    """获取申报列表"""
+    query = _applications_query(award_cycle_id, applicant_unit_id, status, title)
+    result = await db.scalars(query.order_by(Application.created_at.desc()).offset(skip).limit(limit))
+    return list(result)
+
+
+async def get_applications_page(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    award_cycle_id: Optional[int] = None,
+    applicant_unit_id: Optional[int] = None,
+    status: Optional[ApplicationStatus] = None,
+    title: Optional[str] = None
+) -> Dict[str, Any]:
+    """游标分页获取申报列表"""
+    query = _applications_query(award_cycle_id, applicant_unit_id, status, title)
+    return await paginate_keyset(db, query, Application, limit, cursor)
+
+
+async def search_applications(
+    db: AsyncSession,
+    keyword: str,
+    limit: int = 20,
+    award_cycle_id: Optional[int] = None,
+    applicant_unit_id: Optional[int] = None
+) -> List[Tuple[Application, float]]:
+    """
+    按相关度检索申报（标题、摘要、创新点、技术详情）
+    MySQL 使用 ngram 全文索引；其他数据库退化为 LIKE 匹配并按命中字段加权打分
+    Returns: [(application, score)]
+    """
+    if db.bind.dialect.name == "mysql":
+        score = match(
+            Application.title,
+            Application.summary,
+            Application.innovation_points,
+            Application.technical_details,
+            against=keyword
+        ).in_natural_language_mode()
+        condition = score > 0
+    else:
+        # 关键词中的 % _ 按字面匹配
+        escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        weighted_columns = (
+            (Application.title, 3),
+            (Application.summary, 2),
+            (Application.innovation_points, 1),
+            (Application.technical_details, 1),
+        )
+        score = sum(case((column.like(pattern, escape="\\"), weight), else_=0) for column, weight in weighted_columns)
+        condition = or_(*(column.like(pattern, escape="\\") for column, _ in weighted_columns))
+    
+    query = select(Application, score.label("score")).options(*APPLICATION_LOAD_OPTIONS).filter(condition)
+    if award_cycle_id:
+        query = query.filter(Application.award_cycle_id == award_cycle_id)
+    if applicant_unit_id:
+        query = query.filter(Application.applicant_unit_id == applicant_unit_id)
+    
+    result = await db.execute(query.order_by(score.desc(), Application.id.desc()).limit(limit))
+    return [(app, float(app_score)) for app, app_score in result]
+
+
+async def create_application(
+    db: AsyncSession, 
     app: ApplicationCreate,
     user_id: int
 ) -> Application:
     """创建申报"""
+    now = datetime.now()
     db_app = Application(
         **app.model_dump(),
         applicant_user_id=user_id,
-        submission_status=ApplicationStatus.DRAFT
+        submission_status=ApplicationStatus.DRAFT,
+        created_at=now,
+        created_date=now.date()
     )
     db.add(db_app)
-    db.commit()
-    db.refresh(db_app)
+    org_type = await db.scalar(select(Organization.org_type).filter(Organization.id == app.applicant_unit_id))
+    await statistics.record_application_created(db, db_app, org_type)
+    await db.commit()
+    await db.refresh(db_app, ["applicant_unit"])
     return db_app
 
 
-def update_application(
-    db: Session,
+async def bulk_create_applications(
+    db: AsyncSession,
+    apps: List[ApplicationCreate],
+    org_types: Dict[int, Optional[OrgType]],
+    user_id: int
+) -> int:
+    """
+    批量创建草稿申报（不提交），用于Excel导入
+    以一条 executemany 插入全部行，并按 单位类型×年度 汇总后计入统计
+    org_types: {申报单位ID: 单位类型}
+    """
+    if not apps:
+        return 0
+    now = datetime.now()
+    await db.execute(insert(Application), [
+        {
+            **app.model_dump(),
+            "applicant_user_id": user_id,
+            "submission_status": ApplicationStatus.DRAFT,
+            "created_at": now,
+            "updated_at": now,
+            "created_date": now.date()
+        }
+        for app in apps
+    ])
+    
+    counts: Dict[int, Dict[Tuple[Optional[OrgType], int], int]] = {}
+    for app in apps:
+        cycle_counts = counts.setdefault(app.award_cycle_id, {})
+        key = (org_types.get(app.applicant_unit_id), now.year)
+        cycle_counts[key] = cycle_counts.get(key, 0) + 1
+    for award_cycle_id, cycle_counts in counts.items():
+        await statistics.record_applications_created(db, award_cycle_id, ApplicationStatus.DRAFT, cycle_counts)
+    return len(apps)
+
+
+async def update_application(
+    db: AsyncSession,
     app_id: int,
     app_update: ApplicationUpdate
 ) -> Optional[Application]:
     """更新申报"""
-    db_app = get_application(db, app_id)
+    db_app = await get_application(db, app_id)
     if not db_app:
         return None
     
@@ -69,63 +206,56 @@ def update_application(
     for field, value in update_data.items():
         setattr(db_app, field, value)
     
-    db.commit()
-    db.refresh(db_app)
+    await db.commit()
+    await db.refresh(db_app)
     return db_app
 
 
-def submit_application(db: Session, app_id: int) -> Optional[Application]:
+async def submit_application(db: AsyncSession, app_id: int) -> Optional[Application]:
     """提交申报"""
-    db_app = get_application(db, app_id)
+    db_app = await get_application(db, app_id)
     if not db_app:
         return None
     
+    old_status = db_app.submission_status
     db_app.submission_status = ApplicationStatus.SUBMITTED
     db_app.submission_time = datetime.now()
-    db_app.current_stage = "已提交待推荐"
+    db_app.submission_date = db_app.submission_time.date()
+    db_app.current_stage = STAGE_LABELS[ApplicationStatus.SUBMITTED]
+    await statistics.record_status_change(db, db_app, old_status)
     
-    db.commit()
-    db.refresh(db_app)
+    await db.commit()
+    await db.refresh(db_app)
     return db_app
 
 
-def update_application_status(
-    db: Session,
+async def update_application_status(
+    db: AsyncSession,
     app_id: int,
     status: ApplicationStatus,
     note: Optional[str] = None
 ) -> Optional[Application]:
     """更新申报状态"""
-    db_app = get_application(db, app_id)
+    db_app = await get_application(db, app_id)
     if not db_app:
         return None
     
+    old_status = db_app.submission_status
     db_app.submission_status = status
+    await statistics.record_status_change(db, db_app, old_status)
     
     # 根据状态更新阶段说明
-    stage_mapping = {
-        ApplicationStatus.RECOMMENDED: "推荐通过待初审",
-        ApplicationStatus.PRELIMINARY_APPROVED: "初审通过待专家评审",
-        ApplicationStatus.PRELIMINARY_REJECTED: "初审不通过",
-        ApplicationStatus.EXPERT_REVIEW: "专家评审中",
-        ApplicationStatus.COMMITTEE_REVIEW: "评委会终审中",
-        ApplicationStatus.APPROVED: "终审通过",
-        ApplicationStatus.REJECTED: "终审不通过",
-        ApplicationStatus.ANNOUNCED: "公示中",
-        ApplicationStatus.ARCHIVED: "已归档"
-    }
-    
-    if status in stage_mapping:
-        db_app.current_stage = stage_mapping[status]
-    
-    db.commit()
-    db.refresh(db_app)
+    if status in STAGE_LABELS:
+        db_app.current_stage = STAGE_LABELS[status]
+    
+    await db.commit()
+    await db.refresh(db_app)
     return db_app
 
 
-def delete_application(db: Session, app_id: int) -> bool:
+async def delete_application(db: AsyncSession, app_id: int) -> bool:
     """删除申报"""
-    db_app = get_application(db, app_id)
+    db_app = await get_application(db, app_id)
     if not db_app:
         return False
     
@@ -133,37 +263,75 @@ def delete_application(db: Session, app_id: int) -> bool:
     if db_app.submission_status != ApplicationStatus.DRAFT:
         return False
     
-    db.delete(db_app)
-    db.commit()
+    # 附件随申报级联删除，先释放其内容引用
+    attachment_hashes = await db.scalars(
+        select(Attachment.sha256).filter(Attachment.application_id == app_id, Attachment.sha256.isnot(None))
+    )
+    await release_blobs(db, list(attachment_hashes))
+    await statistics.record_application_deleted(db, db_app)
+    
+    await db.delete(db_app)
+    await db.commit()
     return True
 
 
-def add_attachment(
-    db: Session,
+async def add_attachment(
+    db: AsyncSession,
     app_id: int,
     filename: str,
-    filepath: str,
+    upload_path: Path,
     file_type: str,
     file_size: int,
+    sha256: str,
     user_id: int,
     description: Optional[str] = None
 ) -> Attachment:
-    """添加附件"""
+    """
+    添加附件
+    
+    upload_path 为已写入临时目录的上传文件，入库时移入内容存储；
+    内容相同的文件共用一个存储块。同一申报下同名文件重复上传时版本号递增。
+    """
+    filepath = await acquire_blob(db, upload_path, sha256, file_size)
+    
+    latest_version = await db.scalar(
+        select(func.max(Attachment.version))
+        .filter(Attachment.application_id == app_id, Attachment.filename == filename)
+    )
+    
     db_attachment = Attachment(
         application_id=app_id,
         filename=filename,
         filepath=filepath,
         file_type=file_type,
         file_size=file_size,
+        sha256=sha256,
         uploaded_by=user_id,
-        description=description
+        description=description,
+        version=(latest_version or 0) + 1
     )
     db.add(db_attachment)
-    db.commit()
-    db.refresh(db_attachment)
+    await db.commit()
+    await db.refresh(db_attachment)
     return db_attachment
 
 
-def get_attachments(db: Session, app_id: int) -> List[Attachment]:
+async def delete_attachment(db: AsyncSession, app_id: int, attachment_id: int) -> bool:
+    """删除附件并释放其内容引用"""
+    db_attachment = await db.scalar(
+        select(Attachment).filter(Attachment.id == attachment_id, Attachment.application_id == app_id)
+    )
+    if not db_attachment:
+        return False
+    
+    if db_attachment.sha256:
+        await release_blobs(db, [db_attachment.sha256])
+    await db.delete(db_attachment)
+    await db.commit()
+    return True
+
+
+async def get_attachments(db: AsyncSession, app_id: int) -> List[Attachment]:
     """获取申报的所有附件"""
-    return db.query(Attachment).filter(Attachment.application_id == app_id).all()
+    result = await db.scalars(select(Attachment).filter(Attachment.application_id == app_id))
+    return list(result)
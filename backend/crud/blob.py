@@ -0,0 +1,141 @@
+"""
+CRUD操作 - 附件内容存储
+Blob store CRUD operations (reference counting, usage report, GC)
+"""
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Attachment, FileBlob
+from utils import blob_store
+
+# 孤儿文件扫描时每批查询的哈希数量
+GC_LOOKUP_BATCH_SIZE = 500
+
+
+async def _increment_ref(db: AsyncSession, sha256: str) -> bool:
+    """引用计数加一，返回记录是否存在"""
+    result = await db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == sha256)
+        .values(ref_count=FileBlob.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+async def acquire_blob(db: AsyncSession, temp_path: Path, sha256: str, file_size: int) -> str:
+    """
+    引用内容块：已存在则引用计数加一，否则新建记录；随后将临时文件移入存储
+    不提交事务，由调用方与附件记录一并提交
+    
+    先更新数据库再移动文件：垃圾回收删除记录时持有行锁，
+    这里的更新会等待其提交，从而不会引用到正在被删除的文件
+    Returns: 存储路径
+    """
+    if not await _increment_ref(db, sha256):
+        try:
+            async with db.begin_nested():
+                db.add(FileBlob(
+                    sha256=sha256,
+                    file_size=file_size,
+                    filepath=str(blob_store.blob_path(sha256)),
+                    ref_count=1
+                ))
+        except IntegrityError:
+            # 并发上传相同内容，对方已插入
+            await _increment_ref(db, sha256)
+    
+    await run_in_threadpool(blob_store.place_blob, temp_path, sha256)
+    return str(blob_store.blob_path(sha256))
+
+
+async def release_blobs(db: AsyncSession, sha256_list: List[str]) -> None:
+    """释放内容块引用（不提交），文件由垃圾回收统一清理"""
+    for sha256 in sha256_list:
+        await db.execute(
+            update(FileBlob)
+            .where(FileBlob.sha256 == sha256, FileBlob.ref_count > 0)
+            .values(ref_count=FileBlob.ref_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def get_storage_usage(db: AsyncSession) -> Dict[str, Any]:
+    """附件存储占用统计"""
+    blob_count, blob_bytes = (await db.execute(
+        select(func.count(FileBlob.sha256), func.coalesce(func.sum(FileBlob.file_size), 0))
+    )).one()
+    unreferenced_count, unreferenced_bytes = (await db.execute(
+        select(func.count(FileBlob.sha256), func.coalesce(func.sum(FileBlob.file_size), 0))
+        .filter(FileBlob.ref_count <= 0)
+    )).one()
+    attachment_count, logical_bytes = (await db.execute(
+        select(func.count(Attachment.id), func.coalesce(func.sum(Attachment.file_size), 0))
+        .join(FileBlob, FileBlob.sha256 == Attachment.sha256)
+    )).one()
+    
+    return {
+        "blob_count": blob_count,
+        "blob_bytes": blob_bytes,
+        "attachment_count": attachment_count,
+        "logical_bytes": logical_bytes,
+        "saved_bytes": logical_bytes - (blob_bytes - unreferenced_bytes),
+        "unreferenced_count": unreferenced_count,
+        "unreferenced_bytes": unreferenced_bytes
+    }
+
+
+async def collect_garbage(db: AsyncSession, grace_seconds: int = 3600, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    回收附件存储空间
+    
+    1. 删除引用计数为0的内容块记录及文件（逐条提交，删除期间持有行锁）
+    2. 删除没有对应记录的孤儿文件（如入库失败的上传），仅处理超过 grace_seconds 的文件
+    3. 删除超过 grace_seconds 的上传临时文件
+    """
+    stats = {"blobs": 0, "blob_bytes": 0, "orphans": 0, "orphan_bytes": 0, "temp_files": 0, "temp_bytes": 0}
+    
+    unreferenced = (await db.execute(
+        select(FileBlob.sha256, FileBlob.file_size).filter(FileBlob.ref_count <= 0)
+    )).all()
+    for sha256, file_size in unreferenced:
+        if not dry_run:
+            result = await db.execute(
+                delete(FileBlob)
+                .where(FileBlob.sha256 == sha256, FileBlob.ref_count <= 0)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                continue
+            await run_in_threadpool(blob_store.remove_blob, sha256)
+            await db.commit()
+        stats["blobs"] += 1
+        stats["blob_bytes"] += file_size or 0
+    
+    deadline = time.time() - grace_seconds
+    candidates = await run_in_threadpool(
+        lambda: [(sha256, path, stat.st_size) for sha256, path, stat in blob_store.iter_blob_files()
+                 if stat.st_mtime < deadline]
+    )
+    for offset in range(0, len(candidates), GC_LOOKUP_BATCH_SIZE):
+        batch = candidates[offset:offset + GC_LOOKUP_BATCH_SIZE]
+        known = set(await db.scalars(
+            select(FileBlob.sha256).filter(FileBlob.sha256.in_([sha256 for sha256, _, _ in batch]))
+        ))
+        for sha256, path, size in batch:
+            if sha256 in known:
+                continue
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            stats["orphans"] += 1
+            stats["orphan_bytes"] += size
+    
+    stats["temp_files"], stats["temp_bytes"] = await run_in_threadpool(
+        blob_store.remove_stale_temp_files, grace_seconds, dry_run
+    )
+    return stats
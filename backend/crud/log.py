@@ -0,0 +1,31 @@
+"""
+CRUD操作 - 操作日志
+Audit log queries
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Log
+from utils.pagination import paginate_keyset
+
+
+async def get_logs_page(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    按时间范围游标分页查询日志（按时间倒序）
+    查询始终带 created_at 范围条件，MySQL 只读取范围内的月分区
+    """
+    query = select(Log).filter(Log.created_at >= start, Log.created_at < end)
+    if user_id is not None:
+        query = query.filter(Log.user_id == user_id)
+    if action_type:
+        query = query.filter(Log.action_type == action_type)
+    return await paginate_keyset(db, query, Log, limit, cursor)
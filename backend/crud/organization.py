@@ -2,79 +2,98 @@
 CRUD操作 - 组织管理
 Organization CRUD operations
 """
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, Optional, List, Tuple
 from models import Organization, OrgType
 from schemas import OrganizationCreate, OrganizationUpdate
+from crud import statistics
 
 
-def get_organization(db: Session, org_id: int) -> Optional[Organization]:
+async def get_organization(db: AsyncSession, org_id: int) -> Optional[Organization]:
     """根据ID获取组织"""
-    return db.query(Organization).filter(Organization.id == org_id).first()
+    return await db.scalar(select(Organization).filter(Organization.id == org_id))
 
 
-def get_organization_by_name(db: Session, name: str) -> Optional[Organization]:
+async def get_organization_by_name(db: AsyncSession, name: str) -> Optional[Organization]:
     """根据名称获取组织"""
-    return db.query(Organization).filter(Organization.name == name).first()
+    return await db.scalar(select(Organization).filter(Organization.name == name))
 
 
-def get_organization_by_code(db: Session, code: str) -> Optional[Organization]:
+async def get_organization_by_code(db: AsyncSession, code: str) -> Optional[Organization]:
     """根据代码获取组织"""
-    return db.query(Organization).filter(Organization.code == code).first()
+    return await db.scalar(select(Organization).filter(Organization.code == code))
 
 
-def get_organizations(
-    db: Session,
+async def get_organizations_by_names(
+    db: AsyncSession,
+    names: Iterable[str]
+) -> Dict[str, Tuple[int, Optional[OrgType]]]:
+    """按名称批量查询组织（一次查询） Returns: {名称: (ID, 单位类型)}，不存在的名称不在结果中"""
+    names = set(names)
+    if not names:
+        return {}
+    result = await db.execute(
+        select(Organization.name, Organization.id, Organization.org_type).filter(Organization.name.in_(names))
+    )
+    return {name: (org_id, org_type) for name, org_id, org_type in result}
+
+
+async def get_organizations(
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
     org_type: Optional[OrgType] = None,
     name: Optional[str] = None
 ) -> List[Organization]:
     """获取组织列表"""
-    query = db.query(Organization)
+    query = select(Organization)
     
     if org_type:
         query = query.filter(Organization.org_type == org_type)
     if name:
         query = query.filter(Organization.name.contains(name))
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.scalars(query.offset(skip).limit(limit))
+    return list(result)
 
 
-def create_organization(db: Session, org: OrganizationCreate) -> Organization:
+async def create_organization(db: AsyncSession, org: OrganizationCreate) -> Organization:
     """创建组织"""
     db_org = Organization(**org.model_dump())
     db.add(db_org)
-    db.commit()
-    db.refresh(db_org)
+    await db.commit()
+    await db.refresh(db_org)
     return db_org
 
 
-def update_organization(
-    db: Session, 
+async def update_organization(
+    db: AsyncSession, 
     org_id: int, 
     org_update: OrganizationUpdate
 ) -> Optional[Organization]:
     """更新组织"""
-    db_org = get_organization(db, org_id)
+    db_org = await get_organization(db, org_id)
     if not db_org:
         return None
     
     update_data = org_update.model_dump(exclude_unset=True)
+    if "org_type" in update_data:
+        await statistics.record_org_type_change(db, org_id, db_org.org_type, update_data["org_type"])
     for field, value in update_data.items():
         setattr(db_org, field, value)
     
-    db.commit()
-    db.refresh(db_org)
+    await db.commit()
+    await db.refresh(db_org)
     return db_org
 
 
-def delete_organization(db: Session, org_id: int) -> bool:
+async def delete_organization(db: AsyncSession, org_id: int) -> bool:
     """删除组织"""
-    db_org = get_organization(db, org_id)
+    db_org = await get_organization(db, org_id)
     if not db_org:
         return False
     
-    db.delete(db_org)
-    db.commit()
+    await db.delete(db_org)
+    await db.commit()
     return True
@@ -2,59 +2,106 @@
 CRUD操作 - 评审管理
 Review CRUD operations
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional, List, Dict, Any
+import math
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from models import Review, Application, ApplicationStatus
+from models import Review, Application, ApplicationStatus, User, UserRole
 from schemas import ReviewCreate, ReviewUpdate
+from utils.assignment import ApplicationSlot, AssignmentPlan, ExpertSlot, parse_categories, plan_assignments
+from utils.pagination import paginate_keyset
 
+# ReviewResponse 内嵌专家及其组织；同一专家的评审会重复出现，专家用 selectinload 去重，组织随专家 joinedload
+REVIEW_LOAD_OPTIONS = (selectinload(Review.expert).joinedload(User.organization),)
 
-def get_review(db: Session, review_id: int) -> Optional[Review]:
+
+async def get_review(db: AsyncSession, review_id: int) -> Optional[Review]:
     """根据ID获取评审"""
-    return db.query(Review).filter(Review.id == review_id).first()
+    return await db.scalar(
+        select(Review).options(*REVIEW_LOAD_OPTIONS).filter(Review.id == review_id)
+    )
 
 
-def get_review_by_expert_and_app(
-    db: Session,
+async def _get_review_for_update(db: AsyncSession, review_id: int) -> Optional[Review]:
+    """
+    加锁读取评审（覆盖会话中已加载的旧状态）
+    修改状态或总分前须先锁评审行，并发提交/修改同一评审时后者读到前者提交后的状态与总分，
+    避免重复计分或扣减同一旧分数；加锁顺序为评审、申报
+    """
+    return await db.scalar(
+        select(Review).options(*REVIEW_LOAD_OPTIONS).filter(Review.id == review_id)
+        .with_for_update().execution_options(populate_existing=True)
+    )
+
+
+async def get_review_by_expert_and_app(
+    db: AsyncSession,
     expert_id: int,
     app_id: int
 ) -> Optional[Review]:
     """获取专家对某申报的评审"""
-    return db.query(Review).filter(
+    return await db.scalar(select(Review).options(*REVIEW_LOAD_OPTIONS).filter(
         Review.expert_id == expert_id,
         Review.application_id == app_id
-    ).first()
+    ))
 
 
-def get_reviews_by_expert(
-    db: Session,
+async def get_reviews_by_expert(
+    db: AsyncSession,
     expert_id: int,
     skip: int = 0,
     limit: int = 100
 ) -> List[Review]:
     """获取专家的所有评审"""
-    return db.query(Review).filter(
+    result = await db.scalars(select(Review).options(*REVIEW_LOAD_OPTIONS).filter(
         Review.expert_id == expert_id
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))
+    return list(result)
+
 
+async def get_reviews_by_expert_page(
+    db: AsyncSession,
+    expert_id: int,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """游标分页获取专家的评审"""
+    query = select(Review).options(*REVIEW_LOAD_OPTIONS).filter(Review.expert_id == expert_id)
+    return await paginate_keyset(db, query, Review, limit, cursor)
 
-def get_reviews_by_application(
-    db: Session,
+
+async def get_reviews_by_application(
+    db: AsyncSession,
     app_id: int
 ) -> List[Review]:
     """获取某申报的所有评审"""
-    return db.query(Review).filter(
+    result = await db.scalars(select(Review).options(*REVIEW_LOAD_OPTIONS).filter(
         Review.application_id == app_id
-    ).all()
+    ))
+    return list(result)
 
 
-def create_review(
-    db: Session,
+async def create_review(
+    db: AsyncSession,
     review: ReviewCreate,
     expert_id: int
 ) -> Review:
-    """创建评审"""
+    """创建评审；专家对该申报已有评审（如已分配）时更新该评审"""
+    existing = await get_review_by_expert_and_app(db, expert_id, review.application_id)
+    if existing:
+        if existing.status == "pending":
+            existing.status = "draft"
+        return await update_review(db, existing.id, ReviewUpdate(
+            scores_json=review.scores_json,
+            total_score=review.total_score,
+            comment=review.comment
+        ))
+    
     db_review = Review(
         application_id=review.application_id,
         expert_id=expert_id,
@@ -64,90 +111,204 @@ def create_review(
         status="draft"
     )
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
-    return db_review
+    await db.commit()
+    return await get_review(db, db_review.id)
 
 
-def update_review(
-    db: Session,
+async def update_review(
+    db: AsyncSession,
     review_id: int,
     review_update: ReviewUpdate
 ) -> Optional[Review]:
     """更新评审"""
-    db_review = get_review(db, review_id)
+    db_review = await _get_review_for_update(db, review_id)
     if not db_review:
         return None
     
+    old_score = db_review.total_score
     update_data = review_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_review, field, value)
     
-    db.commit()
-    db.refresh(db_review)
+    # 已提交的评审修改总分时同步调整评分聚合
+    if db_review.status == "submitted" and db_review.total_score != old_score:
+        await _replace_score(db, db_review.application_id, old_score, db_review.total_score)
+    
+    await db.commit()
+    await db.refresh(db_review)
     return db_review
 
 
-def submit_review(db: Session, review_id: int) -> Optional[Review]:
-    """提交评审"""
-    db_review = get_review(db, review_id)
+async def submit_review(db: AsyncSession, review_id: int) -> Optional[Review]:
+    """提交评审，评审状态与申报评分聚合在同一事务中更新"""
+    db_review = await _get_review_for_update(db, review_id)
     if not db_review:
         return None
     
+    first_submission = db_review.status != "submitted"
     db_review.status = "submitted"
     db_review.submitted_at = datetime.now()
     
-    db.commit()
-    db.refresh(db_review)
-    
-    # 更新申报的评分汇总
-    update_application_scores(db, db_review.application_id)
+    # 重复提交不重复计分
+    if first_submission and db_review.total_score is not None:
+        await _replace_score(db, db_review.application_id, None, db_review.total_score)
     
+    await db.commit()
     return db_review
 
 
-def update_application_scores(db: Session, app_id: int) -> None:
-    """更新申报的评分汇总"""
-    reviews = get_reviews_by_application(db, app_id)
+def build_score_summary(
+    count: int,
+    total: float,
+    sum_sq: float,
+    min_score: Optional[float],
+    max_score: Optional[float]
+) -> Optional[Dict[str, Any]]:
+    """由评分聚合派生评分汇总"""
+    if not count:
+        return None
     
-    if not reviews:
-        return
+    average = total / count
+    variance = max(sum_sq / count - average * average, 0.0)
+    return {
+        "average_score": round(average, 2),
+        "review_count": count,
+        "max_score": max_score,
+        "min_score": min_score,
+        "std_dev": round(math.sqrt(variance), 2)
+    }
+
+
+def _set_score_summary(application: Application) -> None:
+    """刷新申报的评分汇总JSON"""
+    application.score_summary_json = build_score_summary(
+        application.score_count,
+        application.score_sum,
+        application.score_sum_sq,
+        application.score_min,
+        application.score_max
+    )
+
+
+async def _replace_score(
+    db: AsyncSession,
+    app_id: int,
+    old_score: Optional[float],
+    new_score: Optional[float]
+) -> None:
+    """
+    增量更新申报的评分聚合（不提交）
+    old_score 为 None 表示新增一个评分，new_score 为 None 表示移除一个评分
     
-    # 只统计已提交的评审
-    submitted_reviews = [r for r in reviews if r.status == "submitted"]
+    申报行加锁后读改写，并发提交同一申报的评审时按顺序累加
+    """
+    application = await db.scalar(
+        select(Application).filter(Application.id == app_id).with_for_update()
+    )
+    if not application:
+        return
     
-    if not submitted_reviews:
+    # 被替换的分数恰为最高/最低分时无法增量得出新的极值，退回全量重算
+    if old_score is not None and old_score in (application.score_min, application.score_max):
+        await db.flush()
+        await _recalculate_scores(db, application)
         return
     
-    # 计算平均分
-    total_scores = [r.total_score for r in submitted_reviews if r.total_score]
-    
-    if total_scores:
-        avg_score = sum(total_scores) / len(total_scores)
-        
-        score_summary = {
-            "average_score": round(avg_score, 2),
-            "review_count": len(submitted_reviews),
-            "scores": total_scores,
-            "max_score": max(total_scores),
-            "min_score": min(total_scores)
-        }
-        
-        # 更新申报的评分汇总
-        application = db.query(Application).filter(Application.id == app_id).first()
-        if application:
-            application.score_summary_json = score_summary
-            db.commit()
-
-
-def assign_expert_to_application(
-    db: Session,
+    if old_score is not None:
+        application.score_count -= 1
+        application.score_sum -= old_score
+        application.score_sum_sq -= old_score * old_score
+    if new_score is not None:
+        application.score_count += 1
+        application.score_sum += new_score
+        application.score_sum_sq += new_score * new_score
+        application.score_min = new_score if application.score_min is None else min(application.score_min, new_score)
+        application.score_max = new_score if application.score_max is None else max(application.score_max, new_score)
+    
+    _set_score_summary(application)
+
+
+async def _recalculate_scores(db: AsyncSession, application: Application) -> None:
+    """根据已提交的评审全量重算评分聚合（不提交）"""
+    count, total, sum_sq, min_score, max_score = (await db.execute(
+        select(
+            func.count(Review.total_score),
+            func.coalesce(func.sum(Review.total_score), 0),
+            func.coalesce(func.sum(Review.total_score * Review.total_score), 0),
+            func.min(Review.total_score),
+            func.max(Review.total_score)
+        ).filter(
+            Review.application_id == application.id,
+            Review.status == "submitted",
+            Review.total_score.isnot(None)
+        )
+    )).one()
+    
+    application.score_count = count
+    application.score_sum = total
+    application.score_sum_sq = sum_sq
+    application.score_min = min_score
+    application.score_max = max_score
+    _set_score_summary(application)
+
+
+async def update_application_scores(db: AsyncSession, app_id: int) -> None:
+    """全量重算申报的评分汇总（用于数据修复或迁移后回填）"""
+    application = await db.scalar(
+        select(Application).filter(Application.id == app_id).with_for_update()
+    )
+    if application:
+        await _recalculate_scores(db, application)
+        await db.commit()
+
+
+def backfill_application_scores(conn: Connection, application_ids: Optional[List[int]] = None) -> None:
+    """
+    根据已提交的评审批量重算评分聚合与汇总（同步连接，用于迁移回填）
+    application_ids 为 None 时重算全部申报
+    """
+    # 相关子查询写法，MySQL与SQLite通用
+    submitted = "FROM reviews r WHERE r.application_id = applications.id " \
+                "AND r.status = 'submitted' AND r.total_score IS NOT NULL"
+    statement = text(f"""
+        UPDATE applications SET
+            score_count = (SELECT COUNT(r.total_score) {submitted}),
+            score_sum = COALESCE((SELECT SUM(r.total_score) {submitted}), 0),
+            score_sum_sq = COALESCE((SELECT SUM(r.total_score * r.total_score) {submitted}), 0),
+            score_min = (SELECT MIN(r.total_score) {submitted}),
+            score_max = (SELECT MAX(r.total_score) {submitted})
+        {"WHERE applications.id IN :ids" if application_ids is not None else ""}
+    """)
+    if application_ids is not None:
+        if not application_ids:
+            return
+        conn.execute(statement.bindparams(bindparam("ids", expanding=True)), {"ids": list(application_ids)})
+        # 指定的申报评分可能已减为0，汇总一并重置
+        condition = Application.id.in_(application_ids)
+    else:
+        conn.execute(statement)
+        condition = Application.score_count > 0
+    
+    rows = conn.execute(select(
+        Application.id, Application.score_count, Application.score_sum,
+        Application.score_sum_sq, Application.score_min, Application.score_max
+    ).filter(condition)).all()
+    for app_id, *aggregates in rows:
+        conn.execute(
+            Application.__table__.update()
+            .where(Application.id == app_id)
+            .values(score_summary_json=build_score_summary(*aggregates))
+        )
+
+
+async def assign_expert_to_application(
+    db: AsyncSession,
     app_id: int,
     expert_id: int
 ) -> Review:
     """分配专家评审申报"""
     # 检查是否已分配
-    existing = get_review_by_expert_and_app(db, expert_id, app_id)
+    existing = await get_review_by_expert_and_app(db, expert_id, app_id)
     if existing:
         return existing
     
@@ -158,30 +319,133 @@ def assign_expert_to_application(
         status="pending"
     )
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 并发分配同一专家，唯一索引保证只有一条
+        await db.rollback()
+        return await get_review_by_expert_and_app(db, expert_id, app_id)
+    await db.refresh(db_review)
     return db_review
 
 
-def get_application_score_summary(db: Session, app_id: int) -> Optional[Dict[str, Any]]:
-    """获取申报的评分汇总"""
-    reviews = get_reviews_by_application(db, app_id)
-    submitted_reviews = [r for r in reviews if r.status == "submitted"]
+# 可批量分配专家的申报状态
+ASSIGNABLE_STATUSES = (ApplicationStatus.PRELIMINARY_APPROVED, ApplicationStatus.EXPERT_REVIEW)
+
+
+async def _plan_bulk_assignment(
+    db: AsyncSession,
+    award_cycle_id: int,
+    experts_per_application: int
+) -> Tuple[List[ApplicationSlot], List[ExpertSlot], AssignmentPlan]:
+    """按当前的申报、专家及已有分配计算批量分配方案"""
+    applications = (await db.execute(
+        select(Application.id, Application.applicant_unit_id, Application.category).filter(
+            Application.award_cycle_id == award_cycle_id,
+            Application.submission_status.in_(ASSIGNABLE_STATUSES)
+        )
+    )).all()
+    experts = (await db.execute(
+        select(User.id, User.organization_id, User.expert_categories).filter(
+            User.role == UserRole.EXPERT,
+            User.is_active == True
+        )
+    )).all()
+    existing = (await db.execute(
+        select(Review.application_id, Review.expert_id)
+        .join(Application, Application.id == Review.application_id)
+        .filter(Application.award_cycle_id == award_cycle_id)
+    )).all()
     
-    if not submitted_reviews:
-        return None
+    assigned: Dict[int, set] = {}
+    loads: Dict[int, int] = {}
+    for app_id, expert_id in set(existing):
+        assigned.setdefault(app_id, set()).add(expert_id)
+        loads[expert_id] = loads.get(expert_id, 0) + 1
     
-    total_scores = [r.total_score for r in submitted_reviews if r.total_score]
+    app_slots = [
+        ApplicationSlot(
+            id=app_id,
+            organization_id=org_id,
+            category=category,
+            needed=max(experts_per_application - len(assigned.get(app_id, ())), 0),
+            assigned=assigned.get(app_id, set())
+        )
+        for app_id, org_id, category in applications
+    ]
+    expert_slots = [
+        ExpertSlot(id=expert_id, organization_id=org_id, categories=parse_categories(categories),
+                   load=loads.get(expert_id, 0))
+        for expert_id, org_id, categories in experts
+    ]
     
-    if not total_scores:
-        return None
+    # 分配计算为纯CPU操作，放到线程池中执行
+    plan = await run_in_threadpool(plan_assignments, app_slots, expert_slots)
+    return app_slots, expert_slots, plan
+
+
+async def bulk_assign_experts(
+    db: AsyncSession,
+    award_cycle_id: int,
+    experts_per_application: int,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    批量分配专家评审
     
+    为轮次内待评审的申报补足 experts_per_application 名专家：工作量均衡、
+    回避申报单位本单位专家、按申报类别匹配专家擅长类别。
+    已有的分配计入专家工作量且不会重复分配；全部评审记录一次批量插入。
+    与单个分配并发冲突时按最新的分配重新计算一次，再次冲突时抛出 IntegrityError。
+    """
+    for attempt in range(2):
+        app_slots, expert_slots, plan = await _plan_bulk_assignment(db, award_cycle_id, experts_per_application)
+        if not plan.pairs or dry_run:
+            break
+        now = datetime.now()
+        try:
+            await db.execute(insert(Review), [
+                {"application_id": app_id, "expert_id": expert_id, "status": "pending", "created_at": now}
+                for app_id, expert_id in plan.pairs
+            ])
+            await db.commit()
+            break
+        except IntegrityError:
+            # 并发的单个分配已插入同一专家与申报，按最新的分配重新计算一次，仍冲突时由调用方处理
+            await db.rollback()
+            if attempt:
+                raise
+    
+    active_loads = list(plan.loads.values())
     return {
-        "average_score": round(sum(total_scores) / len(total_scores), 2),
-        "review_count": len(submitted_reviews),
-        "total_assigned": len(reviews),
-        "scores": total_scores,
-        "max_score": max(total_scores),
-        "min_score": min(total_scores),
-        "median_score": sorted(total_scores)[len(total_scores) // 2]
+        "applications": len(app_slots),
+        "experts": len(expert_slots),
+        "assigned": len(plan.pairs),
+        "max_load": max(active_loads, default=0),
+        "min_load": min(active_loads, default=0),
+        "shortfall": plan.shortfall,
+        "dry_run": dry_run
     }
+
+
+async def get_application_score_summary(db: AsyncSession, app_id: int) -> Optional[Dict[str, Any]]:
+    """获取申报的评分汇总（读取评分聚合，单次查询）"""
+    total_assigned = select(func.count(Review.id))\
+        .filter(Review.application_id == app_id)\
+        .scalar_subquery()
+    row = (await db.execute(select(
+        Application.score_count,
+        Application.score_sum,
+        Application.score_sum_sq,
+        Application.score_min,
+        Application.score_max,
+        total_assigned
+    ).filter(Application.id == app_id))).first()
+    
+    if not row:
+        return None
+    
+    summary = build_score_summary(*row[:5])
+    if summary:
+        summary["total_assigned"] = row[5]
+    return summary
@@ -0,0 +1,223 @@
+"""
+CRUD操作 - 申报统计汇总
+Application statistics counters (application_stats)
+
+application_stats 按 轮次×状态×单位类型×年度 记录申报数，
+由申报的创建、提交、状态变更、删除及单位类型变更在各自事务中增量维护，
+统计接口只需读取少量汇总行，无需扫描申报表。
+
+时间序列统计按已存储的 created_date / submission_date 做索引范围扫描并按日分组，
+年/月/周由 utils.time_buckets 归并。
+"""
+from datetime import date
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from sqlalchemy import Date, Delete, Insert, Update, and_, delete, extract, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Application, ApplicationStat, ApplicationStatus, Organization, OrgType
+
+# 单位类型为空时计入"其他"
+DEFAULT_ORG_TYPE = OrgType.OTHER
+
+# 时间序列可统计的日期字段
+DATE_FIELDS = {
+    "created": Application.created_date,
+    "submitted": Application.submission_date,
+}
+
+
+def stat_org_type(org_type: Optional[OrgType]) -> OrgType:
+    """汇总使用的单位类型"""
+    return org_type or DEFAULT_ORG_TYPE
+
+
+def _applicant_org_type(app: Application) -> OrgType:
+    """已加载 applicant_unit 的申报计入的单位类型，申报单位不存在时计入"其他"，与重建一致"""
+    return stat_org_type(app.applicant_unit.org_type if app.applicant_unit else None)
+
+
+def rebuild_statements() -> Tuple[Delete, Insert]:
+    """
+    由申报表重建汇总表的语句（清空后按分组插入）
+    同步连接（迁移、初始化脚本）与异步会话共用；申报单位不存在时与增量维护一致计入"其他"
+    """
+    org_type = func.coalesce(Organization.org_type, literal(DEFAULT_ORG_TYPE, ApplicationStat.org_type.type))
+    year = extract("year", Application.created_at)
+    source = select(
+        Application.award_cycle_id,
+        Application.submission_status,
+        org_type,
+        year,
+        func.count(Application.id)
+    ).outerjoin(Organization, Organization.id == Application.applicant_unit_id)\
+     .group_by(Application.award_cycle_id, Application.submission_status, org_type, year)
+    
+    return (
+        delete(ApplicationStat),
+        insert(ApplicationStat).from_select(
+            ["award_cycle_id", "submission_status", "org_type", "year", "count"], source
+        )
+    )
+
+
+def date_backfill_statement() -> Update:
+    """补齐未写入的 created_date / submission_date（脚本直接插入的申报、迁移回填）"""
+    return update(Application).where(or_(
+        and_(Application.created_date.is_(None), Application.created_at.isnot(None)),
+        and_(Application.submission_date.is_(None), Application.submission_time.isnot(None))
+    )).values(
+        created_date=func.coalesce(Application.created_date, func.date(Application.created_at, type_=Date)),
+        submission_date=func.coalesce(Application.submission_date, func.date(Application.submission_time, type_=Date))
+    ).execution_options(synchronize_session=False)
+
+
+async def _adjust(
+    db: AsyncSession,
+    award_cycle_id: int,
+    status: ApplicationStatus,
+    org_type: OrgType,
+    year: int,
+    delta: int
+) -> None:
+    """调整一个汇总行的计数（不提交），行不存在时新建"""
+    def increment():
+        return db.execute(
+            update(ApplicationStat)
+            .where(
+                ApplicationStat.award_cycle_id == award_cycle_id,
+                ApplicationStat.submission_status == status,
+                ApplicationStat.org_type == org_type,
+                ApplicationStat.year == year
+            )
+            .values(count=ApplicationStat.count + delta)
+            .execution_options(synchronize_session=False)
+        )
+    
+    if (await increment()).rowcount > 0 or delta < 0:
+        return
+    try:
+        async with db.begin_nested():
+            db.add(ApplicationStat(
+                award_cycle_id=award_cycle_id,
+                submission_status=status,
+                org_type=org_type,
+                year=year,
+                count=delta
+            ))
+    except IntegrityError:
+        # 并发事务已插入该行
+        await increment()
+
+
+async def record_application_created(db: AsyncSession, app: Application, org_type: Optional[OrgType]) -> None:
+    """新建申报计入汇总（不提交）"""
+    await _adjust(db, app.award_cycle_id, app.submission_status, stat_org_type(org_type), app.created_at.year, 1)
+
+
+async def record_applications_created(
+    db: AsyncSession,
+    award_cycle_id: int,
+    status: ApplicationStatus,
+    counts: Mapping[Tuple[Optional[OrgType], int], int]
+) -> None:
+    """批量新建的申报计入汇总（不提交） counts: {(单位类型, 年度): 申报数}"""
+    merged: Dict[Tuple[OrgType, int], int] = {}
+    for (org_type, year), count in counts.items():
+        key = (stat_org_type(org_type), year)
+        merged[key] = merged.get(key, 0) + count
+    for (org_type, year), count in merged.items():
+        await _adjust(db, award_cycle_id, status, org_type, year, count)
+
+
+async def record_application_deleted(db: AsyncSession, app: Application) -> None:
+    """删除申报从汇总中扣除（不提交），app.applicant_unit 须已加载"""
+    await _adjust(
+        db, app.award_cycle_id, app.submission_status,
+        _applicant_org_type(app), app.created_at.year, -1
+    )
+
+
+async def record_status_change(db: AsyncSession, app: Application, old_status: ApplicationStatus) -> None:
+    """申报状态变更后移动计数（不提交），app.applicant_unit 须已加载"""
+    if old_status == app.submission_status:
+        return
+    org_type = _applicant_org_type(app)
+    year = app.created_at.year
+    await _adjust(db, app.award_cycle_id, old_status, org_type, year, -1)
+    await _adjust(db, app.award_cycle_id, app.submission_status, org_type, year, 1)
+
+
+async def record_org_type_change(
+    db: AsyncSession,
+    org_id: int,
+    old_type: Optional[OrgType],
+    new_type: Optional[OrgType]
+) -> None:
+    """单位类型变更后将其申报计数移到新类型下（不提交）"""
+    old_type, new_type = stat_org_type(old_type), stat_org_type(new_type)
+    if old_type == new_type:
+        return
+    year = extract("year", Application.created_at)
+    groups = await db.execute(
+        select(Application.award_cycle_id, Application.submission_status, year, func.count(Application.id))
+        .filter(Application.applicant_unit_id == org_id)
+        .group_by(Application.award_cycle_id, Application.submission_status, year)
+    )
+    for award_cycle_id, status, app_year, count in groups.all():
+        await _adjust(db, award_cycle_id, status, old_type, int(app_year), -count)
+        await _adjust(db, award_cycle_id, status, new_type, int(app_year), count)
+
+
+async def rebuild_application_stats(db: AsyncSession) -> int:
+    """补齐日期字段并由申报表全量重建汇总表，提交后返回汇总行数"""
+    await db.execute(date_backfill_statement())
+    for statement in rebuild_statements():
+        await db.execute(statement)
+    await db.commit()
+    return await db.scalar(select(func.count()).select_from(ApplicationStat))
+
+
+async def count_applications_by(
+    db: AsyncSession,
+    column: Any,
+    award_cycle_id: Optional[int] = None
+) -> List[Tuple[Any, int]]:
+    """
+    按汇总维度统计申报数
+    column 为 ApplicationStat 的维度列（submission_status / org_type / year / award_cycle_id）
+    Returns: [(维度值, 申报数)]，按维度值排序，不含计数为0的分组
+    """
+    total = func.sum(ApplicationStat.count)
+    query = select(column, total).group_by(column).having(total > 0).order_by(column)
+    if award_cycle_id:
+        query = query.filter(ApplicationStat.award_cycle_id == award_cycle_id)
+    result = await db.execute(query)
+    return [(key, int(count)) for key, count in result]
+
+
+async def count_applications(db: AsyncSession, award_cycle_id: Optional[int] = None) -> int:
+    """申报总数"""
+    query = select(func.coalesce(func.sum(ApplicationStat.count), 0))
+    if award_cycle_id:
+        query = query.filter(ApplicationStat.award_cycle_id == award_cycle_id)
+    return int(await db.scalar(query))
+
+
+async def count_applications_by_date(
+    db: AsyncSession,
+    field: str,
+    start: date,
+    end: date,
+    award_cycle_id: Optional[int] = None
+) -> List[Tuple[date, int]]:
+    """
+    按日统计 [start, end] 内的申报数
+    field 为 DATE_FIELDS 的键（created / submitted）
+    Returns: [(日期, 申报数)]，只含有数据的日期
+    """
+    column = DATE_FIELDS[field]
+    query = select(column, func.count()).filter(column >= start, column <= end)
+    if award_cycle_id:
+        query = query.filter(Application.award_cycle_id == award_cycle_id)
+    result = await db.execute(query.group_by(column).order_by(column))
+    return [(day, count) for day, count in result]
@@ -2,14 +2,22 @@
 CRUD操作 - 用户管理
 User CRUD operations
 """
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import Select, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import Optional, List, Dict, Any, Collection, Set, Tuple
 from models import User, UserRole
 from schemas import UserCreate, UserUpdate
 from passlib.context import CryptContext
+from utils.cache import user_cache
+from utils.password_pool import password_pool
+from utils.pagination import paginate_keyset
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# UserResponse 内嵌所属组织，多对一关系使用 joinedload 在同一查询中取回
+USER_LOAD_OPTIONS = (joinedload(User.organization),)
+
 
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
@@ -21,32 +29,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
-def get_user(db: Session, user_id: int) -> Optional[User]:
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
     """根据ID获取用户"""
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.scalar(
+        select(User).options(*USER_LOAD_OPTIONS).filter(User.id == user_id)
+    )
 
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """根据用户名获取用户"""
-    return db.query(User).filter(User.username == username).first()
+    return await db.scalar(
+        select(User).options(*USER_LOAD_OPTIONS).filter(User.username == username)
+    )
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """根据邮箱获取用户"""
-    return db.query(User).filter(User.email == email).first()
+    return await db.scalar(select(User).filter(User.email == email))
 
 
-def get_users(
-    db: Session, 
-    skip: int = 0, 
-    limit: int = 100,
+def _users_query(
     role: Optional[UserRole] = None,
     username: Optional[str] = None,
     real_name: Optional[str] = None,
     organization_id: Optional[int] = None
-) -> List[User]:
-    """获取用户列表"""
-    query = db.query(User)
+) -> Select:
+    """构建用户列表查询"""
+    query = select(User).options(*USER_LOAD_OPTIONS)
     
     if role:
         query = query.filter(User.role == role)
@@ -57,12 +66,41 @@ def get_users(
     if organization_id:
         query = query.filter(User.organization_id == organization_id)
     
-    return query.offset(skip).limit(limit).all()
+    return query
+
+
+async def get_users(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    role: Optional[UserRole] = None,
+    username: Optional[str] = None,
+    real_name: Optional[str] = None,
+    organization_id: Optional[int] = None
+) -> List[User]:
+    """获取用户列表"""
+    query = _users_query(role, username, real_name, organization_id)
+    result = await db.scalars(query.offset(skip).limit(limit))
+    return list(result)
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+async def get_users_page(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    role: Optional[UserRole] = None,
+    username: Optional[str] = None,
+    real_name: Optional[str] = None,
+    organization_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """游标分页获取用户列表"""
+    query = _users_query(role, username, real_name, organization_id)
+    return await paginate_keyset(db, query, User, limit, cursor)
+
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
     """创建用户"""
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_pool.run(get_password_hash, user.password)
     db_user = User(
         username=user.username,
         password_hash=hashed_password,
@@ -70,17 +108,54 @@ def create_user(db: Session, user: UserCreate) -> User:
         email=user.email,
         mobile=user.mobile,
         role=user.role,
-        organization_id=user.organization_id
+        organization_id=user.organization_id,
+        expert_categories=user.expert_categories
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user, ["organization"])
     return db_user
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[User]:
+async def get_taken_usernames_and_emails(
+    db: AsyncSession,
+    usernames: Collection[str],
+    emails: Collection[str]
+) -> Tuple[Set[str], Set[str]]:
+    """
+    一次查询找出已被使用的用户名与邮箱
+    Returns: (已存在的用户名, 已使用的邮箱)，均为小写（MySQL 默认排序规则下比较不区分大小写）
+    """
+    if not usernames and not emails:
+        return set(), set()
+    rows = (await db.execute(
+        select(User.username, User.email).filter(or_(User.username.in_(usernames), User.email.in_(emails)))
+    )).all()
+    lowered_usernames = {username.lower() for username in usernames}
+    lowered_emails = {email.lower() for email in emails}
+    return (
+        {username.lower() for username, _ in rows if username.lower() in lowered_usernames},
+        {email.lower() for _, email in rows if email and email.lower() in lowered_emails}
+    )
+
+
+async def bulk_create_users(db: AsyncSession, users: List[UserCreate], password_hashes: List[str]) -> int:
+    """
+    批量创建用户（不提交），用于导入名单
+    以一条 executemany 插入，password_hashes 与 users 一一对应
+    """
+    if not users:
+        return 0
+    await db.execute(insert(User), [
+        {**user.model_dump(exclude={"password"}), "password_hash": password_hash}
+        for user, password_hash in zip(users, password_hashes)
+    ])
+    return len(users)
+
+
+async def update_user(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
     """更新用户"""
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         return None
     
@@ -88,38 +163,41 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     for field, value in update_data.items():
         setattr(db_user, field, value)
     
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    user_cache.invalidate(db_user.username)
     return db_user
 
 
-def update_user_password(db: Session, user_id: int, new_password: str) -> bool:
+async def update_user_password(db: AsyncSession, user_id: int, new_password: str) -> bool:
     """更新用户密码"""
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         return False
     
-    db_user.password_hash = get_password_hash(new_password)
-    db.commit()
+    db_user.password_hash = await password_pool.run(get_password_hash, new_password)
+    await db.commit()
+    user_cache.invalidate(db_user.username)
     return True
 
 
-def delete_user(db: Session, user_id: int) -> bool:
+async def delete_user(db: AsyncSession, user_id: int) -> bool:
     """删除用户"""
-    db_user = get_user(db, user_id)
+    db_user = await get_user(db, user_id)
     if not db_user:
         return False
     
-    db.delete(db_user)
-    db.commit()
+    await db.delete(db_user)
+    await db.commit()
+    user_cache.invalidate(db_user.username)
     return True
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """认证用户"""
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await password_pool.run(verify_password, password, user.password_hash):
         return None
     return user
@@ -2,12 +2,13 @@
 数据库连接配置
 Database connection configuration
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
-# 创建数据库引擎
+# 创建数据库引擎（同步，供初始化脚本使用）
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -18,6 +19,58 @@ engine = create_engine(
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 创建异步数据库引擎（供路由使用，避免阻塞事件循环）
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    echo=settings.DEBUG
+)
+
+# 创建异步会话工厂
+# expire_on_commit=False: 提交后仍可读取已加载的属性，避免在序列化阶段触发隐式IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# SQLite 连接参数（DB_BACKEND=sqlite），每个新连接执行
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # 读写互不阻塞；内存数据库不支持，保持默认
+    "synchronous": "NORMAL",  # WAL 下提交不等待 fsync，断电时最多丢失最近的事务
+    "foreign_keys": "ON",  # 与 MySQL 一致地检查外键
+    "busy_timeout": "5000",  # 写锁被占用时最多等待5秒，而不是立即报 database is locked
+    "cache_size": "-65536",  # 页缓存 64MB
+    "temp_store": "MEMORY",
+    "mmap_size": "268435456"  # 256MB 内存映射读
+}
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        if name == "journal_mode" and settings.SQLITE_IN_MEMORY:
+            continue
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _begin_before_savepoint(conn, name) -> None:
+    # 驱动只在增删改语句前隐式开始事务；SAVEPOINT 前尚未开始时须显式开始，否则 RELEASE 即提交
+    if not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+if engine.dialect.name == "sqlite":
+    for sqlite_engine in (engine, async_engine.sync_engine):
+        event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+        event.listen(sqlite_engine, "savepoint", _begin_before_savepoint)
+
+# 共享缓存的内存数据库在最后一个连接关闭时即被清空，进程存活期间保持一个连接
+_memory_db_keeper = engine.raw_connection() if settings.SQLITE_IN_MEMORY else None
+
 # 创建基类
 Base = declarative_base()
 
@@ -32,3 +85,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    异步数据库依赖注入
+    Async database dependency injection for FastAPI
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
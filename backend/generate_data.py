@@ -0,0 +1,521 @@
+"""
+大规模合成数据生成脚本
+Deterministic synthetic data generator for load tests and benchmarks
+
+按参数生成组织、各角色用户、奖项轮次、申报、专家评审、评委会决议、公示及异议，
+全部以 Core 批量插入（executemany），可在数分钟内向 MySQL 或 SQLite 写入百万级申报、
+五百万级评审。
+
+- 相同的 --seed、参数及 --end-year 在同样的数据库状态下生成完全相同的数据
+- 主键从各表当前最大ID之后显式分配，外键无需回查；用户名、单位代码带ID，不与已有数据冲突
+- 每批单独提交，避免百万行的大事务；中途失败时已提交的批次保留
+- 申报状态按固定比例分布；进入专家评审及之后的申报带评审，评分聚合与 score_summary_json 同时写入；
+  终审通过/不通过、已公示、已归档的申报各带一条评委会决议
+- created_date、submission_date 随申报一起写入，最后重建 application_stats 汇总
+- 所有合成用户使用同一个密码（--password），只计算一次bcrypt哈希
+
+请勿对生产库使用。MySQL 上 applications 的 FULLTEXT 索引会明显拖慢插入，
+百万级导入前可先删除该索引，导入后重建。
+
+用法 / Usage:
+    python generate_data.py --orgs 200 --applications-per-cycle 2000            # 小规模
+    python generate_data.py --orgs 5000 --experts 3000 --cycles 10 \\
+        --applications-per-cycle 100000 --reviews-per-application 5              # 100万申报、约500万评审
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Connection
+from database import engine
+from models import (
+    User, Organization, Award, AwardCycle, Application, Review, CommitteeDecision,
+    Announcement, Objection, UserRole, OrgType, AwardLevel, ApplicationStatus, DecisionType
+)
+from crud.application import STAGE_LABELS
+from crud.review import build_score_summary
+from crud.statistics import rebuild_statements
+from crud.user import get_password_hash
+from utils.objection_intake import content_hash
+
+# 申报状态分布（权重）
+STATUS_WEIGHTS = {
+    ApplicationStatus.DRAFT: 10,
+    ApplicationStatus.SUBMITTED: 10,
+    ApplicationStatus.RECOMMENDED: 8,
+    ApplicationStatus.PRELIMINARY_APPROVED: 6,
+    ApplicationStatus.PRELIMINARY_REJECTED: 6,
+    ApplicationStatus.EXPERT_REVIEW: 20,
+    ApplicationStatus.COMMITTEE_REVIEW: 10,
+    ApplicationStatus.APPROVED: 10,
+    ApplicationStatus.REJECTED: 8,
+    ApplicationStatus.ANNOUNCED: 6,
+    ApplicationStatus.ARCHIVED: 6
+}
+# 带评审的状态；其中专家评审中的申报部分评审尚未提交
+REVIEWED_STATUSES = {
+    ApplicationStatus.EXPERT_REVIEW, ApplicationStatus.COMMITTEE_REVIEW, ApplicationStatus.APPROVED,
+    ApplicationStatus.REJECTED, ApplicationStatus.ANNOUNCED, ApplicationStatus.ARCHIVED
+}
+DECISIONS = {
+    ApplicationStatus.APPROVED: DecisionType.APPROVED,
+    ApplicationStatus.REJECTED: DecisionType.REJECTED,
+    ApplicationStatus.ANNOUNCED: DecisionType.APPROVED,
+    ApplicationStatus.ARCHIVED: DecisionType.APPROVED
+}
+AWARD_GRADES = ["一等奖", "二等奖", "三等奖"]
+
+# 评分项：(名称, 满分)
+CRITERIA = [("技术创新性", 30), ("技术先进性", 30), ("经济效益", 20), ("社会效益", 20)]
+RULES = {
+    "max_score": 100,
+    "criteria": [{"name": name, "weight": full / 100, "max_score": full} for name, full in CRITERIA]
+}
+
+MATERIALS = ["铝合金", "铜箔", "稀土永磁", "钛合金", "镁合金", "锂电正极材料", "钨钼", "镍基高温合金", "锌冶炼渣", "再生铅"]
+PROCESSES = ["制备", "冶炼", "轧制", "回收利用", "表面处理", "精密铸造", "粉末冶金", "连续挤压", "短流程熔炼"]
+SUFFIXES = ["关键技术研究", "产业化应用", "新工艺开发", "智能化改造", "绿色低碳技术", "成套装备研制"]
+CITIES = ["北京市", "长沙市", "昆明市", "兰州市", "沈阳市", "包头市", "赣州市", "洛阳市", "金昌市", "铜陵市"]
+SURNAMES = "王李张刘陈杨赵黄周吴徐孙胡朱高林何郭马罗"
+TITLES = ["教授", "研究员", "高级工程师", "正高级工程师", "副教授", "工程师"]
+CATEGORIES = ["技术发明", "科技进步", "基础研究", "工程建设"]
+
+
+def weighted_cycle(rng: random.Random, weights: Dict[Any, int], size: int = 1000) -> List[Any]:
+    """按权重预先抽样的取值表，逐行从中随机取值比每行加权抽样快"""
+    return rng.choices(list(weights), weights=list(weights.values()), k=size)
+
+
+def random_time(rng: random.Random, start: datetime, days: float) -> datetime:
+    """start 之后 days 天内的随机时间（精确到秒）"""
+    return start + timedelta(seconds=rng.randrange(int(days * 86400)))
+
+
+def person_name(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + rng.choice(["工", "教授", "研究员", "博士", "总"])
+
+
+class Generator:
+    """合成数据生成器，主键从 first_ids 开始连续分配"""
+    
+    def __init__(self, conn: Connection, args: argparse.Namespace):
+        self.conn = conn
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.counts: Dict[str, int] = {}
+        self.first_ids = {
+            model.__tablename__: (conn.scalar(select(func.max(model.id))) or 0) + 1
+            for model in (Organization, User, Award, AwardCycle, Application, Review,
+                          CommitteeDecision, Announcement, Objection)
+        }
+    
+    def insert_batches(self, model, rows: Iterator[Dict[str, Any]]) -> int:
+        """按 batch_size 分批 executemany 插入 Returns: 行数"""
+        table = model.__tablename__
+        statement = insert(model)
+        batch: List[Dict[str, Any]] = []
+        count = 0
+        started = time.perf_counter()
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.args.batch_size:
+                self.conn.execute(statement, batch)
+                self.conn.commit()
+                count += len(batch)
+                batch = []
+        if batch:
+            self.conn.execute(statement, batch)
+            self.conn.commit()
+            count += len(batch)
+        elapsed = time.perf_counter() - started
+        self.counts[table] = self.counts.get(table, 0) + count
+        print(f"  {table:<20}{count:>10} 行 {elapsed:8.1f}s {count / elapsed if elapsed else 0:>10.0f} 行/秒")
+        return count
+    
+    # ---------------- 组织与用户 ----------------
+    def organizations(self) -> List[Tuple[int, OrgType]]:
+        first = self.first_ids["organizations"]
+        org_types = weighted_cycle(self.rng, {
+            OrgType.ENTERPRISE: 60, OrgType.INSTITUTE: 20, OrgType.UNIVERSITY: 15,
+            OrgType.ASSOCIATION: 3, OrgType.OTHER: 2
+        })
+        orgs = [(first + i, org_types[i % len(org_types)]) for i in range(self.args.orgs)]
+        suffix = {
+            OrgType.ENTERPRISE: "有色金属有限公司", OrgType.INSTITUTE: "有色金属研究院",
+            OrgType.UNIVERSITY: "大学材料学院", OrgType.ASSOCIATION: "有色金属学会", OrgType.OTHER: "检测中心"
+        }
+        self.insert_batches(Organization, (
+            {
+                "id": org_id,
+                "name": f"{self.rng.choice(CITIES)}合成{org_id}{suffix[org_type]}",
+                "code": f"SYN{org_id:08d}",
+                "org_type": org_type,
+                "contact_person": person_name(self.rng),
+                "contact_phone": f"010-{self.rng.randrange(10000000, 99999999)}",
+                "address": self.rng.choice(CITIES)
+            }
+            for org_id, org_type in orgs
+        ))
+        return orgs
+    
+    def users(self, org_ids: List[int]) -> Dict[UserRole, List[int]]:
+        """各角色用户；申报单位与推荐单位用户依次分配到各组织"""
+        password_hash = get_password_hash(self.args.password)
+        per_role = [
+            (UserRole.STAFF, self.args.staff),
+            (UserRole.EXPERT, self.args.experts),
+            (UserRole.COMMITTEE, self.args.committee),
+            (UserRole.APPLICANT, self.args.applicants),
+            (UserRole.RECOMMENDER, self.args.recommenders)
+        ]
+        ids: Dict[UserRole, List[int]] = {}
+        next_id = self.first_ids["users"]
+        for role, count in per_role:
+            ids[role] = list(range(next_id, next_id + count))
+            next_id += count
+        
+        def rows():
+            for role, user_ids in ids.items():
+                for index, user_id in enumerate(user_ids):
+                    with_org = role in (UserRole.APPLICANT, UserRole.RECOMMENDER) and org_ids
+                    yield {
+                        "id": user_id,
+                        "username": f"syn_{role.value}_{user_id}",
+                        "password_hash": password_hash,
+                        "real_name": person_name(self.rng),
+                        "email": f"syn_{user_id}@example.com",
+                        "mobile": f"13{self.rng.randrange(100000000, 999999999)}",
+                        "role": role,
+                        "organization_id": org_ids[index % len(org_ids)] if with_org else None,
+                        "expert_categories": ",".join(self.rng.sample(CATEGORIES, 2)) if role == UserRole.EXPERT else None,
+                        "is_active": True
+                    }
+        
+        self.insert_batches(User, rows())
+        return ids
+    
+    # ---------------- 奖项与轮次 ----------------
+    def cycles(self, admin_id: Optional[int]) -> List[Tuple[int, int]]:
+        """每个轮次对应一个年度，最后一个轮次为 --end-year Returns: [(轮次ID, 年度)]"""
+        first_award = self.first_ids["awards"]
+        award_ids = [first_award + i for i in range(self.args.awards)]
+        self.insert_batches(Award, (
+            {
+                "id": award_id,
+                "name": f"合成科学技术奖 - {CATEGORIES[i % len(CATEGORIES)]}{award_id}",
+                "code": f"SYN-AWARD-{award_id}",
+                "level": AwardLevel.INDUSTRY,
+                "year": self.args.end_year,
+                "status": "active",
+                "created_by": admin_id
+            }
+            for i, award_id in enumerate(award_ids)
+        ))
+        
+        first_cycle = self.first_ids["award_cycles"]
+        cycles = []
+        for i in range(self.args.cycles):
+            year = self.args.end_year - (self.args.cycles - 1 - i) // len(award_ids)
+            cycles.append((first_cycle + i, year))
+        self.insert_batches(AwardCycle, (
+            {
+                "id": cycle_id,
+                "award_id": award_ids[i % len(award_ids)],
+                "cycle_name": f"{year}年度合成轮次{cycle_id}",
+                "start_date": datetime(year, 3, 1),
+                "end_date": datetime(year, 12, 31),
+                "rules_json": RULES,
+                "quota": 20,
+                "budget": 1000000.0,
+                "status": "active" if year == self.args.end_year else "closed"
+            }
+            for i, (cycle_id, year) in enumerate(cycles)
+        ))
+        return cycles
+    
+    # ---------------- 申报、评审与决议 ----------------
+    def applications(
+        self,
+        cycles: List[Tuple[int, int]],
+        orgs: List[Tuple[int, OrgType]],
+        users: Dict[UserRole, List[int]]
+    ) -> Dict[int, List[int]]:
+        """
+        申报与其评审、决议交替分批生成，内存中只保留一批
+        Returns: {轮次ID: 已公示申报ID列表}（供生成异议时引用）
+        """
+        rng = self.rng
+        statuses = weighted_cycle(rng, STATUS_WEIGHTS)
+        applicants = users[UserRole.APPLICANT]
+        experts = users[UserRole.EXPERT]
+        committee = users[UserRole.COMMITTEE]
+        per_app = min(self.args.reviews_per_application, len(experts))
+        announced: Dict[int, List[int]] = {}
+        next_ids = {
+            "applications": self.first_ids["applications"],
+            "reviews": self.first_ids["reviews"],
+            "committee_decisions": self.first_ids["committee_decisions"]
+        }
+        started = time.perf_counter()
+        totals = {"applications": 0, "reviews": 0, "committee_decisions": 0}
+        
+        for cycle_id, year in cycles:
+            window_start = datetime(year, 3, 1)
+            remaining = self.args.applications_per_cycle
+            while remaining > 0:
+                size = min(self.args.batch_size, remaining)
+                remaining -= size
+                apps, reviews, decisions = [], [], []
+                for _ in range(size):
+                    app_id = next_ids["applications"]
+                    next_ids["applications"] += 1
+                    status = statuses[rng.randrange(len(statuses))]
+                    org_index = rng.randrange(len(orgs))
+                    created_at = random_time(rng, window_start, 90)
+                    submission_time = None if status == ApplicationStatus.DRAFT else created_at + timedelta(
+                        seconds=rng.randrange(20 * 86400)
+                    )
+                    app = {
+                        "id": app_id,
+                        "award_cycle_id": cycle_id,
+                        "applicant_unit_id": orgs[org_index][0],
+                        "applicant_user_id": applicants[org_index] if org_index < len(applicants) else None,
+                        "title": f"{rng.choice(MATERIALS)}{rng.choice(PROCESSES)}{rng.choice(SUFFIXES)}",
+                        "category": rng.choice(CATEGORIES),
+                        "leader_name": person_name(rng),
+                        "leader_title": rng.choice(TITLES),
+                        "team_members": "、".join(person_name(rng) for _ in range(3)),
+                        "summary": f"针对{rng.choice(MATERIALS)}生产中的瓶颈问题，开发了{rng.choice(PROCESSES)}新方法",
+                        "innovation_points": f"1.提出新工艺路线; 2.关键指标提升{rng.randrange(5, 60)}%",
+                        "economic_benefit": f"近三年新增销售额{rng.randrange(100, 50000)}万元",
+                        "submission_status": status,
+                        "submission_time": submission_time,
+                        "current_stage": STAGE_LABELS.get(status, "草稿"),
+                        "final_result": None,
+                        "score_summary_json": None,
+                        "score_count": 0,
+                        "score_sum": 0.0,
+                        "score_sum_sq": 0.0,
+                        "score_min": None,
+                        "score_max": None,
+                        "created_date": created_at.date(),
+                        "submission_date": submission_time.date() if submission_time else None,
+                        "created_at": created_at,
+                        "updated_at": submission_time or created_at
+                    }
+                    
+                    if status in REVIEWED_STATUSES and per_app:
+                        self._reviews(app, experts, per_app, next_ids, reviews)
+                    if status in DECISIONS:
+                        decision = DECISIONS[status]
+                        grade = rng.choice(AWARD_GRADES) if decision == DecisionType.APPROVED else None
+                        app["final_result"] = grade or "不通过"
+                        votes = rng.randrange(5, 12)
+                        against = rng.randrange(0, 3)
+                        decisions.append({
+                            "id": next_ids["committee_decisions"],
+                            "application_id": app_id,
+                            "meeting_date": datetime(year, 11, 15),
+                            "decision": decision,
+                            "decision_note": "经评审委员会审议表决",
+                            "award_grade": grade,
+                            "decided_by": rng.choice(committee) if committee else None,
+                            "vote_result": {"for": votes, "against": against, "abstain": 1},
+                            "created_at": datetime(year, 11, 15)
+                        })
+                        next_ids["committee_decisions"] += 1
+                    if status == ApplicationStatus.ANNOUNCED:
+                        announced.setdefault(cycle_id, []).append(app_id)
+                    apps.append(app)
+                
+                self.conn.execute(insert(Application), apps)
+                if reviews:
+                    for offset in range(0, len(reviews), self.args.batch_size):
+                        self.conn.execute(insert(Review), reviews[offset:offset + self.args.batch_size])
+                if decisions:
+                    self.conn.execute(insert(CommitteeDecision), decisions)
+                self.conn.commit()
+                totals["applications"] += len(apps)
+                totals["reviews"] += len(reviews)
+                totals["committee_decisions"] += len(decisions)
+                self._progress(totals, started)
+        
+        print()
+        for table, count in totals.items():
+            self.counts[table] = self.counts.get(table, 0) + count
+        return announced
+    
+    def _reviews(
+        self,
+        app: Dict[str, Any],
+        experts: List[int],
+        per_app: int,
+        next_ids: Dict[str, int],
+        reviews: List[Dict[str, Any]]
+    ) -> None:
+        """一条申报的评审，已提交评审的分数同时计入申报的评分聚合"""
+        rng = self.rng
+        partial = app["submission_status"] == ApplicationStatus.EXPERT_REVIEW
+        assigned_at = app["submission_time"] + timedelta(days=20)
+        scores = []
+        for expert_id in rng.sample(experts, per_app):
+            submitted = not partial or rng.random() < 0.6
+            review = {
+                "id": next_ids["reviews"],
+                "application_id": app["id"],
+                "expert_id": expert_id,
+                "scores_json": None,
+                "total_score": None,
+                "comment": None,
+                "is_anonymous": True,
+                "status": "submitted" if submitted else "pending",
+                "submitted_at": None,
+                "created_at": assigned_at
+            }
+            next_ids["reviews"] += 1
+            if submitted:
+                item_scores = {name: rng.randint(full * 5 // 10, full) for name, full in CRITERIA}
+                total = float(sum(item_scores.values()))
+                review.update(
+                    scores_json=item_scores,
+                    total_score=total,
+                    comment="技术方案合理，同意推荐" if total >= 80 else "创新性一般，建议完善",
+                    submitted_at=random_time(rng, assigned_at, 30)
+                )
+                scores.append(total)
+            reviews.append(review)
+        
+        if scores:
+            total = sum(scores)
+            sum_sq = sum(score * score for score in scores)
+            app.update(
+                score_count=len(scores),
+                score_sum=total,
+                score_sum_sq=sum_sq,
+                score_min=min(scores),
+                score_max=max(scores),
+                score_summary_json=build_score_summary(len(scores), total, sum_sq, min(scores), max(scores))
+            )
+    
+    def _progress(self, totals: Dict[str, int], started: float) -> None:
+        elapsed = time.perf_counter() - started
+        print(
+            f"\r  申报 {totals['applications']:>10}  评审 {totals['reviews']:>10}  "
+            f"决议 {totals['committee_decisions']:>8}  {elapsed:8.1f}s "
+            f"{totals['applications'] / elapsed if elapsed else 0:>8.0f} 申报/秒",
+            end="", flush=True
+        )
+    
+    # ---------------- 公示与异议 ----------------
+    def announcements(self, cycles: List[Tuple[int, int]], announced: Dict[int, List[int]], staff_id: Optional[int]) -> None:
+        rng = self.rng
+        first = self.first_ids["announcements"]
+        items = []
+        for i in range(self.args.announcements):
+            cycle_id, year = cycles[i % len(cycles)]
+            start = random_time(rng, datetime(year, 11, 20), 20)
+            items.append((first + i, cycle_id, start))
+        self.insert_batches(Announcement, (
+            {
+                "id": announcement_id,
+                "title": f"{start.year}年度合成科学技术奖拟获奖项目公示（{announcement_id}）",
+                "content": "经专家评审和评审委员会审定，现将拟获奖项目予以公示，公示期15天。",
+                "announcement_type": "获奖公示",
+                "start_time": start,
+                "end_time": start + timedelta(days=15),
+                "status": "active" if start.year == self.args.end_year else "closed",
+                "created_by": staff_id,
+                "created_at": start,
+                "updated_at": start
+            }
+            for announcement_id, _, start in items
+        ))
+        
+        def objections():
+            next_id = self.first_ids["objections"]
+            for announcement_id, cycle_id, start in items:
+                app_ids = announced.get(cycle_id) or [None]
+                for j in range(self.args.objections_per_announcement):
+                    content = f"对公示项目的完成人排序有异议，请核实（合成异议 {announcement_id}-{j}）"
+                    submitted_at = random_time(rng, start, 15)
+                    yield {
+                        "id": next_id,
+                        "announcement_id": announcement_id,
+                        "application_id": rng.choice(app_ids),
+                        "objector_name": person_name(rng),
+                        "objector_contact": f"13{rng.randrange(100000000, 999999999)}",
+                        "objection_content": content,
+                        "content_hash": content_hash(content),
+                        "client_ip": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                        "status": "pending",
+                        "created_at": submitted_at,
+                        "updated_at": submitted_at
+                    }
+                    next_id += 1
+        
+        self.insert_batches(Objection, objections())
+    
+    def run(self) -> Dict[str, int]:
+        print("组织与用户...")
+        orgs = self.organizations()
+        users = self.users([org_id for org_id, _ in orgs])
+        if not orgs or not users[UserRole.APPLICANT]:
+            raise SystemExit("至少需要1个组织和1个申报单位用户")
+        print("奖项与轮次...")
+        admin_id = self.conn.scalar(select(User.id).filter(User.role == UserRole.ADMIN).order_by(User.id).limit(1))
+        cycles = self.cycles(admin_id)
+        print("申报、评审与决议...")
+        announced = self.applications(cycles, orgs, users)
+        print("公示与异议...")
+        staff = users[UserRole.STAFF]
+        self.announcements(cycles, announced, staff[0] if staff else admin_id)
+        print("重建申报统计...")
+        for statement in rebuild_statements():
+            self.conn.execute(statement)
+        self.conn.commit()
+        return self.counts
+
+
+def _fast_load(conn: Connection) -> None:
+    """批量导入期间的会话设置（仅当前连接）"""
+    if conn.dialect.name == "mysql":
+        # 主键、外键均由本脚本分配，导入期间跳过逐行检查
+        conn.execute(text("SET SESSION foreign_key_checks = 0, unique_checks = 0"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成数据生成")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--orgs", type=int, default=200, help="组织数")
+    parser.add_argument("--staff", type=int, default=5, help="工作人员数")
+    parser.add_argument("--experts", type=int, default=200, help="专家数")
+    parser.add_argument("--committee", type=int, default=15, help="评委数")
+    parser.add_argument("--applicants", type=int, help="申报单位用户数（默认每个组织一个）")
+    parser.add_argument("--recommenders", type=int, default=20, help="推荐单位用户数")
+    parser.add_argument("--awards", type=int, default=2, help="奖项数")
+    parser.add_argument("--cycles", type=int, default=4, help="轮次数（依次分配给各奖项，按年度递增）")
+    parser.add_argument("--applications-per-cycle", type=int, default=2000, help="每个轮次的申报数")
+    parser.add_argument("--reviews-per-application", type=int, default=5, help="每个进入专家评审的申报的评审数")
+    parser.add_argument("--announcements", type=int, default=4, help="公示数")
+    parser.add_argument("--objections-per-announcement", type=int, default=20, help="每个公示的异议数")
+    parser.add_argument("--end-year", type=int, default=datetime.now().year, help="最后一个轮次的年度")
+    parser.add_argument("--password", default="syn12345", help="合成用户的登录密码")
+    parser.add_argument("--batch-size", type=int, default=5000, help="每次批量插入的行数")
+    args = parser.parse_args()
+    if args.applicants is None:
+        args.applicants = args.orgs
+    
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        _fast_load(conn)
+        counts = Generator(conn, args).run()
+    print(f"\n✓ 合成数据生成完成，用时 {time.perf_counter() - started:.1f}s (seed={args.seed})")
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
+    print(f"合成用户登录: syn_<角色>_<ID> / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
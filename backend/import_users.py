@@ -0,0 +1,53 @@
+"""
+用户名单导入脚本
+Bulk-create user accounts from a CSV or Excel roster
+
+名单第一行为表头：用户名、姓名、初始密码（必需），角色、电子邮箱、手机、所属单位、专家类别（可选）。
+角色可填写中文名称（管理员、工作人员、推荐单位、申报单位、专家、评委）或角色代码，为空时为申报单位。
+也可通过接口 POST /api/users/import 上传名单。
+
+用法 / Usage:
+    python import_users.py experts.xlsx --dry-run   # 只校验
+    python import_users.py experts.xlsx
+    python import_users.py applicants.csv
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from fastapi import HTTPException
+from database import AsyncSessionLocal, async_engine
+from utils.password_pool import bulk_password_pool
+from utils.user_import import import_users
+
+
+async def run(path: Path, dry_run: bool) -> dict:
+    try:
+        async with AsyncSessionLocal() as db:
+            return await import_users(db, str(path), path.name, dry_run)
+    finally:
+        bulk_password_pool.shutdown()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用户名单导入")
+    parser.add_argument("path", type=Path, help="名单文件（.xlsx 或 .csv）")
+    parser.add_argument("--dry-run", action="store_true", help="只校验，不创建用户")
+    args = parser.parse_args()
+    
+    try:
+        result = asyncio.run(run(args.path, args.dry_run))
+    except HTTPException as exc:
+        sys.exit(f"✗ {exc.detail}")
+    
+    for error in result["errors"]:
+        print(f"  第 {error['row']} 行: {'；'.join(error['errors'])}")
+    if result["errors_truncated"]:
+        print(f"  ……共 {result['failed']} 行有误，只列出前 {len(result['errors'])} 行")
+    action = "校验通过" if args.dry_run else "已创建"
+    print(f"✓ 共 {result['total_rows']} 行，{action} {result['imported']} 个用户，{result['failed']} 行有误")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from config import settings
-from database import engine, Base
+from database import engine, async_engine, AsyncSessionLocal, Base
+from utils.announcement_snapshot import publish_snapshot, snapshot_root
+from utils.audit_log import AuditLogMiddleware, audit_writer
+from utils.objection_intake import objection_intake
+from utils.password_pool import bulk_password_pool, password_pool
 import os
 
 # 创建数据库表
@@ -30,6 +34,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 操作日志中间件（记录 /api 下的增删改请求）
+app.add_middleware(AuditLogMiddleware)
+
 # 确保上传目录存在
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
@@ -39,7 +46,7 @@ if os.path.exists(settings.UPLOAD_DIR):
 
 
 # 导入路由
-from routers import auth, users, organizations, awards, applications, reviews, committee, announcements, files, statistics
+from routers import auth, users, organizations, awards, applications, reviews, committee, announcements, files, statistics, logs
 
 # 注册路由
 app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
@@ -52,6 +59,31 @@ app.include_router(committee.router, prefix="/api/committee", tags=["评审委
 app.include_router(announcements.router, prefix="/api/announcements", tags=["公示管理"])
 app.include_router(files.router, prefix="/api/files", tags=["文件管理"])
 app.include_router(statistics.router, prefix="/api/statistics", tags=["统计分析"])
+app.include_router(logs.router, prefix="/api/logs", tags=["操作日志"])
+
+
+@app.on_event("startup")
+async def startup():
+    """应用启动时启动日志与异议写入任务，并发布公示快照，保证部署后静态快照与数据库一致"""
+    # SQLite 内存数据库每次启动都是空库，直接建表
+    if settings.SQLITE_IN_MEMORY:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    audit_writer.start()
+    objection_intake.start()
+    if snapshot_root() is not None:
+        async with AsyncSessionLocal() as db:
+            await publish_snapshot(db)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """应用关闭时写完缓冲的异议与日志并释放资源"""
+    await objection_intake.stop()
+    await audit_writer.stop()
+    password_pool.shutdown()
+    bulk_password_pool.shutdown()
+    await async_engine.dispose()
 
 
 @app.get("/", tags=["根路径"])
@@ -0,0 +1,74 @@
+"""
+附件存储维护脚本
+Blob store maintenance: disk usage report and garbage collection
+
+用法 / Usage:
+    python manage_blobs.py usage
+    python manage_blobs.py gc --dry-run
+    python manage_blobs.py gc --grace 3600
+"""
+import argparse
+import asyncio
+from database import AsyncSessionLocal, async_engine
+from crud.blob import get_storage_usage, collect_garbage
+from utils import blob_store
+
+
+def format_size(size: int) -> str:
+    """格式化字节数"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+async def report_usage():
+    """打印存储占用报告"""
+    async with AsyncSessionLocal() as db:
+        usage = await get_storage_usage(db)
+    
+    disk_count, disk_bytes = 0, 0
+    for _, _, stat in blob_store.iter_blob_files():
+        disk_count += 1
+        disk_bytes += stat.st_size
+    
+    print(f"存储目录:     {blob_store.blob_root()}")
+    print(f"附件数:       {usage['attachment_count']}  ({format_size(usage['logical_bytes'])})")
+    print(f"内容块:       {usage['blob_count']}  ({format_size(usage['blob_bytes'])})")
+    print(f"去重节省:     {format_size(usage['saved_bytes'])}")
+    print(f"待回收内容块: {usage['unreferenced_count']}  ({format_size(usage['unreferenced_bytes'])})")
+    print(f"磁盘文件:     {disk_count}  ({format_size(disk_bytes)})")
+
+
+async def run_gc(grace_seconds: int, dry_run: bool):
+    """执行垃圾回收"""
+    async with AsyncSessionLocal() as db:
+        stats = await collect_garbage(db, grace_seconds=grace_seconds, dry_run=dry_run)
+    
+    prefix = "[dry-run] 将" if dry_run else "已"
+    print(f"{prefix}删除无引用内容块 {stats['blobs']} 个 ({format_size(stats['blob_bytes'])})")
+    print(f"{prefix}删除孤儿文件 {stats['orphans']} 个 ({format_size(stats['orphan_bytes'])})")
+    print(f"{prefix}删除临时文件 {stats['temp_files']} 个 ({format_size(stats['temp_bytes'])})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="附件存储维护")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("usage", help="存储占用报告")
+    gc_parser = subparsers.add_parser("gc", help="回收无引用的内容块")
+    gc_parser.add_argument("--dry-run", action="store_true", help="只统计不删除")
+    gc_parser.add_argument("--grace", type=int, default=3600, help="孤儿文件及临时文件的最短保留时间(秒)")
+    args = parser.parse_args()
+    
+    try:
+        if args.command == "usage":
+            await report_usage()
+        else:
+            await run_gc(args.grace, args.dry_run)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
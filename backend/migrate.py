@@ -0,0 +1,44 @@
+"""
+数据库迁移脚本
+Apply schema migrations in backend/migrations
+
+用法 / Usage:
+    python migrate.py            # 执行所有待执行的迁移
+    python migrate.py --status   # 查看迁移状态
+    python migrate.py --stamp    # 标记所有迁移为已执行（新建数据库时使用）
+"""
+import argparse
+from database import engine
+import migrations
+
+
+def show_status():
+    """打印迁移状态"""
+    with engine.begin() as conn:
+        applied = migrations.applied_versions(conn)
+    for version, module in migrations.discover():
+        mark = "✓" if version in applied else " "
+        print(f"[{mark}] {version}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库迁移")
+    parser.add_argument("--status", action="store_true", help="查看迁移状态")
+    parser.add_argument("--stamp", action="store_true", help="标记所有迁移为已执行")
+    args = parser.parse_args()
+    
+    if args.status:
+        show_status()
+    elif args.stamp:
+        stamped = migrations.stamp(engine)
+        print(f"✓ 已标记 {len(stamped)} 个迁移")
+    else:
+        done = migrations.upgrade(
+            engine,
+            on_apply=lambda version, doc: print(f"→ {version}: {(doc or '').strip().splitlines()[0]}")
+        )
+        print(f"✓ 已执行 {len(done)} 个迁移" if done else "✓ 数据库结构已是最新")
+
+
+if __name__ == "__main__":
+    main()
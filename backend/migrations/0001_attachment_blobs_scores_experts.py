@@ -0,0 +1,30 @@
+"""
+附件内容存储、评分聚合、专家擅长类别及全文索引
+
+- attachments.sha256 及索引、file_blobs 表
+- applications 评分聚合字段，并根据已提交评审回填
+- users.expert_categories
+- applications 全文索引（仅MySQL）
+"""
+from sqlalchemy.engine import Connection
+from migrations import add_column, create_index, has_table
+from models import Application, Attachment, FileBlob, User
+from crud.review import backfill_application_scores
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, Attachment.__table__, "sha256")
+    create_index(conn, Attachment.__table__, "ix_attachments_sha256")
+    if not has_table(conn, FileBlob.__tablename__):
+        FileBlob.__table__.create(conn)
+    
+    add_column(conn, User.__table__, "expert_categories")
+    
+    for column in ("score_count", "score_sum", "score_sum_sq", "score_min", "score_max"):
+        add_column(conn, Application.__table__, column)
+    
+    # 根据已提交评审回填评分聚合
+    backfill_application_scores(conn)
+    
+    if conn.dialect.name == "mysql":
+        create_index(conn, Application.__table__, "ft_applications_content")
@@ -0,0 +1,47 @@
+"""
+查询相关索引
+
+- reviews (expert_id, application_id) 唯一索引，创建前清理重复评审
+  （每组保留已提交的评审，其次保留最新的一条），并重算受影响申报的评分聚合
+- reviews (application_id)
+- applications (award_cycle_id, submission_status, created_at)
+- applications (applicant_unit_id, created_at)
+- users (role)、users (organization_id)、organizations (org_type)、attachments (application_id)
+"""
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.engine import Connection
+from migrations import create_index
+from models import Application, Attachment, Organization, Review, User
+from crud.review import backfill_application_scores
+
+
+def upgrade(conn: Connection) -> None:
+    duplicates = conn.execute(
+        select(Review.expert_id, Review.application_id)
+        .group_by(Review.expert_id, Review.application_id)
+        .having(func.count(Review.id) > 1)
+    ).all()
+    for expert_id, application_id in duplicates:
+        keep_id = conn.scalar(
+            select(Review.id)
+            .filter(Review.expert_id == expert_id, Review.application_id == application_id)
+            .order_by(case((Review.status == "submitted", 0), else_=1), Review.id.desc())
+            .limit(1)
+        )
+        result = conn.execute(delete(Review).where(
+            Review.expert_id == expert_id,
+            Review.application_id == application_id,
+            Review.id != keep_id
+        ))
+        print(f"  清理重复评审: expert_id={expert_id} application_id={application_id} 删除 {result.rowcount} 条")
+    # 0001 按清理前的评审回填了评分聚合，被删除的已提交评审须从中扣除
+    backfill_application_scores(conn, sorted({application_id for _, application_id in duplicates}))
+    
+    create_index(conn, Review.__table__, "uq_reviews_expert_application")
+    create_index(conn, Review.__table__, "ix_reviews_application_id")
+    create_index(conn, Application.__table__, "ix_applications_cycle_status_created")
+    create_index(conn, Application.__table__, "ix_applications_unit_created")
+    create_index(conn, User.__table__, "ix_users_role")
+    create_index(conn, User.__table__, "ix_users_organization_id")
+    create_index(conn, Organization.__table__, "ix_organizations_org_type")
+    create_index(conn, Attachment.__table__, "ix_attachments_application_id")
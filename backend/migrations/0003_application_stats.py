@@ -0,0 +1,14 @@
+"""
+申报统计汇总表 application_stats，并由申报表回填
+"""
+from sqlalchemy.engine import Connection
+from migrations import has_table
+from crud.statistics import rebuild_statements
+from models import ApplicationStat
+
+
+def upgrade(conn: Connection) -> None:
+    if not has_table(conn, ApplicationStat.__tablename__):
+        ApplicationStat.__table__.create(conn)
+    for statement in rebuild_statements():
+        conn.execute(statement)
@@ -0,0 +1,19 @@
+"""
+申报日期字段（时间序列统计）
+
+- applications.created_date / submission_date 及索引，由 created_at / submission_time 回填
+"""
+from sqlalchemy.engine import Connection
+from migrations import add_column, create_index
+from crud.statistics import date_backfill_statement
+from models import Application
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, Application.__table__, "created_date")
+    add_column(conn, Application.__table__, "submission_date")
+    conn.execute(date_backfill_statement())
+    create_index(conn, Application.__table__, "ix_applications_created_date")
+    create_index(conn, Application.__table__, "ix_applications_cycle_created_date")
+    create_index(conn, Application.__table__, "ix_applications_submission_date")
+    create_index(conn, Application.__table__, "ix_applications_cycle_submission_date")
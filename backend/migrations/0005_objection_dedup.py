@@ -0,0 +1,39 @@
+"""
+异议去重与来源IP
+
+- objections.content_hash / client_ip
+- 回填已有异议的内容哈希；同一公示下内容相同的异议只有最早的一条记录哈希，
+  其余保留原记录、哈希留空（唯一索引不约束空值）
+- objections (announcement_id, content_hash) 唯一索引
+"""
+from sqlalchemy import select, update
+from sqlalchemy.engine import Connection
+from migrations import add_column, create_index
+from models import Objection
+from utils.objection_intake import content_hash
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, Objection.__table__, "content_hash")
+    add_column(conn, Objection.__table__, "client_ip")
+    
+    seen = set(conn.execute(
+        select(Objection.announcement_id, Objection.content_hash).filter(Objection.content_hash.is_not(None))
+    ).all())
+    rows = conn.execute(
+        select(Objection.id, Objection.announcement_id, Objection.objection_content)
+        .filter(Objection.content_hash.is_(None))
+        .order_by(Objection.id)
+    ).all()
+    duplicates = 0
+    for objection_id, announcement_id, content in rows:
+        key = (announcement_id, content_hash(content or ""))
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        conn.execute(update(Objection).where(Objection.id == objection_id).values(content_hash=key[1]))
+    if duplicates:
+        print(f"  重复异议 {duplicates} 条，保留记录但不设置内容哈希")
+    
+    create_index(conn, Objection.__table__, "uq_objections_announcement_hash")
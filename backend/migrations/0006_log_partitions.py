@@ -0,0 +1,19 @@
+"""
+操作日志索引与分区
+
+- logs (created_at)、(user_id, created_at)、(action_type, created_at) 索引
+- MySQL: 删除 user_id 外键、主键改为 (id, created_at)，按 created_at 按月分区
+"""
+from sqlalchemy.engine import Connection
+from migrations import create_index
+from models import Log
+from utils.log_archive import partition_logs, partition_until
+
+
+def upgrade(conn: Connection) -> None:
+    create_index(conn, Log.__table__, "ix_logs_created_at")
+    create_index(conn, Log.__table__, "ix_logs_user_created")
+    create_index(conn, Log.__table__, "ix_logs_action_created")
+    partitions = partition_logs(conn, partition_until())
+    if partitions:
+        print(f"  logs 分区: {partitions[0]} ~ {partitions[-1]}")
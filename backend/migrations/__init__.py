@@ -0,0 +1,112 @@
+"""
+数据库结构迁移
+Schema migrations
+
+迁移脚本放在本目录下，文件名为 "<四位序号>_<说明>.py"，按序号顺序执行，
+每个脚本提供 upgrade(conn) 函数。已执行的版本记录在 schema_migrations 表中。
+脚本应保持幂等（先检查再变更），以便对 create_all 新建的数据库重复执行也不会出错。
+
+用法见 backend/migrate.py
+"""
+import importlib
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+from sqlalchemy import Column, DateTime, Index, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+MIGRATIONS_DIR = Path(__file__).parent
+MIGRATION_PATTERN = re.compile(r"^(\d{4})_\w+\.py$")
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+
+def discover() -> List[Tuple[str, str]]:
+    """列出所有迁移脚本 Returns: [(version, module_name)]"""
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.iterdir()):
+        if MIGRATION_PATTERN.match(path.name):
+            migrations.append((path.stem, f"{__name__}.{path.stem}"))
+    return migrations
+
+
+def applied_versions(conn: Connection) -> set:
+    """已执行的迁移版本"""
+    schema_migrations.create(conn, checkfirst=True)
+    return set(conn.scalars(select(schema_migrations.c.version)))
+
+
+def pending(conn: Connection) -> List[Tuple[str, str]]:
+    """待执行的迁移"""
+    applied = applied_versions(conn)
+    return [(version, module) for version, module in discover() if version not in applied]
+
+
+def upgrade(engine, on_apply=None) -> List[str]:
+    """
+    按顺序执行所有待执行的迁移，每个迁移在独立事务中执行
+    注意：MySQL 的 DDL 会隐式提交，迁移中途失败时需根据日志手动处理后重跑
+    """
+    with engine.begin() as conn:
+        todo = pending(conn)
+    
+    done = []
+    for version, module_name in todo:
+        module = importlib.import_module(module_name)
+        if on_apply:
+            on_apply(version, module.__doc__)
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.now()))
+        done.append(version)
+    return done
+
+
+def stamp(engine) -> List[str]:
+    """将所有迁移标记为已执行（用于 create_all 新建的数据库）"""
+    with engine.begin() as conn:
+        todo = pending(conn)
+        for version, _ in todo:
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.now()))
+    return [version for version, _ in todo]
+
+
+# ==================== 迁移脚本辅助函数 ====================
+def has_table(conn: Connection, table_name: str) -> bool:
+    """表是否存在"""
+    return inspect(conn).has_table(table_name)
+
+
+def has_column(conn: Connection, table_name: str, column_name: str) -> bool:
+    """字段是否存在"""
+    return column_name in {column["name"] for column in inspect(conn).get_columns(table_name)}
+
+
+def has_index(conn: Connection, table_name: str, index_name: str) -> bool:
+    """索引是否存在"""
+    return index_name in {index["name"] for index in inspect(conn).get_indexes(table_name)}
+
+
+def add_column(conn: Connection, table: Table, column_name: str) -> None:
+    """按模型定义添加字段（已存在时跳过）"""
+    if has_column(conn, table.name, column_name):
+        return
+    column_ddl = CreateColumn(table.c[column_name]).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+
+def create_index(conn: Connection, table: Table, index_name: str) -> None:
+    """按模型定义创建索引（已存在时跳过）"""
+    index: Index = next(index for index in table.indexes if index.name == index_name)
+    if has_index(conn, table.name, index_name):
+        return
+    index.create(conn)
@@ -2,13 +2,20 @@
 数据库模型定义 - XXXX协会科学技术奖评审管理系统
 Database Models for Non-ferrous Metals Technology Award Management System
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, JSON, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum, JSON, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
+from config import settings
 import enum
 
 
+# 关系加载策略
+# 开启 DB_RAISE_ON_LAZY_LOAD 后，访问未预加载的关系会直接抛出异常而不是逐行发出查询，
+# 用于在生产环境及时暴露新引入的 N+1 查询；查询中显式指定的 joinedload/selectinload 不受影响
+LAZY_STRATEGY = "raise_on_sql" if settings.DB_RAISE_ON_LAZY_LOAD else "select"
+
+
 # 枚举类型定义
 class UserRole(str, enum.Enum):
     """用户角色"""
@@ -73,15 +80,21 @@ class User(Base):
     mobile = Column(String(20), comment="手机号")
     role = Column(Enum(UserRole), default=UserRole.APPLICANT, comment="角色")
     organization_id = Column(Integer, ForeignKey("organizations.id"), comment="所属组织ID")
+    expert_categories = Column(String(200), comment="专家擅长的申报类别，逗号分隔，为空表示不限")
     is_active = Column(Boolean, default=True, comment="是否激活")
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    organization = relationship("Organization", back_populates="users")
-    applications = relationship("Application", foreign_keys="Application.applicant_user_id", back_populates="applicant_user")
-    reviews = relationship("Review", back_populates="expert")
-    logs = relationship("Log", back_populates="user")
+    organization = relationship("Organization", back_populates="users", lazy=LAZY_STRATEGY)
+    applications = relationship("Application", foreign_keys="Application.applicant_user_id", back_populates="applicant_user", lazy=LAZY_STRATEGY)
+    reviews = relationship("Review", back_populates="expert", lazy=LAZY_STRATEGY)
+    logs = relationship("Log", primaryjoin="User.id == foreign(Log.user_id)", back_populates="user", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        Index("ix_users_role", "role"),
+        Index("ix_users_organization_id", "organization_id"),
+    )
 
 
 class Organization(Base):
@@ -101,8 +114,12 @@ class Organization(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    users = relationship("User", back_populates="organization")
-    applications = relationship("Application", foreign_keys="Application.applicant_unit_id", back_populates="applicant_unit")
+    users = relationship("User", back_populates="organization", lazy=LAZY_STRATEGY)
+    applications = relationship("Application", foreign_keys="Application.applicant_unit_id", back_populates="applicant_unit", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        Index("ix_organizations_org_type", "org_type"),
+    )
 
 
 class Award(Base):
@@ -123,7 +140,7 @@ class Award(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    cycles = relationship("AwardCycle", back_populates="award")
+    cycles = relationship("AwardCycle", back_populates="award", lazy=LAZY_STRATEGY)
 
 
 class AwardCycle(Base):
@@ -143,8 +160,8 @@ class AwardCycle(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    award = relationship("Award", back_populates="cycles")
-    applications = relationship("Application", back_populates="award_cycle")
+    award = relationship("Award", back_populates="cycles", lazy=LAZY_STRATEGY)
+    applications = relationship("Application", back_populates="award_cycle", lazy=LAZY_STRATEGY)
 
 
 class Application(Base):
@@ -175,18 +192,46 @@ class Application(Base):
     current_stage = Column(String(50), comment="当前阶段")
     final_result = Column(String(50), comment="最终结果")
     score_summary_json = Column(JSON, comment="评分汇总JSON")
+    # 评分聚合，提交评审时在同一事务中增量维护，score_summary_json 由其派生
+    score_count = Column(Integer, default=0, server_default="0", nullable=False, comment="已提交评分数")
+    score_sum = Column(Float, default=0, server_default="0", nullable=False, comment="评分总和")
+    score_sum_sq = Column(Float, default=0, server_default="0", nullable=False, comment="评分平方和")
+    score_min = Column(Float, comment="最低分")
+    score_max = Column(Float, comment="最高分")
+    # 按日期统计用，分别由 created_at、submission_time 派生，在创建/提交申报时写入
+    created_date = Column(Date, comment="创建日期")
+    submission_date = Column(Date, comment="提交日期")
     
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    award_cycle = relationship("AwardCycle", back_populates="applications")
-    applicant_unit = relationship("Organization", foreign_keys=[applicant_unit_id], back_populates="applications")
-    applicant_user = relationship("User", foreign_keys=[applicant_user_id], back_populates="applications")
-    attachments = relationship("Attachment", back_populates="application", cascade="all, delete-orphan")
-    recommenders = relationship("Recommender", back_populates="application", cascade="all, delete-orphan")
-    reviews = relationship("Review", back_populates="application", cascade="all, delete-orphan")
-    committee_decisions = relationship("CommitteeDecision", back_populates="application", cascade="all, delete-orphan")
+    award_cycle = relationship("AwardCycle", back_populates="applications", lazy=LAZY_STRATEGY)
+    applicant_unit = relationship("Organization", foreign_keys=[applicant_unit_id], back_populates="applications", lazy=LAZY_STRATEGY)
+    applicant_user = relationship("User", foreign_keys=[applicant_user_id], back_populates="applications", lazy=LAZY_STRATEGY)
+    attachments = relationship("Attachment", back_populates="application", cascade="all, delete-orphan", lazy=LAZY_STRATEGY)
+    recommenders = relationship("Recommender", back_populates="application", cascade="all, delete-orphan", lazy=LAZY_STRATEGY)
+    reviews = relationship("Review", back_populates="application", cascade="all, delete-orphan", lazy=LAZY_STRATEGY)
+    committee_decisions = relationship("CommitteeDecision", back_populates="application", cascade="all, delete-orphan", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        # 列表查询按轮次、状态过滤并按创建时间排序
+        Index("ix_applications_cycle_status_created", "award_cycle_id", "submission_status", "created_at"),
+        # 申报单位查看本单位申报
+        Index("ix_applications_unit_created", "applicant_unit_id", "created_at"),
+        # 时间序列统计按日期范围扫描（全部轮次 / 指定轮次）
+        Index("ix_applications_created_date", "created_date"),
+        Index("ix_applications_cycle_created_date", "award_cycle_id", "created_date"),
+        Index("ix_applications_submission_date", "submission_date"),
+        Index("ix_applications_cycle_submission_date", "award_cycle_id", "submission_date"),
+        # 全文检索索引（MySQL ngram 分词，支持中文），其他数据库不创建
+        Index(
+            "ft_applications_content",
+            "title", "summary", "innovation_points", "technical_details",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram"
+        ).ddl_if(dialect="mysql"),
+    )
 
 
 class Attachment(Base):
@@ -199,13 +244,40 @@ class Attachment(Base):
     filepath = Column(String(500), nullable=False, comment="文件路径")
     file_type = Column(String(20), comment="文件类型")
     file_size = Column(Integer, comment="文件大小(字节)")
+    sha256 = Column(String(64), index=True, comment="文件SHA-256，对应 file_blobs.sha256")
     description = Column(String(255), comment="文件描述")
     uploaded_by = Column(Integer, ForeignKey("users.id"), comment="上传人ID")
     version = Column(Integer, default=1, comment="版本号")
     upload_time = Column(DateTime, default=datetime.now, comment="上传时间")
     
     # 关系
-    application = relationship("Application", back_populates="attachments")
+    application = relationship("Application", back_populates="attachments", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        Index("ix_attachments_application_id", "application_id"),
+    )
+
+
+class FileBlob(Base):
+    """附件内容表（按SHA-256内容寻址，相同文件只存一份）"""
+    __tablename__ = "file_blobs"
+    
+    sha256 = Column(String(64), primary_key=True, comment="内容SHA-256")
+    file_size = Column(Integer, nullable=False, comment="文件大小(字节)")
+    filepath = Column(String(500), nullable=False, comment="存储路径")
+    ref_count = Column(Integer, default=0, nullable=False, index=True, comment="引用计数")
+    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+
+
+class ApplicationStat(Base):
+    """申报统计汇总表（轮次×状态×单位类型×年度计数，随申报创建、提交及状态变更在同一事务中维护）"""
+    __tablename__ = "application_stats"
+    
+    award_cycle_id = Column(Integer, ForeignKey("award_cycles.id"), primary_key=True, comment="奖项轮次ID")
+    submission_status = Column(Enum(ApplicationStatus), primary_key=True, comment="申报状态")
+    org_type = Column(Enum(OrgType), primary_key=True, comment="申报单位类型")
+    year = Column(Integer, primary_key=True, comment="申报创建年度")
+    count = Column(Integer, default=0, server_default="0", nullable=False, comment="申报数")
 
 
 class Recommender(Base):
@@ -223,7 +295,7 @@ class Recommender(Base):
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     
     # 关系
-    application = relationship("Application", back_populates="recommenders")
+    application = relationship("Application", back_populates="recommenders", lazy=LAZY_STRATEGY)
 
 
 class Review(Base):
@@ -242,8 +314,14 @@ class Review(Base):
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     
     # 关系
-    application = relationship("Application", back_populates="reviews")
-    expert = relationship("User", back_populates="reviews")
+    application = relationship("Application", back_populates="reviews", lazy=LAZY_STRATEGY)
+    expert = relationship("User", back_populates="reviews", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        # 每位专家对同一申报只有一条评审；同时服务按专家查询
+        Index("uq_reviews_expert_application", "expert_id", "application_id", unique=True),
+        Index("ix_reviews_application_id", "application_id"),
+    )
 
 
 class CommitteeDecision(Base):
@@ -261,7 +339,7 @@ class CommitteeDecision(Base):
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     
     # 关系
-    application = relationship("Application", back_populates="committee_decisions")
+    application = relationship("Application", back_populates="committee_decisions", lazy=LAZY_STRATEGY)
 
 
 class Announcement(Base):
@@ -281,7 +359,7 @@ class Announcement(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    objections = relationship("Objection", back_populates="announcement", cascade="all, delete-orphan")
+    objections = relationship("Objection", back_populates="announcement", cascade="all, delete-orphan", lazy=LAZY_STRATEGY)
 
 
 class Objection(Base):
@@ -294,27 +372,42 @@ class Objection(Base):
     objector_name = Column(String(100), comment="异议人姓名")
     objector_contact = Column(String(100), comment="异议人联系方式")
     objection_content = Column(Text, nullable=False, comment="异议内容")
+    content_hash = Column(String(64), comment="异议内容哈希（去重用，同一公示下唯一）")
+    client_ip = Column(String(45), comment="提交人IP")
     response = Column(Text, comment="回复")
     status = Column(String(20), default="pending", comment="处理状态")
     created_at = Column(DateTime, default=datetime.now, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
     
     # 关系
-    announcement = relationship("Announcement", back_populates="objections")
+    announcement = relationship("Announcement", back_populates="objections", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        Index("uq_objections_announcement_hash", "announcement_id", "content_hash", unique=True),
+    )
 
 
 class Log(Base):
-    """操作日志表"""
+    """
+    操作日志表
+    MySQL 上按 created_at 按月分区（见 utils/log_archive.py），分区表不支持外键，user_id 不设外键约束
+    """
     __tablename__ = "logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), comment="用户ID")
+    user_id = Column(Integer, comment="用户ID")
     action_type = Column(String(50), nullable=False, comment="操作类型")
     action_desc = Column(Text, comment="操作描述")
     ip_address = Column(String(50), comment="IP地址")
     user_agent = Column(String(255), comment="用户代理")
     request_data = Column(JSON, comment="请求数据")
-    created_at = Column(DateTime, default=datetime.now, comment="创建时间")
+    created_at = Column(DateTime, nullable=False, default=datetime.now, comment="创建时间")
     
     # 关系
-    user = relationship("User", back_populates="logs")
+    user = relationship("User", primaryjoin="foreign(Log.user_id) == User.id", back_populates="logs", lazy=LAZY_STRATEGY)
+    
+    __table_args__ = (
+        Index("ix_logs_created_at", "created_at"),
+        Index("ix_logs_user_created", "user_id", "created_at"),
+        Index("ix_logs_action_created", "action_type", "created_at"),
+    )
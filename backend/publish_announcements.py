@@ -0,0 +1,45 @@
+"""
+公示静态快照发布脚本
+Publish the static announcement snapshot served by nginx
+
+公示创建/更新时会自动发布；直接修改数据库或调整快照目录后可手动执行。
+
+用法 / Usage:
+    python publish_announcements.py
+    python publish_announcements.py --withdraw    # 撤下快照，公开请求全部由后端处理
+"""
+import argparse
+import asyncio
+import sys
+from database import AsyncSessionLocal, async_engine
+from utils.announcement_snapshot import publish_snapshot, snapshot_root, withdraw_snapshot
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="公示静态快照发布")
+    parser.add_argument("--withdraw", action="store_true", help="撤下快照")
+    args = parser.parse_args()
+    
+    root = snapshot_root()
+    if root is None:
+        print("未配置 ANNOUNCEMENT_SNAPSHOT_DIR，不发布快照")
+        return 1
+    
+    if args.withdraw:
+        withdraw_snapshot(root)
+        print(f"✓ 已撤下快照: {root / 'current'}")
+        return 0
+    
+    async with AsyncSessionLocal() as db:
+        version = await publish_snapshot(db)
+    await async_engine.dispose()
+    
+    if version is None:
+        print("✗ 快照未发布（失败或已有更新的版本），详见日志")
+        return 1
+    print(f"✓ 已发布快照 {version}: {(root / 'current').resolve()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,7 +1,18 @@
 """重置数据库"""
+import os
 import pymysql
 from config import settings
 
+if settings.DB_BACKEND == "sqlite":
+    # 删除数据库文件及 WAL 日志文件
+    if not settings.SQLITE_IN_MEMORY:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(settings.SQLITE_PATH + suffix):
+                os.remove(settings.SQLITE_PATH + suffix)
+        print(f"✓ 数据库 '{settings.SQLITE_PATH}' 已删除")
+    print("\n现在请运行: python setup_database.py")
+    raise SystemExit(0)
+
 # 连接MySQL服务器
 connection = pymysql.connect(
     host=settings.DB_HOST,
@@ -25,6 +36,6 @@ try:
     
     connection.commit()
     print("\n现在请运行: python setup_database.py")
-    
+
 finally:
     connection.close()
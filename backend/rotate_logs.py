@@ -0,0 +1,40 @@
+"""
+操作日志轮转脚本
+Archive and purge audit logs older than the retention period
+
+将 LOG_RETENTION_MONTHS 个月之前的日志按月归档为 LOG_ARCHIVE_DIR/logs-YYYYMM.jsonl.gz 后从数据库删除，
+MySQL 上整分区删除并补齐未来 LOG_PARTITIONS_AHEAD 个月的分区。建议每月初由 cron 执行。
+
+用法 / Usage:
+    python rotate_logs.py
+    python rotate_logs.py --retain-months 6 --archive-dir /data/archives/logs
+    python rotate_logs.py --dry-run      # 只统计将要归档的日志条数
+"""
+import argparse
+from pathlib import Path
+from config import settings
+from database import engine
+from utils.log_archive import rotate_logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="操作日志轮转")
+    parser.add_argument("--retain-months", type=int, default=settings.LOG_RETENTION_MONTHS, help="数据库中保留的月数")
+    parser.add_argument("--archive-dir", default=settings.LOG_ARCHIVE_DIR, help="归档目录")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不归档和删除")
+    args = parser.parse_args()
+    
+    summary = rotate_logs(engine, args.retain_months, Path(args.archive_dir), dry_run=args.dry_run)
+    print(f"保留 {summary['cutoff']:%Y-%m-%d} 之后的日志")
+    for month, count in summary["archived"].items():
+        print(f"  {month}: {count} 条{'（待归档）' if args.dry_run else ' 已归档'}")
+    if not args.dry_run:
+        if summary["dropped_partitions"]:
+            print(f"✓ 已删除分区: {', '.join(summary['dropped_partitions'])}")
+        print(f"✓ 已删除 {summary['deleted']} 条未分区的日志")
+        if summary["created_partitions"]:
+            print(f"✓ 已创建分区: {', '.join(summary['created_partitions'])}")
+
+
+if __name__ == "__main__":
+    main()
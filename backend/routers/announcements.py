@@ -1,47 +1,104 @@
 """
 公示管理路由
+
+公开的公示列表/详情接口缓存序列化后的响应（utils.cache.announcement_cache），
+创建或更新公示时清空；响应带强ETag，If-None-Match 命中时返回304，
+并通过 Cache-Control 允许浏览器及nginx缓存 ANNOUNCEMENT_MAX_AGE 秒。
+配置 ANNOUNCEMENT_SNAPSHOT_DIR 后，创建或更新公示时同时发布静态快照（utils.announcement_snapshot），
+由nginx直接提供无查询参数的列表与详情请求。
+公开的异议提交接口按IP限流（utils.rate_limit），受理后缓冲批量写入并按内容去重（utils.objection_intake）。
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from typing import Awaitable, Callable, Hashable, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from database import get_db
-from schemas import AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse, ObjectionCreate, ObjectionResponse
+from config import settings
+from database import get_async_db
+from schemas import AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse, ObjectionCreate, ObjectionReceipt, ObjectionResponse, PaginatedResponse
 from models import User, UserRole, Announcement, Objection
+from utils.announcement_snapshot import (
+    active_announcements_query,
+    announcement_adapter,
+    announcement_list_adapter,
+    announcement_page_adapter,
+    dump_json,
+    publish_snapshot
+)
 from utils.auth import get_current_user, require_role
+from utils.cache import announcement_cache
+from utils.http_cache import RenderedResponse, cached_json_response
+from utils.objection_intake import content_hash, objection_intake
+from utils.pagination import paginate_keyset
+from utils.rate_limit import client_ip, objection_limiter
 
 router = APIRouter()
 
 
+async def _render_cached(key: Hashable, render: Callable[[], Awaitable[bytes]]) -> RenderedResponse:
+    """读取缓存的响应，未命中时渲染并写入"""
+    rendered = announcement_cache.get(key)
+    if rendered is None:
+        generation = announcement_cache.generation
+        rendered = RenderedResponse.from_body(await render())
+        announcement_cache.set(key, rendered, generation)
+    return rendered
+
+
 @router.get("/", response_model=List[AnnouncementResponse])
 async def list_announcements(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取公示列表（公开）"""
-    announcements = db.query(Announcement).filter(
-        Announcement.status == "active"
-    ).offset(skip).limit(limit).all()
-    return announcements
+    async def render() -> bytes:
+        announcements = await db.scalars(active_announcements_query().offset(skip).limit(limit))
+        return dump_json(announcement_list_adapter, list(announcements))
+    
+    rendered = await _render_cached(("list", skip, limit), render)
+    return cached_json_response(request, rendered, settings.ANNOUNCEMENT_MAX_AGE)
+
+
+@router.get("/page", response_model=PaginatedResponse[AnnouncementResponse])
+async def list_announcements_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """游标分页获取公示列表（公开）"""
+    async def render() -> bytes:
+        query = select(Announcement).filter(Announcement.status == "active")
+        page = await paginate_keyset(db, query, Announcement, limit, cursor)
+        return dump_json(announcement_page_adapter, page)
+    
+    rendered = await _render_cached(("page", cursor, limit), render)
+    return cached_json_response(request, rendered, settings.ANNOUNCEMENT_MAX_AGE)
 
 
 @router.get("/{announcement_id}", response_model=AnnouncementResponse)
 async def get_announcement(
+    request: Request,
     announcement_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取公示详情（公开）"""
-    announcement = db.query(Announcement).filter(Announcement.id == announcement_id).first()
-    if not announcement:
-        raise HTTPException(status_code=404, detail="公示不存在")
-    return announcement
+    async def render() -> bytes:
+        announcement = await db.scalar(select(Announcement).filter(Announcement.id == announcement_id))
+        if not announcement:
+            raise HTTPException(status_code=404, detail="公示不存在")
+        return dump_json(announcement_adapter, announcement)
+    
+    rendered = await _render_cached(("detail", announcement_id), render)
+    return cached_json_response(request, rendered, settings.ANNOUNCEMENT_MAX_AGE)
 
 
 @router.post("/", response_model=AnnouncementResponse)
 async def create_announcement(
     announcement: AnnouncementCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """创建公示"""
@@ -50,8 +107,10 @@ async def create_announcement(
         created_by=current_user.id
     )
     db.add(db_announcement)
-    db.commit()
-    db.refresh(db_announcement)
+    await db.commit()
+    announcement_cache.clear()
+    await publish_snapshot(db)
+    await db.refresh(db_announcement)
     return db_announcement
 
 
@@ -59,11 +118,11 @@ async def create_announcement(
 async def update_announcement(
     announcement_id: int,
     announcement_update: AnnouncementUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """更新公示"""
-    db_announcement = db.query(Announcement).filter(Announcement.id == announcement_id).first()
+    db_announcement = await db.scalar(select(Announcement).filter(Announcement.id == announcement_id))
     if not db_announcement:
         raise HTTPException(status_code=404, detail="公示不存在")
     
@@ -71,34 +130,69 @@ async def update_announcement(
     for field, value in update_data.items():
         setattr(db_announcement, field, value)
     
-    db.commit()
-    db.refresh(db_announcement)
+    await db.commit()
+    announcement_cache.clear()
+    await publish_snapshot(db)
+    await db.refresh(db_announcement)
     return db_announcement
 
 
 # ================ 异议管理 ================
-@router.post("/{announcement_id}/objections", response_model=ObjectionResponse)
+async def _announcement_exists(db: AsyncSession, announcement_id: int) -> bool:
+    """公示是否存在（结果随公示缓存一起失效）"""
+    key = ("exists", announcement_id)
+    exists = announcement_cache.get(key)
+    if exists is None:
+        generation = announcement_cache.generation
+        exists = await db.scalar(select(Announcement.id).filter(Announcement.id == announcement_id)) is not None
+        announcement_cache.set(key, exists, generation)
+    return exists
+
+
+@router.post("/{announcement_id}/objections", response_model=ObjectionReceipt, status_code=202)
 async def create_objection(
+    request: Request,
     announcement_id: int,
     objection: ObjectionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    提交异议（公开接口）
+    按客户端IP限流；异议进入缓冲队列后批量写入，相同内容重复提交不会重复记录
+    """
+    ip = client_ip(request)
+    objection_limiter.check(ip)
+    if not await _announcement_exists(db, announcement_id):
+        raise HTTPException(status_code=404, detail="公示不存在")
+    
+    digest = content_hash(objection.objection_content)
+    accepted = await objection_intake.submit({
+        **objection.model_dump(),
+        "announcement_id": announcement_id,
+        "content_hash": digest,
+        "client_ip": ip
+    })
+    if not accepted:
+        return ObjectionReceipt(status="duplicate", content_hash=digest, message="相同内容的异议已提交")
+    return ObjectionReceipt(status="accepted", content_hash=digest, message="异议已受理")
+
+
+@router.get("/objections/intake-stats")
+async def get_objection_intake_stats(
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
-    """提交异议（公开接口）"""
-    db_objection = Objection(**objection.model_dump())
-    db.add(db_objection)
-    db.commit()
-    db.refresh(db_objection)
-    return db_objection
+    """异议受理队列与限流统计"""
+    return {"intake": objection_intake.stats(), "rate_limit": objection_limiter.stats()}
 
 
 @router.get("/{announcement_id}/objections", response_model=List[ObjectionResponse])
 async def list_objections(
     announcement_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """获取公示的异议列表"""
-    objections = db.query(Objection).filter(
+    objections = await db.scalars(select(Objection).filter(
         Objection.announcement_id == announcement_id
-    ).all()
-    return objections
+    ))
+    return list(objections)
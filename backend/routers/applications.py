@@ -3,17 +3,24 @@
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
-from sqlalchemy.orm import Session
-from database import get_db
-from schemas import ApplicationCreate, ApplicationUpdate, ApplicationResponse, ApplicationStatusUpdate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from schemas import (
+    ApplicationCreate, ApplicationUpdate, ApplicationResponse, ApplicationStatusUpdate,
+    ApplicationSearchResult, ApplicationImportResult, PaginatedResponse
+)
 from crud.application import (
-    get_applications, get_application, create_application, update_application,
+    get_applications, get_applications_page, search_applications, get_application,
+    create_application, update_application,
     submit_application, update_application_status, delete_application,
-    add_attachment, get_attachments
+    add_attachment, delete_attachment, get_attachments
 )
-from models import User, UserRole, ApplicationStatus
+from models import User, UserRole, ApplicationStatus, AwardCycle
 from utils.auth import get_current_user, require_role
-from utils.file_handler import save_upload_file
+from utils import blob_store
+from utils.application_import import import_applications
+from utils.file_handler import ensure_file_type, get_file_extension, write_upload_to_temp
 
 router = APIRouter()
 
@@ -25,7 +32,7 @@ async def list_applications(
     award_cycle_id: Optional[int] = None,
     status: Optional[str] = None,
     title: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取申报列表"""
@@ -42,7 +49,7 @@ async def list_applications(
         except ValueError:
             pass
     
-    applications = get_applications(
+    applications = await get_applications(
         db,
         skip=skip,
         limit=limit,
@@ -54,14 +61,73 @@ async def list_applications(
     return applications
 
 
+@router.get("/page", response_model=PaginatedResponse[ApplicationResponse])
+async def list_applications_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    award_cycle_id: Optional[int] = None,
+    status: Optional[str] = None,
+    title: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """游标分页获取申报列表（next_cursor 传回 cursor 获取下一页）"""
+    # 根据角色过滤
+    applicant_unit_id = None
+    if current_user.role == UserRole.APPLICANT:
+        applicant_unit_id = current_user.organization_id
+    
+    # 转换状态
+    status_enum = None
+    if status:
+        try:
+            status_enum = ApplicationStatus(status)
+        except ValueError:
+            pass
+    
+    return await get_applications_page(
+        db,
+        limit=limit,
+        cursor=cursor,
+        award_cycle_id=award_cycle_id,
+        applicant_unit_id=applicant_unit_id,
+        status=status_enum,
+        title=title
+    )
+
+
+@router.get("/search", response_model=List[ApplicationSearchResult])
+async def search_applications_api(
+    q: str = Query(..., min_length=1, max_length=100, description="检索关键词"),
+    limit: int = Query(20, ge=1, le=100),
+    award_cycle_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """全文检索申报（按相关度排序）"""
+    # 根据角色过滤
+    applicant_unit_id = None
+    if current_user.role == UserRole.APPLICANT:
+        applicant_unit_id = current_user.organization_id
+    
+    results = await search_applications(
+        db,
+        q,
+        limit=limit,
+        award_cycle_id=award_cycle_id,
+        applicant_unit_id=applicant_unit_id
+    )
+    return [{"score": score, "application": app} for app, score in results]
+
+
 @router.get("/{app_id}", response_model=ApplicationResponse)
 async def get_application_detail(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取申报详情"""
-    application = get_application(db, app_id)
+    application = await get_application(db, app_id)
     if not application:
         raise HTTPException(status_code=404, detail="申报不存在")
     
@@ -76,22 +142,48 @@ async def get_application_detail(
 @router.post("/", response_model=ApplicationResponse)
 async def create_new_application(
     application: ApplicationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.APPLICANT, UserRole.RECOMMENDER]))
 ):
     """创建申报"""
-    return create_application(db, application, current_user.id)
+    return await create_application(db, application, current_user.id)
+
+
+@router.post("/import", response_model=ApplicationImportResult)
+async def import_applications_api(
+    award_cycle_id: int,
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
+):
+    """
+    按申报模板批量导入申报（草稿状态）
+    - **dry_run**: 只校验不导入
+    
+    不合格的行不导入，返回逐行错误；合格的行在同一事务中导入
+    """
+    if not (file.filename or "").lower().endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="请上传 .xlsx 格式的申报模板")
+    if not await db.scalar(select(AwardCycle.id).filter(AwardCycle.id == award_cycle_id)):
+        raise HTTPException(status_code=404, detail="奖项轮次不存在")
+    
+    temp_path, _, _ = await write_upload_to_temp(file, blob_store.temp_dir())
+    try:
+        return await import_applications(db, str(temp_path), award_cycle_id, current_user.id, dry_run)
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
 @router.put("/{app_id}", response_model=ApplicationResponse)
 async def update_application_info(
     app_id: int,
     app_update: ApplicationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """更新申报"""
-    application = get_application(db, app_id)
+    application = await get_application(db, app_id)
     if not application:
         raise HTTPException(status_code=404, detail="申报不存在")
     
@@ -99,18 +191,18 @@ async def update_application_info(
     if application.submission_status != ApplicationStatus.DRAFT:
         raise HTTPException(status_code=400, detail="只能修改草稿状态的申报")
     
-    updated_app = update_application(db, app_id, app_update)
+    updated_app = await update_application(db, app_id, app_update)
     return updated_app
 
 
 @router.post("/{app_id}/submit")
 async def submit_application_api(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """提交申报"""
-    application = submit_application(db, app_id)
+    application = await submit_application(db, app_id)
     if not application:
         raise HTTPException(status_code=404, detail="申报不存在")
     return {"message": "提交成功", "application": application}
@@ -120,11 +212,11 @@ async def submit_application_api(
 async def update_application_status_api(
     app_id: int,
     status_update: ApplicationStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF, UserRole.COMMITTEE]))
 ):
     """更新申报状态"""
-    application = update_application_status(
+    application = await update_application_status(
         db,
         app_id,
         status_update.status,
@@ -140,32 +232,37 @@ async def upload_attachment(
     app_id: int,
     file: UploadFile = File(...),
     description: str = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """上传附件"""
     # 检查申报是否存在
-    application = get_application(db, app_id)
+    application = await get_application(db, app_id)
     if not application:
         raise HTTPException(status_code=404, detail="申报不存在")
     
-    # 保存文件
-    filepath, filename, file_size = await save_upload_file(file, subdir=f"applications/{app_id}")
+    # 保存文件到临时目录
+    ensure_file_type(file.filename)
+    temp_path, file_size, sha256 = await write_upload_to_temp(file, blob_store.temp_dir())
     
     # 获取文件类型
-    file_ext = filename.split('.')[-1] if '.' in filename else ''
+    file_ext = get_file_extension(file.filename).lstrip('.')
     
-    # 添加附件记录
-    attachment = add_attachment(
-        db,
-        app_id=app_id,
-        filename=file.filename,
-        filepath=filepath,
-        file_type=file_ext,
-        file_size=file_size,
-        user_id=current_user.id,
-        description=description
-    )
+    # 添加附件记录（文件移入内容存储，重复内容只保留一份）
+    try:
+        attachment = await add_attachment(
+            db,
+            app_id=app_id,
+            filename=file.filename,
+            upload_path=temp_path,
+            file_type=file_ext,
+            file_size=file_size,
+            sha256=sha256,
+            user_id=current_user.id,
+            description=description
+        )
+    finally:
+        temp_path.unlink(missing_ok=True)
     
     return {"message": "上传成功", "attachment": attachment}
 
@@ -173,22 +270,48 @@ async def upload_attachment(
 @router.get("/{app_id}/attachments")
 async def list_attachments(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取申报附件列表"""
-    attachments = get_attachments(db, app_id)
+    attachments = await get_attachments(db, app_id)
     return attachments
 
 
+@router.delete("/{app_id}/attachments/{attachment_id}")
+async def delete_attachment_api(
+    app_id: int,
+    attachment_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.APPLICANT]))
+):
+    """删除附件"""
+    application = await get_application(db, app_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="申报不存在")
+    
+    if current_user.role == UserRole.APPLICANT:
+        if application.applicant_unit_id != current_user.organization_id:
+            raise HTTPException(status_code=403, detail="无权访问")
+    
+    # 只能删除草稿状态申报的附件，已提交的材料不可更改
+    if application.submission_status != ApplicationStatus.DRAFT:
+        raise HTTPException(status_code=400, detail="只能删除草稿状态申报的附件")
+    
+    success = await delete_attachment(db, app_id, attachment_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="附件不存在")
+    return {"message": "删除成功"}
+
+
 @router.delete("/{app_id}")
 async def delete_application_api(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.APPLICANT]))
 ):
     """删除申报"""
-    success = delete_application(db, app_id)
+    success = await delete_application(db, app_id)
     if not success:
         raise HTTPException(status_code=400, detail="只能删除草稿状态的申报")
     return {"message": "删除成功"}
@@ -3,23 +3,27 @@
 Authentication routes
 """
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from schemas import Token, LoginRequest, UserResponse, PasswordChange
 from crud.user import authenticate_user, get_user, update_user_password
-from utils.auth import create_access_token, get_current_user
+from utils.audit_log import record_action
+from utils.auth import create_access_token, get_current_user, require_role
+from utils.cache import user_cache
+from utils.password_pool import password_pool
 from config import settings
-from models import User
+from models import User, UserRole
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=Token, summary="用户登录")
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     用户登录
@@ -28,13 +32,15 @@ async def login(
     
     返回JWT访问令牌
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
+        await record_action(request, "login_failed", f"登录失败: {form_data.username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    await record_action(request, "login", f"登录成功: {user.username}", user_id=user.id)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -58,7 +64,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     修改当前用户密码
@@ -66,7 +72,7 @@ async def change_password(
     - **new_password**: 新密码
     """
     # 验证旧密码
-    user = authenticate_user(db, current_user.username, password_data.old_password)
+    user = await authenticate_user(db, current_user.username, password_data.old_password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,7 +80,7 @@ async def change_password(
         )
     
     # 更新密码
-    success = update_user_password(db, current_user.id, password_data.new_password)
+    success = await update_user_password(db, current_user.id, password_data.new_password)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -90,3 +96,21 @@ async def logout(current_user: User = Depends(get_current_user)):
     用户登出（前端清除token即可）
     """
     return {"message": "登出成功"}
+
+
+@router.get("/cache-stats", summary="认证缓存统计")
+async def get_cache_stats(current_user: User = Depends(require_role([UserRole.ADMIN]))):
+    """
+    获取已认证用户缓存的命中统计
+    需要管理员权限
+    """
+    return user_cache.stats()
+
+
+@router.get("/hash-pool-stats", summary="密码哈希工作池统计")
+async def get_hash_pool_stats(current_user: User = Depends(require_role([UserRole.ADMIN]))):
+    """
+    获取密码哈希工作池的并发与排队统计
+    需要管理员权限
+    """
+    return password_pool.stats()
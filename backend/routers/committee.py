@@ -1,37 +1,58 @@
 """
 评审委员会路由
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
-from schemas import CommitteeDecisionCreate, CommitteeDecisionResponse
-from models import User, UserRole, CommitteeDecision
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from database import get_async_db
+from schemas import CommitteeDecisionCreate, CommitteeDecisionResponse, PaginatedResponse
+from models import User, UserRole, CommitteeDecision, Application
 from utils.auth import get_current_user, require_role
+from utils.pagination import paginate_keyset
 
 router = APIRouter()
 
 
+def _decision_query():
+    """决议查询（预加载关联申报及申报单位）"""
+    return select(CommitteeDecision).options(
+        joinedload(CommitteeDecision.application).joinedload(Application.applicant_unit)
+    )
+
+
 @router.get("/decisions", response_model=List[CommitteeDecisionResponse])
 async def list_decisions(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF, UserRole.COMMITTEE]))
 ):
     """获取所有决议"""
-    decisions = db.query(CommitteeDecision).offset(skip).limit(limit).all()
-    return decisions
+    decisions = await db.scalars(_decision_query().offset(skip).limit(limit))
+    return list(decisions)
+
+
+@router.get("/decisions/page", response_model=PaginatedResponse[CommitteeDecisionResponse])
+async def list_decisions_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF, UserRole.COMMITTEE]))
+):
+    """游标分页获取决议"""
+    return await paginate_keyset(db, _decision_query(), CommitteeDecision, limit, cursor)
 
 
 @router.get("/decisions/{decision_id}", response_model=CommitteeDecisionResponse)
 async def get_decision(
     decision_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF, UserRole.COMMITTEE]))
 ):
     """获取决议详情"""
-    decision = db.query(CommitteeDecision).filter(CommitteeDecision.id == decision_id).first()
+    decision = await db.scalar(_decision_query().filter(CommitteeDecision.id == decision_id))
     if not decision:
         raise HTTPException(status_code=404, detail="Decision not found")
     return decision
@@ -40,7 +61,7 @@ async def get_decision(
 @router.post("/decisions", response_model=CommitteeDecisionResponse)
 async def create_decision(
     decision: CommitteeDecisionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.COMMITTEE, UserRole.ADMIN]))
 ):
     """创建评审委员会决议"""
@@ -49,55 +70,54 @@ async def create_decision(
         decided_by=current_user.id
     )
     db.add(db_decision)
-    db.commit()
-    db.refresh(db_decision)
-    return db_decision
+    await db.commit()
+    return await db.scalar(_decision_query().filter(CommitteeDecision.id == db_decision.id))
 
 
 @router.put("/decisions/{decision_id}", response_model=CommitteeDecisionResponse)
 async def update_decision(
     decision_id: int,
     decision: CommitteeDecisionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """更新决议"""
-    db_decision = db.query(CommitteeDecision).filter(CommitteeDecision.id == decision_id).first()
+    db_decision = await db.scalar(_decision_query().filter(CommitteeDecision.id == decision_id))
     if not db_decision:
         raise HTTPException(status_code=404, detail="Decision not found")
     
     for key, value in decision.model_dump().items():
         setattr(db_decision, key, value)
     
-    db.commit()
-    db.refresh(db_decision)
+    await db.commit()
+    await db.refresh(db_decision)
     return db_decision
 
 
 @router.delete("/decisions/{decision_id}")
 async def delete_decision(
     decision_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """删除决议"""
-    db_decision = db.query(CommitteeDecision).filter(CommitteeDecision.id == decision_id).first()
+    db_decision = await db.scalar(_decision_query().filter(CommitteeDecision.id == decision_id))
     if not db_decision:
         raise HTTPException(status_code=404, detail="Decision not found")
     
-    db.delete(db_decision)
-    db.commit()
+    await db.delete(db_decision)
+    await db.commit()
     return {"message": "Decision deleted successfully"}
 
 
 @router.get("/decisions/application/{app_id}", response_model=List[CommitteeDecisionResponse])
 async def get_application_decisions(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取某申报的决议"""
-    decisions = db.query(CommitteeDecision).filter(
+    decisions = await db.scalars(_decision_query().filter(
         CommitteeDecision.application_id == app_id
-    ).all()
-    return decisions
+    ))
+    return list(decisions)
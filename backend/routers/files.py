@@ -3,10 +3,11 @@
 """
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy.orm import Session
-from database import get_db
-from models import User
-from utils.auth import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import User, UserRole
+from crud.blob import get_storage_usage
+from utils.auth import get_current_user, require_role
 from utils.file_handler import save_upload_file
 from utils.excel_utils import create_application_template, export_applications_to_excel
 import os
@@ -18,17 +19,18 @@ router = APIRouter()
 async def upload_file(
     file: UploadFile = File(...),
     subdir: str = "general",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """上传文件"""
-    filepath, filename, file_size = await save_upload_file(file, subdir)
+    filepath, filename, file_size, sha256 = await save_upload_file(file, subdir)
     
     return {
         "message": "文件上传成功",
         "filename": filename,
         "filepath": filepath,
-        "file_size": file_size
+        "file_size": file_size,
+        "sha256": sha256
     }
 
 
@@ -47,6 +49,15 @@ async def download_file(
     )
 
 
+@router.get("/storage-usage")
+async def storage_usage(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """附件存储占用统计（去重节省空间、待回收内容）"""
+    return await get_storage_usage(db)
+
+
 @router.get("/template/application")
 async def download_application_template():
     """下载申报Excel模板"""
@@ -0,0 +1,42 @@
+"""
+操作日志路由
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import get_async_db
+from models import User, UserRole
+from schemas import LogResponse, PaginatedResponse
+from crud.log import get_logs_page
+from utils.auth import require_role
+
+router = APIRouter()
+
+# 未指定开始时间时默认查询的天数
+DEFAULT_QUERY_DAYS = 30
+
+
+@router.get("/", response_model=PaginatedResponse[LogResponse])
+async def list_logs(
+    start: Optional[datetime] = Query(None, description="开始时间（含），默认为结束时间前30天"),
+    end: Optional[datetime] = Query(None, description="结束时间（不含），默认为当前时间"),
+    user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """
+    查询操作日志（按时间倒序游标分页）
+    时间跨度不超过 LOG_QUERY_MAX_DAYS 天，超出保留期的日志见归档文件
+    """
+    end = end or datetime.now()
+    start = start or end - timedelta(days=DEFAULT_QUERY_DAYS)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="开始时间必须早于结束时间")
+    if end - start > timedelta(days=settings.LOG_QUERY_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"时间跨度不能超过 {settings.LOG_QUERY_MAX_DAYS} 天")
+    return await get_logs_page(db, start, end, user_id, action_type, limit, cursor)
@@ -1,15 +1,16 @@
 """
 评审管理路由
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from database import get_db
-from schemas import ReviewCreate, ReviewUpdate, ReviewResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from schemas import ReviewCreate, ReviewUpdate, ReviewResponse, PaginatedResponse, BulkAssignRequest, BulkAssignResult
 from crud.review import (
-    get_reviews_by_expert, get_reviews_by_application, get_review,
+    get_reviews_by_expert, get_reviews_by_expert_page, get_reviews_by_application, get_review,
     create_review, update_review, submit_review,
-    assign_expert_to_application, get_application_score_summary
+    assign_expert_to_application, bulk_assign_experts, get_application_score_summary
 )
 from models import User, UserRole
 from utils.auth import get_current_user, require_role
@@ -21,68 +22,79 @@ router = APIRouter()
 async def get_my_reviews(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXPERT]))
 ):
     """获取我的评审任务"""
-    reviews = get_reviews_by_expert(db, current_user.id, skip, limit)
+    reviews = await get_reviews_by_expert(db, current_user.id, skip, limit)
     return reviews
 
 
+@router.get("/my-reviews/page", response_model=PaginatedResponse[ReviewResponse])
+async def get_my_reviews_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.EXPERT]))
+):
+    """游标分页获取我的评审任务"""
+    return await get_reviews_by_expert_page(db, current_user.id, limit, cursor)
+
+
 @router.get("/application/{app_id}", response_model=List[ReviewResponse])
 async def get_application_reviews(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF, UserRole.COMMITTEE]))
 ):
     """获取某申报的所有评审"""
-    reviews = get_reviews_by_application(db, app_id)
+    reviews = await get_reviews_by_application(db, app_id)
     return reviews
 
 
 @router.post("/", response_model=ReviewResponse)
 async def create_or_update_review(
     review: ReviewCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXPERT]))
 ):
     """创建或更新评审（草稿）"""
-    return create_review(db, review, current_user.id)
+    return await create_review(db, review, current_user.id)
 
 
 @router.put("/{review_id}", response_model=ReviewResponse)
 async def update_review_api(
     review_id: int,
     review_update: ReviewUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXPERT]))
 ):
     """更新评审"""
-    db_review = get_review(db, review_id)
+    db_review = await get_review(db, review_id)
     if not db_review:
         raise HTTPException(status_code=404, detail="评审不存在")
     
     if db_review.expert_id != current_user.id:
         raise HTTPException(status_code=403, detail="无权修改他人的评审")
     
-    return update_review(db, review_id, review_update)
+    return await update_review(db, review_id, review_update)
 
 
 @router.post("/{review_id}/submit")
 async def submit_review_api(
     review_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.EXPERT]))
 ):
     """提交评审"""
-    db_review = get_review(db, review_id)
+    db_review = await get_review(db, review_id)
     if not db_review:
         raise HTTPException(status_code=404, detail="评审不存在")
     
     if db_review.expert_id != current_user.id:
         raise HTTPException(status_code=403, detail="无权提交他人的评审")
     
-    review = submit_review(db, review_id)
+    review = await submit_review(db, review_id)
     return {"message": "评审提交成功", "review": review}
 
 
@@ -90,22 +102,40 @@ async def submit_review_api(
 async def assign_expert(
     app_id: int,
     expert_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """分配专家评审"""
-    review = assign_expert_to_application(db, app_id, expert_id)
+    review = await assign_expert_to_application(db, app_id, expert_id)
     return {"message": "分配成功", "review": review}
 
 
+@router.post("/assign/bulk", response_model=BulkAssignResult)
+async def bulk_assign_experts_api(
+    request: BulkAssignRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
+):
+    """批量分配专家评审（按轮次均衡分配，回避本单位专家，匹配申报类别）"""
+    try:
+        return await bulk_assign_experts(
+            db,
+            award_cycle_id=request.award_cycle_id,
+            experts_per_application=request.experts_per_application,
+            dry_run=request.dry_run
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="分配过程中有专家被同时分配到相同申报，请重新分配")
+
+
 @router.get("/score-summary/{app_id}")
 async def get_score_summary(
     app_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF, UserRole.COMMITTEE]))
 ):
     """获取申报的评分汇总"""
-    summary = get_application_score_summary(db, app_id)
+    summary = await get_application_score_summary(db, app_id)
     if not summary:
         return {"message": "暂无评分数据"}
     return summary
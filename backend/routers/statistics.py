@@ -1,44 +1,49 @@
 """
 统计分析路由
 """
-from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import get_db
-from models import User, UserRole, Application, Organization, Review, ApplicationStatus
+import os
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import func, select
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import User, UserRole, Application, ApplicationStat, Organization, Review
+from crud import statistics
+from utils.time_buckets import Granularity, DEFAULT_BUCKETS, MAX_BUCKETS, count_buckets, fill_buckets, previous_buckets
 from utils.auth import get_current_user, require_role
-from utils.excel_utils import export_applications_to_excel, export_statistics_to_excel
+from utils.excel_utils import (
+    create_applications_export_sheet,
+    append_application_rows,
+    save_workbook_to_tempfile,
+    discard_export_workbook,
+    export_statistics_to_excel
+)
 
 router = APIRouter()
 
 
 @router.get("/overview")
 async def get_overview(
-    db: Session = Depends(get_db),
+    award_cycle_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
-    """获取统计概览"""
-    total_applications = db.query(Application).count()
-    total_organizations = db.query(Organization).count()
-    total_experts = db.query(User).filter(User.role == UserRole.EXPERT).count()
-    total_reviews = db.query(Review).count()
+    """获取统计概览（申报数据读取 application_stats 汇总表）"""
+    total_applications = await statistics.count_applications(db, award_cycle_id)
+    total_organizations = await db.scalar(select(func.count(Organization.id)))
+    total_experts = await db.scalar(select(func.count(User.id)).filter(User.role == UserRole.EXPERT))
+    total_reviews = await db.scalar(select(func.count(Review.id)))
     
     # 按状态统计申报
-    status_stats = db.query(
-        Application.submission_status,
-        func.count(Application.id)
-    ).group_by(Application.submission_status).all()
-    
+    status_stats = await statistics.count_applications_by(db, ApplicationStat.submission_status, award_cycle_id)
     application_by_status = {str(status): count for status, count in status_stats}
     
     # 按组织类型统计申报
-    org_type_stats = db.query(
-        Organization.org_type,
-        func.count(Application.id)
-    ).join(Application, Organization.id == Application.applicant_unit_id)\
-     .group_by(Organization.org_type).all()
-    
+    org_type_stats = await statistics.count_applications_by(db, ApplicationStat.org_type, award_cycle_id)
     application_by_org_type = {str(org_type): count for org_type, count in org_type_stats}
     
     return {
@@ -53,14 +58,12 @@ async def get_overview(
 
 @router.get("/applications-by-status")
 async def get_applications_by_status(
-    db: Session = Depends(get_db),
+    award_cycle_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """按状态统计申报数"""
-    status_stats = db.query(
-        Application.submission_status,
-        func.count(Application.id)
-    ).group_by(Application.submission_status).all()
+    status_stats = await statistics.count_applications_by(db, ApplicationStat.submission_status, award_cycle_id)
     
     return [
         {"status": str(status), "count": count}
@@ -70,14 +73,12 @@ async def get_applications_by_status(
 
 @router.get("/applications-by-year")
 async def get_applications_by_year(
-    db: Session = Depends(get_db),
+    award_cycle_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """按年度统计申报数"""
-    year_stats = db.query(
-        func.year(Application.created_at).label('year'),
-        func.count(Application.id).label('count')
-    ).group_by('year').all()
+    year_stats = await statistics.count_applications_by(db, ApplicationStat.year, award_cycle_id)
     
     return [
         {"year": year, "count": count}
@@ -85,53 +86,121 @@ async def get_applications_by_year(
     ]
 
 
+@router.get("/time-series")
+async def get_application_time_series(
+    granularity: Granularity = Granularity.MONTH,
+    field: str = Query("submitted", pattern="^(created|submitted)$", description="created: 按创建日期; submitted: 按提交日期"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    award_cycle_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    申报数时间序列（按日/周/月/年分桶）
+    
+    未指定 start 时按粒度取最近若干个桶，无数据的桶计为0
+    """
+    end = end or date.today()
+    start = start or previous_buckets(end, granularity, DEFAULT_BUCKETS[granularity])
+    if start > end:
+        raise HTTPException(status_code=400, detail="起始日期不能晚于结束日期")
+    if count_buckets(start, end, granularity) > MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"时间范围过大，最多 {MAX_BUCKETS} 个时间段")
+    
+    daily_counts = await statistics.count_applications_by_date(db, field, start, end, award_cycle_id)
+    points = fill_buckets(daily_counts, start, end, granularity)
+    
+    return {
+        "granularity": granularity,
+        "field": field,
+        "start": start,
+        "end": end,
+        "total": sum(point["count"] for point in points),
+        "points": points
+    }
+
+
+@router.post("/rebuild")
+async def rebuild_statistics(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """由申报表全量重建统计汇总（用于脚本直接修改数据库后校正）"""
+    rows = await statistics.rebuild_application_stats(db)
+    return {"message": "统计汇总已重建", "rows": rows}
+
+
+# 导出时每批从服务端游标拉取的行数
+EXPORT_BATCH_SIZE = 2000
+
+
 @router.get("/export/applications")
 async def export_applications(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
-    """导出申报列表Excel"""
-    applications = db.query(Application).all()
+    """
+    导出申报列表Excel
     
-    # 转换为字典列表
-    app_data = []
-    for app in applications:
-        app_data.append({
-            "title": app.title,
-            "unit_name": app.applicant_unit.name if app.applicant_unit else "",
-            "leader_name": app.leader_name,
-            "status": str(app.submission_status),
-            "submission_time": app.submission_time,
-            "current_stage": app.current_stage,
-            "score_summary_json": app.score_summary_json,
-            "final_result": app.final_result
-        })
+    只查询导出所需列并一次性关联组织表，通过服务端游标(yield_per)分批读取，
+    逐批写入 write-only 工作簿（写入在线程池中执行，不阻塞事件循环），
+    最终文件落盘后以分块方式返回，内存占用与申报数量无关
+    """
+    query = select(
+        Application.title,
+        Organization.name.label("unit_name"),
+        Application.leader_name,
+        Application.submission_status.label("status"),
+        Application.submission_time,
+        Application.current_stage,
+        Application.score_summary_json,
+        Application.final_result
+    ).outerjoin(Organization, Organization.id == Application.applicant_unit_id)\
+     .order_by(Application.id)\
+     .execution_options(yield_per=EXPORT_BATCH_SIZE)
     
-    excel_file = export_applications_to_excel(app_data)
-    
-    return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=applications_export.xlsx"}
-    )
+    wb, ws = create_applications_export_sheet()
+    path = None
+    try:
+        next_index = 1
+        result = await db.stream(query)
+        async for batch in result.mappings().partitions():
+            next_index = await run_in_threadpool(append_application_rows, ws, batch, next_index)
+        
+        path = await run_in_threadpool(save_workbook_to_tempfile, wb)
+        
+        # 文件发送完成后由后台任务删除
+        return FileResponse(
+            path,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename="applications_export.xlsx",
+            background=BackgroundTask(os.remove, path)
+        )
+    except BaseException:
+        # 生成失败（含请求被取消）时响应不会发出，临时文件在此删除
+        if path:
+            os.remove(path)
+        else:
+            discard_export_workbook(wb)
+        raise
 
 
 @router.get("/export/statistics")
 async def export_statistics(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """导出统计数据Excel"""
     # 获取统计数据
-    overview_data = await get_overview(db, current_user)
-    status_data = await get_applications_by_status(db, current_user)
+    overview_data = await get_overview(db=db, current_user=current_user)
     
-    statistics = {
+    statistics_data = {
         "overview": overview_data,
-        "application_by_status": {item["status"]: item["count"] for item in status_data}
+        "application_by_status": overview_data["application_by_status"]
     }
     
-    excel_file = export_statistics_to_excel(statistics)
+    excel_file = export_statistics_to_excel(statistics_data)
     
     return StreamingResponse(
         excel_file,
@@ -3,12 +3,15 @@
 User management routes
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from database import get_db
-from schemas import UserCreate, UserUpdate, UserResponse, PaginatedResponse
-from crud.user import get_users, get_user, create_user, update_user, delete_user, get_user_by_username, get_user_by_email
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from schemas import UserCreate, UserUpdate, UserResponse, UserImportResult, PaginatedResponse
+from crud.user import get_users, get_users_page, get_user, create_user, update_user, delete_user, get_user_by_username, get_user_by_email
 from utils.auth import get_current_user, require_role
+from utils import blob_store
+from utils.file_handler import write_upload_to_temp
+from utils.user_import import import_users
 from models import User, UserRole
 
 router = APIRouter()
@@ -22,7 +25,7 @@ async def list_users(
     username: Optional[str] = None,
     real_name: Optional[str] = None,
     organization_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """
@@ -37,7 +40,7 @@ async def list_users(
         except ValueError:
             pass
     
-    users = get_users(
+    users = await get_users(
         db, 
         skip=skip, 
         limit=limit, 
@@ -49,17 +52,52 @@ async def list_users(
     return users
 
 
+@router.get("/page", response_model=PaginatedResponse[UserResponse], summary="游标分页获取用户列表")
+async def list_users_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    role: Optional[str] = None,
+    username: Optional[str] = None,
+    real_name: Optional[str] = None,
+    organization_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
+):
+    """
+    游标分页获取用户列表
+    next_cursor 传回 cursor 参数获取下一页
+    需要管理员或工作人员权限
+    """
+    # 转换角色枚举
+    role_enum = None
+    if role:
+        try:
+            role_enum = UserRole(role)
+        except ValueError:
+            pass
+    
+    return await get_users_page(
+        db,
+        limit=limit,
+        cursor=cursor,
+        role=role_enum,
+        username=username,
+        real_name=real_name,
+        organization_id=organization_id
+    )
+
+
 @router.get("/{user_id}", response_model=UserResponse, summary="获取用户详情")
 async def get_user_detail(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取用户详情
     需要认证
     """
-    user = get_user(db, user_id)
+    user = await get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
     return user
@@ -68,7 +106,7 @@ async def get_user_detail(
 @router.post("/", response_model=UserResponse, summary="创建用户")
 async def create_new_user(
     user: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """
@@ -76,28 +114,54 @@ async def create_new_user(
     需要管理员或工作人员权限
     """
     # 检查用户名是否存在
-    if get_user_by_username(db, user.username):
+    if await get_user_by_username(db, user.username):
         raise HTTPException(status_code=400, detail="用户名已存在")
     
     # 检查邮箱是否存在
-    if user.email and get_user_by_email(db, user.email):
+    if user.email and await get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="邮箱已被使用")
     
-    return create_user(db, user)
+    return await create_user(db, user)
+
+
+@router.post("/import", response_model=UserImportResult, summary="批量导入用户")
+async def import_users_api(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
+):
+    """
+    按名单批量创建用户（.xlsx 或 .csv）
+    - **dry_run**: 只校验不导入
+    
+    名单列：用户名、姓名、初始密码（必需），角色、电子邮箱、手机、所属单位、专家类别（可选）
+    不合格的行不导入，返回逐行错误；合格的行在同一事务中导入
+    需要管理员或工作人员权限
+    """
+    filename = file.filename or ""
+    if not filename.lower().endswith((".xlsx", ".csv")):
+        raise HTTPException(status_code=400, detail="请上传 .xlsx 或 .csv 格式的名单")
+    
+    temp_path, _, _ = await write_upload_to_temp(file, blob_store.temp_dir())
+    try:
+        return await import_users(db, str(temp_path), filename, dry_run)
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
 @router.put("/{user_id}", response_model=UserResponse, summary="更新用户")
 async def update_user_info(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.STAFF]))
 ):
     """
     更新用户信息
     需要管理员或工作人员权限
     """
-    updated_user = update_user(db, user_id, user_update)
+    updated_user = await update_user(db, user_id, user_update)
     if not updated_user:
         raise HTTPException(status_code=404, detail="用户不存在")
     return updated_user
@@ -106,14 +170,14 @@ async def update_user_info(
 @router.delete("/{user_id}", summary="删除用户")
 async def delete_user_account(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """
     删除用户
     需要管理员权限
     """
-    success = delete_user(db, user_id)
+    success = await delete_user(db, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="用户不存在")
     return {"message": "用户删除成功"}
@@ -3,7 +3,7 @@ Pydantic Schemas - 数据验证模型
 Request/Response Models for API
 """
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Generic, TypeVar
 from datetime import datetime
 from models import UserRole, OrgType, AwardLevel, ApplicationStatus, DecisionType
 
@@ -36,6 +36,7 @@ class UserBase(BaseModel):
     mobile: Optional[str] = None
     role: UserRole = UserRole.APPLICANT
     organization_id: Optional[int] = None
+    expert_categories: Optional[str] = None
 
 
 class UserCreate(UserBase):
@@ -57,9 +58,26 @@ class UserUpdate(BaseModel):
     mobile: Optional[str] = None
     role: Optional[UserRole] = None
     organization_id: Optional[int] = None
+    expert_categories: Optional[str] = None
     is_active: Optional[bool] = None
 
 
+class ImportRowError(BaseModel):
+    """导入失败的行"""
+    row: int  # 文件中的行号
+    errors: List[str]
+
+
+class UserImportResult(BaseModel):
+    """用户名单导入结果"""
+    total_rows: int
+    imported: int  # dry_run 时为校验通过的行数
+    failed: int
+    dry_run: bool
+    errors: List[ImportRowError]
+    errors_truncated: bool
+
+
 class PasswordChange(BaseModel):
     """修改密码"""
     old_password: str
@@ -231,6 +249,16 @@ class ApplicationUpdate(BaseModel):
     social_benefit: Optional[str] = None
 
 
+class ApplicationImportResult(BaseModel):
+    """申报导入结果"""
+    total_rows: int
+    imported: int  # dry_run 时为校验通过的行数
+    failed: int
+    dry_run: bool
+    errors: List[ImportRowError]
+    errors_truncated: bool  # 错误行过多时只列出前1000行
+
+
 class ApplicationSubmit(BaseModel):
     """提交申报"""
     confirm: bool = True
@@ -260,6 +288,12 @@ class ApplicationResponse(ApplicationBase):
         from_attributes = True
 
 
+class ApplicationSearchResult(BaseModel):
+    """申报检索结果"""
+    score: float
+    application: ApplicationResponse
+
+
 # ==================== Attachment Schemas ====================
 class AttachmentBase(BaseModel):
     """附件基础模型"""
@@ -274,6 +308,7 @@ class AttachmentResponse(AttachmentBase):
     application_id: int
     filepath: str
     file_size: Optional[int] = None
+    sha256: Optional[str] = None
     uploaded_by: Optional[int] = None
     version: int
     upload_time: datetime
@@ -310,6 +345,7 @@ class ReviewSubmit(BaseModel):
 
 class ReviewResponse(ReviewBase):
     """评审响应"""
+    scores_json: Optional[Dict[str, Any]] = None  # 已分配未评分的评审尚无评分
     id: int
     expert_id: int
     is_anonymous: bool
@@ -322,6 +358,24 @@ class ReviewResponse(ReviewBase):
         from_attributes = True
 
 
+class BulkAssignRequest(BaseModel):
+    """批量分配专家"""
+    award_cycle_id: int
+    experts_per_application: int = Field(5, ge=1, le=20, description="每个申报的评审专家数")
+    dry_run: bool = Field(False, description="只计算分配方案不写入")
+
+
+class BulkAssignResult(BaseModel):
+    """批量分配结果"""
+    applications: int
+    experts: int
+    assigned: int
+    max_load: int
+    min_load: int
+    shortfall: Dict[int, int] = Field(default_factory=dict, description="专家不足的申报及缺少人数")
+    dry_run: bool
+
+
 # ==================== Committee Decision Schemas ====================
 class CommitteeDecisionBase(BaseModel):
     """评审委员会决议基础模型"""
@@ -403,6 +457,13 @@ class ObjectionCreate(ObjectionBase):
     pass
 
 
+class ObjectionReceipt(BaseModel):
+    """异议受理回执（异议缓冲后批量写入，受理时尚无记录ID）"""
+    status: str  # accepted: 已受理; duplicate: 相同内容已提交过
+    content_hash: str
+    message: str
+
+
 class ObjectionResponse(ObjectionBase):
     """异议响应"""
     id: int
@@ -415,6 +476,22 @@ class ObjectionResponse(ObjectionBase):
         from_attributes = True
 
 
+# ==================== Log Schemas ====================
+class LogResponse(BaseModel):
+    """操作日志响应"""
+    id: int
+    user_id: Optional[int] = None
+    action_type: str
+    action_desc: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    request_data: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 # ==================== Statistics Schemas ====================
 class StatisticsOverview(BaseModel):
     """统计概览"""
@@ -438,9 +515,13 @@ class MessageResponse(BaseModel):
     data: Optional[Any] = None
 
 
-class PaginatedResponse(BaseModel):
+T = TypeVar("T")
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
     """分页响应"""
-    total: int
-    page: int
+    total: Optional[int] = None  # 游标分页不统计总数
+    page: Optional[int] = None
     page_size: int
-    items: List[Any]
+    items: List[T]
+    next_cursor: Optional[str] = None  # 下一页游标，为空表示没有更多数据
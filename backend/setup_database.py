@@ -2,6 +2,7 @@
 数据库初始化脚本
 Database Setup Script - XXXX协会科学技术奖评审管理系统
 """
+import os
 import sys
 import pymysql
 from datetime import datetime, timedelta
@@ -12,11 +13,21 @@ from models import (
     UserRole, OrgType, AwardLevel, ApplicationStatus, DecisionType
 )
 from crud.user import get_password_hash
+from crud.review import build_score_summary
+from crud.statistics import date_backfill_statement, rebuild_statements
 from config import settings
+from utils.log_archive import partition_logs, partition_until
+import migrations
 
 
 def create_database():
     """创建数据库"""
+    if settings.DB_BACKEND == "sqlite":
+        # SQLite 首次连接时自动创建数据库文件，只需保证目录存在
+        if not settings.SQLITE_IN_MEMORY:
+            os.makedirs(os.path.dirname(os.path.abspath(settings.SQLITE_PATH)), exist_ok=True)
+        print(f"✓ 使用 SQLite 数据库 '{settings.SQLITE_PATH}'")
+        return
     try:
         conn = pymysql.connect(
             host=settings.DB_HOST,
@@ -37,6 +48,11 @@ def create_tables():
     """创建所有表"""
     try:
         Base.metadata.create_all(bind=engine)
+        # MySQL 上 logs 按月分区
+        with engine.begin() as conn:
+            partition_logs(conn, partition_until())
+        # 新建的表已是最新结构，标记所有迁移为已执行
+        migrations.stamp(engine)
         print("✓ 数据库表创建成功")
     except Exception as e:
         print(f"✗ 数据库表创建失败: {e}")
@@ -317,6 +333,11 @@ def init_demo_data():
         
         for app in applications:
             db.add(app)
+        db.flush()
+        # 直接插入的申报不经过CRUD，补齐日期字段并重建统计汇总
+        db.execute(date_backfill_statement())
+        for statement in rebuild_statements():
+            db.execute(statement)
         db.commit()
         print(f"✓ 创建了 {len(applications)} 个申报")
         
@@ -363,13 +384,12 @@ def init_demo_data():
         # 更新申报的评分汇总
         app1 = db.query(Application).filter(Application.id == 1).first()
         if app1:
-            app1.score_summary_json = {
-                "average_score": 91.0,
-                "review_count": 2,
-                "scores": [91.0, 91.0],
-                "max_score": 91.0,
-                "min_score": 91.0
-            }
+            app1.score_count = 2
+            app1.score_sum = 182.0
+            app1.score_sum_sq = 2 * 91.0 * 91.0
+            app1.score_min = 91.0
+            app1.score_max = 91.0
+            app1.score_summary_json = build_score_summary(2, 182.0, 2 * 91.0 * 91.0, 91.0, 91.0)
             db.commit()
         
         # 7. 创建公示
@@ -400,7 +420,7 @@ def init_demo_data():
         print("申报人账号: applicant01 / app123, applicant02 / app123")
         print("评委账号: committee01 / comm123")
         print("=" * 60)
-        
+    
     except Exception as e:
         print(f"\n✗ 演示数据创建失败: {e}")
         db.rollback()
@@ -0,0 +1,30 @@
+"""
+测试公共配置
+Shared pytest fixtures
+
+测试使用临时目录中的 SQLite 数据库与上传目录，不连接 MySQL，不修改本地数据。
+数据库配置在导入应用模块前以环境变量设置（优先于 .env）。
+"""
+import os
+import shutil
+import tempfile
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix="award_tests_")
+
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(TEST_DIR, "test.db")
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+os.environ["DEBUG"] = "false"
+os.environ["AUDIT_LOG_ENABLED"] = "false"
+
+
+@pytest.fixture(scope="session")
+def demo_db():
+    """建表并写入演示数据（与 python setup_database.py 相同）"""
+    import setup_database
+    
+    setup_database.create_tables()
+    setup_database.init_demo_data()
+    yield
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
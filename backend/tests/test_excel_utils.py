@@ -0,0 +1,23 @@
+"""
+Excel导出工具测试
+Tests for the streaming export helpers
+"""
+import tempfile
+from utils.excel_utils import append_application_rows, create_applications_export_sheet, discard_export_workbook
+
+ROW = {
+    "title": "导出测试", "unit_name": "测试单位", "leader_name": "张三", "status": "draft",
+    "submission_time": None, "current_stage": None, "score_summary_json": None, "final_result": None,
+}
+
+
+def test_discard_export_workbook_removes_temp_files(tmp_path, monkeypatch):
+    # write-only 工作表的行数据与保存的文件都在临时目录中
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    wb, ws = create_applications_export_sheet()
+    append_application_rows(ws, [ROW] * 10, 1)
+    assert list(tmp_path.iterdir()), "openpyxl 未在临时目录暂存行数据"
+    
+    discard_export_workbook(wb)
+    
+    assert list(tmp_path.iterdir()) == []
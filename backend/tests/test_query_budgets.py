@@ -0,0 +1,292 @@
+"""
+接口SQL查询数检查
+Check that every API endpoint stays within its SQL query budget
+
+逐个请求 BUDGETS 中登记的接口，统计处理一次请求发出的SQL语句数（引擎 before_cursor_execute 事件），
+超出上限即失败并列出全部语句，用于发现新增关系字段、序列化嵌套或循环查询引起的N+1问题：
+- 列表接口（paged=True）分别以 limit=1 与 limit=100 请求，查询数均不得超出上限，即与页大小无关
+- 每次请求前清空用户与公示缓存，按缓存未命中计数，认证查询当前用户计入查询数
+同时检查 BUDGETS 是否覆盖了 /api 下的全部 GET 接口，新增接口须在此登记。
+
+上限的取值：
+- 每个上限都是该接口固定的语句构成（见各条 reason），不随数据量增长，因此不留余量，
+  多出一条语句即说明引入了逐行查询或重复加载
+- 写接口按语句最多的分支计，如首次出现的统计维度、首次上传的文件内容各多一条 INSERT；
+  并发冲突时的重试语句不计
+- 改动确需增减查询时，同时修改上限与 reason
+
+请求以演示数据中的用户身份在进程内发出，数据库会话替换为一个最终回滚的事务。
+
+用法 / Usage:
+    pytest tests/test_query_budgets.py
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import async_engine, get_async_db
+from main import app
+from models import Announcement, Application, ApplicationStatus, Award, CommitteeDecision, DecisionType, Review, User, UserRole
+from utils.auth import create_access_token
+from utils.cache import announcement_cache, user_cache
+
+PAGE_SIZES = (1, 100)
+
+# 各角色使用的演示用户
+ROLE_USERS = {
+    UserRole.ADMIN: "admin",
+    UserRole.STAFF: "staff01",
+    UserRole.EXPERT: "expert01",
+    UserRole.APPLICANT: "applicant01",
+    UserRole.COMMITTEE: "committee01",
+}
+
+# 事务控制语句由检查本身产生，不计入
+IGNORED_STATEMENTS = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@dataclass
+class Budget:
+    """一个接口的查询数上限"""
+    method: str
+    path: str  # 与路由定义一致，用于覆盖检查
+    max_queries: int
+    reason: str  # 上限对应的语句构成
+    role: Optional[UserRole] = UserRole.ADMIN  # None 表示匿名请求
+    url: Optional[str] = None  # 实际请求地址，默认为 path；{name} 以样例数据填充
+    params: Dict[str, Any] = field(default_factory=dict)
+    json: Optional[Callable[[Dict[str, Any]], Any]] = None
+    files: Optional[Dict[str, Tuple[str, bytes, str]]] = None
+    paged: bool = False
+    expected_status: int = 200
+
+
+BUDGETS: List[Budget] = [
+    # ---------------- 认证 ----------------
+    Budget("GET", "/api/auth/me", 1, "当前用户，响应直接使用认证加载的用户"),
+    Budget("GET", "/api/auth/cache-stats", 1, "当前用户，统计取自进程内缓存"),
+    Budget("GET", "/api/auth/hash-pool-stats", 1, "当前用户，统计取自进程内线程池"),
+    # ---------------- 用户与组织 ----------------
+    Budget("GET", "/api/users/", 2, "当前用户 + 用户列表", paged=True),
+    Budget("GET", "/api/users/page", 2, "当前用户 + 一页用户", paged=True),
+    Budget("GET", "/api/users/{user_id}", 2, "当前用户 + 目标用户"),
+    Budget("GET", "/api/organizations/", 2, "当前用户 + 组织列表", paged=True),
+    Budget("GET", "/api/organizations/{org_id}", 2, "当前用户 + 组织"),
+    # ---------------- 奖项 ----------------
+    Budget("GET", "/api/awards/", 2, "当前用户 + 奖项列表", paged=True),
+    Budget("GET", "/api/awards/{award_id}", 2, "当前用户 + 奖项"),
+    Budget("GET", "/api/awards/cycles/", 2, "当前用户 + 轮次列表", paged=True),
+    Budget("GET", "/api/awards/cycles/{cycle_id}", 2, "当前用户 + 轮次"),
+    # ---------------- 申报 ----------------
+    Budget("GET", "/api/applications/", 3, "当前用户 + 申报列表 + selectinload 申报单位（一条IN查询）", paged=True),
+    Budget("GET", "/api/applications/", 3, "按本单位过滤，语句构成同管理员", role=UserRole.APPLICANT, paged=True),
+    Budget("GET", "/api/applications/page", 3, "当前用户 + 一页申报 + selectinload 申报单位", paged=True),
+    Budget("GET", "/api/applications/search", 3, "当前用户 + 检索结果 + selectinload 申报单位",
+           params={"q": "技术"}, paged=True),
+    Budget("GET", "/api/applications/{app_id}", 3, "当前用户 + 申报 + selectinload 申报单位"),
+    Budget("GET", "/api/applications/{app_id}/attachments", 2, "当前用户 + 附件列表"),
+    Budget("POST", "/api/applications/", 6,
+           "当前用户 + INSERT 申报 + 单位类型 + 统计计数 UPDATE（汇总行不存在时再 INSERT）+ 刷新申报",
+           role=UserRole.APPLICANT, json=lambda s: {
+               "award_cycle_id": s["cycle_id"], "applicant_unit_id": s["applicant_org_id"], "title": "查询数检查申报"
+           }),
+    Budget("PUT", "/api/applications/{app_id}", 7,
+           "当前用户 + 路由与 crud 各加载一次申报及单位（2×2）+ UPDATE + 刷新申报",
+           role=UserRole.APPLICANT, url="/api/applications/{draft_app_id}",
+           json=lambda s: {"summary": "查询数检查"}),
+    Budget("POST", "/api/applications/{app_id}/attachments", 8,
+           "当前用户 + 申报及单位 + 引用计数 UPDATE + 新内容 INSERT file_blobs + 最大版本号 + INSERT 附件 + 刷新附件",
+           role=UserRole.APPLICANT, url="/api/applications/{draft_app_id}/attachments",
+           files={"file": ("查询数检查.pdf", b"%PDF-1.4 query budget check", "application/pdf")}),
+    Budget("POST", "/api/applications/{app_id}/submit", 8,
+           "当前用户 + 申报及单位 + UPDATE 申报 + 草稿计数减一 + 已提交计数 UPDATE 与 INSERT + 刷新申报",
+           role=UserRole.APPLICANT, url="/api/applications/{draft_app_id}/submit"),
+    # ---------------- 评审 ----------------
+    Budget("GET", "/api/reviews/my-reviews", 3, "当前用户 + 评审列表 + selectinload 专家",
+           role=UserRole.EXPERT, paged=True),
+    Budget("GET", "/api/reviews/my-reviews/page", 3, "当前用户 + 一页评审 + selectinload 专家",
+           role=UserRole.EXPERT, paged=True),
+    Budget("GET", "/api/reviews/application/{app_id}", 3, "当前用户 + 评审列表 + selectinload 专家"),
+    Budget("GET", "/api/reviews/score-summary/{app_id}", 2, "当前用户 + 申报上的评分汇总列"),
+    Budget("PUT", "/api/reviews/{review_id}", 8,
+           "当前用户 + 路由与 crud 各加载一次评审及专家（2×2）+ UPDATE + 刷新评审及专家",
+           role=UserRole.EXPERT, json=lambda s: {"comment": "查询数检查"}),
+    Budget("POST", "/api/reviews/{review_id}/submit", 6,
+           "当前用户 + 路由与 crud 各加载一次评审及专家（2×2）+ UPDATE",
+           role=UserRole.EXPERT),
+    # ---------------- 评审委员会 ----------------
+    Budget("GET", "/api/committee/decisions", 2, "当前用户 + 决议列表", paged=True),
+    Budget("GET", "/api/committee/decisions/page", 2, "当前用户 + 一页决议", paged=True),
+    Budget("GET", "/api/committee/decisions/{decision_id}", 2, "当前用户 + 决议"),
+    Budget("GET", "/api/committee/decisions/application/{app_id}", 2, "当前用户 + 申报的决议"),
+    # ---------------- 公示 ----------------
+    Budget("GET", "/api/announcements/", 1, "匿名，公示列表", role=None, paged=True),
+    Budget("GET", "/api/announcements/page", 1, "匿名，一页公示", role=None, paged=True),
+    Budget("GET", "/api/announcements/{announcement_id}", 1, "匿名，公示", role=None),
+    Budget("GET", "/api/announcements/{announcement_id}/objections", 2, "当前用户 + 异议列表"),
+    Budget("GET", "/api/announcements/objections/intake-stats", 1, "当前用户，统计取自进程内异议缓冲"),
+    # 异议提交接口未登记：请求内只查询公示是否存在，异议由后台任务批量写入（utils.objection_intake），检查中不启动该任务
+    # ---------------- 文件 ----------------
+    Budget("GET", "/api/files/download/{file_path:path}", 1, "当前用户，文件直接从上传目录读取",
+           url="/api/files/download/{file_path}"),
+    Budget("GET", "/api/files/storage-usage", 4, "当前用户 + 内容存储、待回收内容、附件三项聚合"),
+    Budget("GET", "/api/files/template/application", 0, "匿名，模板在内存中生成", role=None),
+    # ---------------- 统计与日志 ----------------
+    Budget("GET", "/api/statistics/overview", 7,
+           "当前用户 + 申报总数 + 组织数 + 专家数 + 评审数 + 按状态、按单位类型两组汇总"),
+    Budget("GET", "/api/statistics/applications-by-status", 2, "当前用户 + 按状态汇总"),
+    Budget("GET", "/api/statistics/applications-by-year", 2, "当前用户 + 按年度汇总"),
+    Budget("GET", "/api/statistics/time-series", 2, "当前用户 + 按日分组（年/月/周在内存中归并）"),
+    Budget("GET", "/api/statistics/export/applications", 2, "当前用户 + 一条联表查询流式读取"),
+    Budget("GET", "/api/statistics/export/statistics", 7, "当前用户 + 与 overview 相同的六项汇总"),
+    Budget("GET", "/api/logs/", 2, "当前用户 + 日志列表", paged=True),
+]
+
+
+def uncovered_routes() -> List[str]:
+    """/api 下未登记查询数上限的 GET 接口"""
+    budgeted = {(budget.method, budget.path) for budget in BUDGETS}
+    return [
+        f"GET {route.path}" for route in app.routes
+        if route.path.startswith("/api") and "GET" in getattr(route, "methods", ())
+        and ("GET", route.path) not in budgeted
+    ]
+
+
+def budget_id(budget: Budget) -> str:
+    """测试ID，如 GET /api/applications/ (applicant)"""
+    return f"{budget.method} {budget.path}" + (f" ({budget.role.value})" if budget.role else "")
+
+
+async def sample_data(db: AsyncSession) -> Dict[str, Any]:
+    """取演示数据中的样例ID，缺少的数据在事务中补充"""
+    users = {
+        role: await db.scalar(select(User).filter(User.username == username))
+        for role, username in ROLE_USERS.items()
+    }
+    expert, applicant = users[UserRole.EXPERT], users[UserRole.APPLICANT]
+    
+    review = await db.scalar(select(Review).filter(Review.expert_id == expert.id).limit(1))
+    draft_app_id = await db.scalar(select(Application.id).filter(
+        Application.applicant_unit_id == applicant.organization_id,
+        Application.submission_status == ApplicationStatus.DRAFT
+    ).limit(1))
+    cycle_id = await db.scalar(select(Application.award_cycle_id).limit(1))
+    assert review is not None and draft_app_id is not None and cycle_id is not None, "演示数据不完整"
+    
+    decision_id = await db.scalar(select(CommitteeDecision.id).limit(1))
+    if decision_id is None:
+        decision = CommitteeDecision(
+            application_id=review.application_id, decision=DecisionType.APPROVED, decided_by=users[UserRole.COMMITTEE].id
+        )
+        db.add(decision)
+        await db.flush()
+        decision_id = decision.id
+    announcement_id = await db.scalar(select(Announcement.id).limit(1))
+    if announcement_id is None:
+        announcement = Announcement(title="查询数检查公示", content="查询数检查", start_time=datetime.now(), end_time=datetime.now())
+        db.add(announcement)
+        await db.flush()
+        announcement_id = announcement.id
+    
+    # 补充的数据并入外层事务，不随每个请求后的回滚撤销
+    await db.commit()
+    
+    download = Path(settings.UPLOAD_DIR) / "query_budget_check.txt"
+    download.parent.mkdir(parents=True, exist_ok=True)
+    download.write_text("query budget check")
+    return {
+        "user_id": expert.id,
+        "org_id": applicant.organization_id,
+        "applicant_org_id": applicant.organization_id,
+        "award_id": await db.scalar(select(Award.id).limit(1)),
+        "cycle_id": cycle_id,
+        "app_id": review.application_id,
+        "draft_app_id": draft_app_id,
+        "review_id": review.id,
+        "decision_id": decision_id,
+        "announcement_id": announcement_id,
+        "file_path": download.resolve(),
+        "tokens": {
+            role: {"Authorization": f"Bearer {create_access_token(data={'sub': user.username, 'role': user.role})}"}
+            for role, user in users.items()
+        },
+    }
+
+
+async def measure(budget: Budget) -> List[Tuple[Optional[int], httpx.Response, List[str]]]:
+    """在回滚的事务中请求接口，返回各页大小下的 (limit, 响应, 执行的语句)"""
+    captured: List[str] = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(IGNORED_STATEMENTS):
+            captured.append(statement)
+    
+    sync_engine = async_engine.sync_engine
+    results = []
+    try:
+        async with async_engine.connect() as conn:
+            transaction = await conn.begin()
+            async with AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False) as db:
+                samples = await sample_data(db)
+                
+                async def override_db():
+                    yield db
+                
+                app.dependency_overrides[get_async_db] = override_db
+                event.listen(sync_engine, "before_cursor_execute", capture)
+                try:
+                    async with httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://budget"
+                    ) as client:
+                        url = (budget.url or budget.path).format(**samples)
+                        headers = samples["tokens"][budget.role] if budget.role else {}
+                        for limit in (PAGE_SIZES if budget.paged else (None,)):
+                            params = {**budget.params, **({"limit": limit} if limit else {})}
+                            # 不复用上一个请求加载的对象与缓存，按首次请求计数
+                            db.expunge_all()
+                            user_cache.clear()
+                            announcement_cache.clear()
+                            captured.clear()
+                            response = await client.request(
+                                budget.method, url, params=params, headers=headers,
+                                json=budget.json(samples) if budget.json else None, files=budget.files
+                            )
+                            await db.rollback()
+                            results.append((limit, response, list(captured)))
+                finally:
+                    event.remove(sync_engine, "before_cursor_execute", capture)
+                    app.dependency_overrides.pop(get_async_db, None)
+            await transaction.rollback()
+    finally:
+        # 连接池绑定在本次 asyncio.run 的事件循环上
+        await async_engine.dispose()
+    return results
+
+
+@pytest.fixture(autouse=True)
+def no_audit_log(monkeypatch):
+    """审计日志会额外写库，不计入接口查询数"""
+    monkeypatch.setattr(settings, "AUDIT_LOG_ENABLED", False)
+
+
+@pytest.mark.parametrize("budget", BUDGETS, ids=budget_id)
+def test_query_budget(demo_db, budget: Budget):
+    for limit, response, statements in asyncio.run(measure(budget)):
+        name = budget_id(budget) + (f" limit={limit}" if limit else "")
+        assert response.status_code == budget.expected_status, f"{name}: {response.text[:160]}"
+        listing = "\n".join(f"  - {' '.join(statement.split())[:160]}" for statement in statements)
+        assert len(statements) <= budget.max_queries, (
+            f"{name}: {len(statements)} queries > budget {budget.max_queries}（{budget.reason}）\n{listing}"
+        )
+
+
+def test_every_get_endpoint_has_budget():
+    missing = uncovered_routes()
+    assert not missing, f"未登记查询数上限的接口，请在 BUDGETS 中补充: {missing}"
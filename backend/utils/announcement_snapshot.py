@@ -0,0 +1,153 @@
+"""
+公示静态快照
+Pre-rendered JSON snapshots of public announcements, served directly by nginx
+
+每次创建/更新公示后，将公开接口的响应渲染为静态JSON写入 ANNOUNCEMENT_SNAPSHOT_DIR：
+
+    {SNAPSHOT_DIR}/
+        current -> versions/<version>    # 符号链接，原子切换
+        versions/<version>/
+            index.json                   # 与 GET /api/announcements/ 的响应完全一致
+            pages/<n>.json               # 按默认每页条数分页的列表
+            detail/<id>.json             # 与 GET /api/announcements/{id} 的响应完全一致
+            manifest.json                # 版本、生成时间、总数、页数
+
+新版本先写入临时目录再改名，最后替换 current 链接，读取方不会看到写了一半的版本。
+nginx 配置见 deploy/nginx.conf：无查询参数的GET请求直接读取 current 下的文件，文件不存在时回落到后端。
+发布失败时移除 current 链接，请求全部回落到后端，保证不会长期提供过期内容。
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
+from config import settings
+from models import Announcement
+from schemas import AnnouncementResponse, PaginatedResponse
+
+try:
+    import fcntl
+except ImportError:  # Windows 开发环境，不启用快照时无需文件锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 与 GET /api/announcements/ 默认 limit 一致
+SNAPSHOT_PAGE_SIZE = 20
+# 保留的历史版本数（nginx 可能仍在读取刚被替换的版本）
+KEEP_VERSIONS = 3
+
+announcement_list_adapter = TypeAdapter(List[AnnouncementResponse])
+announcement_page_adapter = TypeAdapter(PaginatedResponse[AnnouncementResponse])
+announcement_adapter = TypeAdapter(AnnouncementResponse)
+
+
+def dump_json(adapter: TypeAdapter, value: Any) -> bytes:
+    """按响应模型序列化（ORM对象先经模型校验），公开接口与快照共用以保证内容一致"""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def active_announcements_query():
+    """公开列表的查询（按ID排序，分页结果稳定）"""
+    return select(Announcement).filter(Announcement.status == "active").order_by(Announcement.id)
+
+
+def snapshot_root() -> Optional[Path]:
+    """快照目录，未配置时返回None（不发布）"""
+    return Path(settings.ANNOUNCEMENT_SNAPSHOT_DIR) if settings.ANNOUNCEMENT_SNAPSHOT_DIR else None
+
+
+async def render_snapshot(db: AsyncSession) -> Dict[str, bytes]:
+    """渲染全部快照文件 Returns: {相对路径: 内容}"""
+    announcements = list(await db.scalars(active_announcements_query()))
+    files: Dict[str, bytes] = {}
+    
+    pages = [
+        announcements[offset:offset + SNAPSHOT_PAGE_SIZE]
+        for offset in range(0, len(announcements), SNAPSHOT_PAGE_SIZE)
+    ] or [[]]
+    for number, page in enumerate(pages, start=1):
+        files[f"pages/{number}.json"] = dump_json(announcement_list_adapter, page)
+    files["index.json"] = files["pages/1.json"]
+    
+    for announcement in announcements:
+        files[f"detail/{announcement.id}.json"] = dump_json(announcement_adapter, announcement)
+    
+    files["manifest.json"] = json.dumps({
+        "generated_at": datetime.now().isoformat(),
+        "total": len(announcements),
+        "page_size": SNAPSHOT_PAGE_SIZE,
+        "pages": len(pages)
+    }, ensure_ascii=False).encode("utf-8")
+    return files
+
+
+def write_snapshot(root: Path, files: Dict[str, bytes], version: str) -> bool:
+    """
+    写入新版本并切换 current 链接
+    多进程同时发布时以文件锁串行化，版本号（渲染开始时间）不新于当前版本则放弃
+    Returns: 是否已切换
+    """
+    versions_dir = root / "versions"
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    current = root / "current"
+    
+    with open(root / ".lock", "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        
+        if current.is_symlink() and os.readlink(current).split("/")[-1] >= version:
+            return False
+        
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=versions_dir))
+        for relative_path, content in files.items():
+            path = staging / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        staging.chmod(0o755)
+        target = versions_dir / version
+        staging.rename(target)
+        
+        link = root / f".current-{version}"
+        link.symlink_to(Path("versions") / version)
+        os.replace(link, current)
+        
+        for old in sorted(path for path in versions_dir.iterdir() if not path.name.startswith("."))[:-KEEP_VERSIONS]:
+            shutil.rmtree(old, ignore_errors=True)
+    return True
+
+
+def withdraw_snapshot(root: Path) -> None:
+    """移除 current 链接，公开请求全部回落到后端"""
+    try:
+        (root / "current").unlink()
+    except FileNotFoundError:
+        pass
+
+
+async def publish_snapshot(db: AsyncSession) -> Optional[str]:
+    """
+    发布公示快照，未配置快照目录时跳过
+    发布失败只记录日志并撤下快照，不影响调用方的业务操作
+    Returns: 新版本号，跳过或失败时返回None
+    """
+    root = snapshot_root()
+    if root is None:
+        return None
+    
+    version = datetime.now().strftime("%Y%m%d%H%M%S%f")
+    try:
+        files = await render_snapshot(db)
+        switched = await run_in_threadpool(write_snapshot, root, files, version)
+        return version if switched else None
+    except Exception:
+        logger.exception("公示快照发布失败，已撤下快照，公开请求将由后端处理")
+        await run_in_threadpool(withdraw_snapshot, root)
+        return None
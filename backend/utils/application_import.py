@@ -0,0 +1,120 @@
+"""
+申报Excel批量导入
+Bulk import of applications from the Excel template
+
+按申报模板（utils.excel_utils.create_application_template）填写的工作簿以只读流式模式读取，
+每 IMPORT_CHUNK_SIZE 行为一批：
+- 按 ApplicationCreate 校验各行
+- 批内新出现的申报单位名称用一次查询解析为组织ID（已解析的名称在整个导入过程中复用）
+- 合格的行以一条 executemany 插入
+
+所有批次在同一事务中执行，全部处理完才提交，中途出错时整体回滚。
+不合格的行不导入，按Excel行号返回错误原因。
+"""
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zipfile import BadZipFile
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import OrgType
+from schemas import ApplicationCreate
+from crud.application import bulk_create_applications
+from crud.organization import get_organizations_by_names
+from utils.excel_utils import APPLICATION_IMPORT_FIELDS, iter_application_import_rows
+
+IMPORT_CHUNK_SIZE = 1000
+# 报告中最多列出的错误行数（其余只计数）
+MAX_REPORTED_ERRORS = 1000
+
+UNIT_HEADER = "申报单位名称"
+FIELD_HEADERS = {field: header for header, field in APPLICATION_IMPORT_FIELDS.items()}
+
+
+def _next_chunk(rows: Iterator, size: int) -> List[Tuple[int, Dict[str, Optional[str]]]]:
+    """读取下一批行（在线程中执行，解析Excel不阻塞事件循环）"""
+    try:
+        return list(islice(rows, size))
+    except (BadZipFile, InvalidFileException, KeyError, OSError):
+        raise HTTPException(status_code=400, detail="无法读取Excel文件，请上传 .xlsx 格式的申报模板")
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    """校验错误转为以模板列名标注的说明"""
+    messages = []
+    for error in exc.errors():
+        field = error["loc"][0] if error["loc"] else ""
+        messages.append(f"{FIELD_HEADERS.get(field, field)}: {error['msg']}")
+    return messages
+
+
+async def import_applications(
+    db: AsyncSession,
+    path: str,
+    award_cycle_id: int,
+    user_id: int,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    导入申报（全部为草稿状态），dry_run 时只校验不写入
+    Returns: 导入结果及逐行错误报告
+    """
+    organizations: Dict[str, Tuple[int, Optional[OrgType]]] = {}
+    checked_names = set()
+    errors: List[Dict[str, Any]] = []
+    total = imported = failed = 0
+    
+    rows = iter_application_import_rows(path)
+    try:
+        while chunk := await run_in_threadpool(_next_chunk, rows, IMPORT_CHUNK_SIZE):
+            total += len(chunk)
+            new_names = {values[UNIT_HEADER] for _, values in chunk if values[UNIT_HEADER]} - checked_names
+            if new_names:
+                organizations.update(await get_organizations_by_names(db, new_names))
+                checked_names |= new_names
+            
+            apps: List[ApplicationCreate] = []
+            for row_number, values in chunk:
+                row_errors = []
+                unit_name = values[UNIT_HEADER]
+                org = organizations.get(unit_name) if unit_name else None
+                if not unit_name:
+                    row_errors.append(f"{UNIT_HEADER}: 不能为空")
+                elif org is None:
+                    row_errors.append(f"{UNIT_HEADER}: 单位不存在（{unit_name}）")
+                try:
+                    app = ApplicationCreate(
+                        award_cycle_id=award_cycle_id,
+                        applicant_unit_id=org[0] if org else 0,
+                        **{field: values[header] for header, field in APPLICATION_IMPORT_FIELDS.items()}
+                    )
+                except ValidationError as exc:
+                    row_errors.extend(_validation_messages(exc))
+                
+                if row_errors:
+                    failed += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append({"row": row_number, "errors": row_errors})
+                else:
+                    apps.append(app)
+            
+            if not dry_run:
+                org_types = {org_id: org_type for org_id, org_type in organizations.values()}
+                imported += await bulk_create_applications(db, apps, org_types, user_id)
+            else:
+                imported += len(apps)
+    finally:
+        rows.close()
+    
+    if not dry_run:
+        await db.commit()
+    return {
+        "total_rows": total,
+        "imported": imported,
+        "failed": failed,
+        "dry_run": dry_run,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
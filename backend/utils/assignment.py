@@ -0,0 +1,137 @@
+"""
+专家分配算法
+Balanced expert assignment planner
+
+按申报类别将专家分组，每个申报从其类别组中选出当前工作量最少的专家，
+并排除与申报单位同属一个组织的专家及已分配过该申报的专家。
+各类别的申报交错分配，避免先分配的类别用满共享专家的工作量。
+"""
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 未限定类别的专家及未填写类别的申报使用的分组键
+ANY_CATEGORY = ""
+
+
+@dataclass
+class ExpertSlot:
+    """待分配专家"""
+    id: int
+    organization_id: Optional[int]
+    categories: Set[str]  # 为空表示可评审任意类别
+    load: int = 0
+
+
+@dataclass
+class ApplicationSlot:
+    """待分配申报"""
+    id: int
+    organization_id: Optional[int]
+    category: Optional[str]
+    needed: int
+    assigned: Set[int] = field(default_factory=set)  # 已分配的专家ID
+
+
+@dataclass
+class AssignmentPlan:
+    """分配结果"""
+    pairs: List[Tuple[int, int]]  # (application_id, expert_id)
+    shortfall: Dict[int, int]  # application_id -> 缺少的专家数
+    loads: Dict[int, int]  # expert_id -> 分配后工作量
+
+
+def parse_categories(value: Optional[str]) -> Set[str]:
+    """解析专家擅长类别（逗号分隔）"""
+    if not value:
+        return set()
+    return {item.strip() for item in value.replace("，", ",").split(",") if item.strip()}
+
+
+class _Pool:
+    """某一类别可选专家的最小堆，按(工作量, 专家ID)排序；工作量变化后旧条目惰性丢弃"""
+    
+    def __init__(self):
+        self.heap: List[Tuple[int, int]] = []
+        self.size = 0
+    
+    def push(self, expert: ExpertSlot) -> None:
+        heapq.heappush(self.heap, (expert.load, expert.id))
+
+
+def plan_assignments(
+    applications: Iterable[ApplicationSlot],
+    experts: Iterable[ExpertSlot]
+) -> AssignmentPlan:
+    """
+    计算均衡分配方案
+    
+    时间复杂度约为 O(分配数 × log 专家数)，每个申报只在其类别组的堆中取数
+    """
+    experts_by_id = {expert.id: expert for expert in experts}
+    applications = list(applications)
+    
+    # 建立类别分组：限定类别的专家进入对应分组，不限类别的专家进入所有分组
+    categories = {app.category or ANY_CATEGORY for app in applications}
+    pools: Dict[str, _Pool] = {category: _Pool() for category in categories}
+    memberships: Dict[int, List[_Pool]] = {}
+    for expert in experts_by_id.values():
+        joined = [
+            pool for category, pool in pools.items()
+            if not expert.categories or category == ANY_CATEGORY or category in expert.categories
+        ]
+        memberships[expert.id] = joined
+        for pool in joined:
+            pool.push(expert)
+            pool.size += 1
+    
+    # 各类别申报按进度交错分配，使共享的不限类别专家在各组间均匀消耗；
+    # 同一进度下可选专家少的类别优先
+    by_category: Dict[str, List[ApplicationSlot]] = {}
+    for app in sorted(applications, key=lambda app: app.id):
+        by_category.setdefault(app.category or ANY_CATEGORY, []).append(app)
+    progress = {
+        app.id: (rank / len(group), pools[category].size)
+        for category, group in by_category.items()
+        for rank, app in enumerate(group)
+    }
+    applications.sort(key=lambda app: (progress[app.id], app.id))
+    
+    pairs: List[Tuple[int, int]] = []
+    shortfall: Dict[int, int] = {}
+    for app in applications:
+        pool = pools[app.category or ANY_CATEGORY]
+        chosen: List[ExpertSlot] = []
+        skipped: List[Tuple[int, int]] = []
+        seen: Set[int] = set()
+        while len(chosen) < app.needed and pool.heap:
+            load, expert_id = heapq.heappop(pool.heap)
+            expert = experts_by_id[expert_id]
+            if load != expert.load or expert_id in seen:
+                continue  # 过期条目
+            seen.add(expert_id)
+            if expert_id in app.assigned or (
+                app.organization_id is not None and expert.organization_id == app.organization_id
+            ):
+                skipped.append((load, expert_id))
+                continue
+            chosen.append(expert)
+        
+        for entry in skipped:
+            heapq.heappush(pool.heap, entry)
+        
+        for expert in chosen:
+            expert.load += 1
+            app.assigned.add(expert.id)
+            pairs.append((app.id, expert.id))
+            for member_pool in memberships[expert.id]:
+                member_pool.push(expert)
+        
+        if len(chosen) < app.needed:
+            shortfall[app.id] = app.needed - len(chosen)
+    
+    return AssignmentPlan(
+        pairs=pairs,
+        shortfall=shortfall,
+        loads={expert_id: expert.load for expert_id, expert in experts_by_id.items()}
+    )
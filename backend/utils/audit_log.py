@@ -0,0 +1,142 @@
+"""
+操作日志
+Audit logging of mutating API requests with buffered batch inserts
+
+AuditLogMiddleware 记录 /api 下所有增删改请求（POST/PUT/PATCH/DELETE）到 logs 表：
+- action_type: 路由函数名（如 update_application_status）
+- action_desc: 方法、路由模板与响应状态码
+- request_data: 路径参数、查询参数、状态码与耗时（不记录请求体，避免写入密码等敏感数据）
+- user_id: 由 utils.auth.get_current_user 写入 request.state，未认证的请求为空
+
+日志放入内存缓冲后由后台任务批量写入（utils.batch_writer），请求本身不增加数据库提交。
+缓冲已满时请求最多等待 AUDIT_LOG_FULL_WAIT 秒，仍无空位则丢弃该条日志并计数，不影响业务请求。
+
+路由中需要记录业务含义更明确的操作时调用 record_action，该请求不再由中间件重复记录。
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi import Request
+from sqlalchemy import insert
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from database import AsyncSessionLocal
+from models import Log
+from utils.batch_writer import BatchWriter
+from utils.rate_limit import client_ip
+
+logger = logging.getLogger(__name__)
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# 不由中间件记录的路由：公开异议提交量大，且异议表已记录来源IP
+SKIPPED_ROUTES = {"create_objection"}
+
+audit_writer = BatchWriter(
+    name="audit-log",
+    session_factory=AsyncSessionLocal,
+    statement_factory=lambda dialect: insert(Log),
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=settings.AUDIT_LOG_FLUSH_INTERVAL,
+    max_queue=settings.AUDIT_LOG_QUEUE_SIZE
+)
+
+
+def build_record(
+    request: Request,
+    action_type: str,
+    action_desc: Optional[str] = None,
+    request_data: Optional[Dict[str, Any]] = None,
+    user_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """组装一条日志"""
+    user_agent = request.headers.get("user-agent")
+    return {
+        "user_id": user_id if user_id is not None else getattr(request.state, "user_id", None),
+        "action_type": action_type[:50],
+        "action_desc": action_desc,
+        "ip_address": client_ip(request)[:50],
+        "user_agent": user_agent[:255] if user_agent else None,
+        "request_data": request_data,
+        "created_at": datetime.now()
+    }
+
+
+async def enqueue(record: Dict[str, Any]) -> bool:
+    """放入日志缓冲 Returns: 是否已入队（缓冲已满时丢弃）"""
+    if await audit_writer.put(record, settings.AUDIT_LOG_FULL_WAIT):
+        return True
+    # 持续丢弃时每1000条提示一次
+    if audit_writer.full % 1000 == 1:
+        logger.warning("操作日志缓冲已满，已丢弃 %d 条日志", audit_writer.full)
+    return False
+
+
+async def record_action(
+    request: Request,
+    action_type: str,
+    action_desc: Optional[str] = None,
+    request_data: Optional[Dict[str, Any]] = None,
+    user_id: Optional[int] = None
+) -> bool:
+    """
+    在路由中记录一条操作日志
+    该请求不再由中间件记录
+    """
+    request.state.audit_logged = True
+    if not settings.AUDIT_LOG_ENABLED:
+        return False
+    return await enqueue(build_record(request, action_type, action_desc, request_data, user_id))
+
+
+class AuditLogMiddleware:
+    """记录 /api 下增删改请求的ASGI中间件"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or not scope["path"].startswith("/api/")
+            or not settings.AUDIT_LOG_ENABLED
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        # 保证路由与依赖写入的 request.state 与本中间件读取的是同一个字典
+        scope.setdefault("state", {})
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            await self._record(scope, status_code, time.perf_counter() - started)
+    
+    async def _record(self, scope: Scope, status_code: int, elapsed: float) -> None:
+        route = scope.get("route")
+        name = getattr(route, "name", None)
+        if name in SKIPPED_ROUTES or scope["state"].get("audit_logged"):
+            return
+        
+        request = Request(scope)
+        path = getattr(route, "path", scope["path"])
+        await enqueue(build_record(
+            request,
+            action_type=name or scope["method"].lower(),
+            action_desc=f"{scope['method']} {path} {status_code}",
+            request_data={
+                "path_params": scope.get("path_params", {}),
+                "query": dict(request.query_params),
+                "status_code": status_code,
+                "duration_ms": round(elapsed * 1000, 2)
+            }
+        ))
@@ -5,13 +5,14 @@ JWT Authentication utilities
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from config import settings
-from database import get_db
+from database import get_async_db
 from models import User
 from crud.user import get_user_by_username
+from utils.cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -45,8 +46,9 @@ def verify_token(token: str) -> Optional[dict]:
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     获取当前用户
@@ -66,13 +68,23 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
     
-    user = get_user_by_username(db, username=username)
+    # 优先读取缓存，命中时不访问数据库
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        # 读库前记录，读取期间用户被修改（缓存失效）时不写回旧数据
+        generation = user_cache.generation
+        user = await get_user_by_username(db, username=username)
+        if user is None:
+            raise credentials_exception
+        # 从会话中移除后缓存，避免后续请求共享会话状态
+        db.expunge(user)
+        user_cache.set(username, user, generation)
     
     if not user.is_active:
         raise HTTPException(status_code=400, detail="用户已被禁用")
     
+    # 供操作日志中间件记录操作人
+    request.state.user_id = user.id
     return user
 
 
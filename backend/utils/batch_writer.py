@@ -0,0 +1,157 @@
+"""
+缓冲批量写入
+In-memory buffer flushed to the database with bulk inserts by a background task
+
+请求处理中只把行数据放入内存队列，后台任务按条数（batch_size）或时间（flush_interval）
+合并为一次 executemany 插入并提交，避免每个请求单独提交一次。
+应用关闭时写完队列中的数据；进程异常退出时最多丢失一个写入周期内的数据。
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    缓冲批量写入器
+    
+    - statement_factory: 以数据库方言名（mysql/sqlite）调用，返回批量插入语句，每批以行字典列表执行
+    - batch_size: 每次写入的最大条数
+    - flush_interval: 首条数据入队后最长等待多久写入（秒）
+    - max_queue: 缓冲上限，队列满时 put 返回 False，由调用方决定拒绝还是丢弃
+    - on_failed: 行最终写入失败时的回调
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        session_factory: async_sessionmaker,
+        statement_factory: Callable[[str], Any],
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        on_failed: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.name = name
+        self.session_factory = session_factory
+        self.statement_factory = statement_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.on_failed = on_failed
+        self.enqueued = 0
+        self.full = 0
+        self.peak_queued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        """启动后台写入任务（应用启动时调用）"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name=self.name)
+    
+    async def stop(self) -> None:
+        """停止接收，写完队列中的数据后退出（应用关闭时调用）"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+    
+    async def put(self, row: Dict[str, Any], timeout: float = 0) -> bool:
+        """
+        放入一行数据
+        队列满时最多等待 timeout 秒（以请求延迟换取不丢数据）；未启动后台任务时（如脚本中）直接写入
+        Returns: 是否已入队
+        """
+        if not self.running:
+            await self._write([row])
+            return True
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            if timeout <= 0:
+                self.full += 1
+                return False
+            try:
+                await asyncio.wait_for(self._queue.put(row), timeout)
+            except asyncio.TimeoutError:
+                self.full += 1
+                return False
+        self.enqueued += 1
+        self.peak_queued = max(self.peak_queued, self._queue.qsize())
+        return True
+    
+    async def _run(self) -> None:
+        """按条数或时间间隔批量写入"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._write(batch)
+    
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """批量写入；失败时逐条重试，跳过无法写入的行"""
+        self.batches += 1
+        try:
+            async with self.session_factory() as db:
+                await db.execute(self.statement_factory(db.bind.dialect.name), batch)
+                await db.commit()
+            self.written += len(batch)
+            return
+        except Exception:
+            logger.exception("%s 批量写入失败，改为逐条写入 (%d 条)", self.name, len(batch))
+        
+        for row in batch:
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(self.statement_factory(db.bind.dialect.name), [row])
+                    await db.commit()
+                self.written += 1
+            except Exception:
+                self.failed += 1
+                if self.on_failed:
+                    self.on_failed(row)
+                logger.exception("%s 写入失败，已丢弃: %r", self.name, row)
+    
+    def stats(self) -> Dict[str, Any]:
+        """队列与写入统计"""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "peak_queued": self.peak_queued,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "full": self.full,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches
+        }
@@ -0,0 +1,80 @@
+"""
+内容寻址文件存储
+Content-addressed blob storage
+
+附件文件按 SHA-256 存放在 {UPLOAD_DIR}/blobs/ab/cd/abcd... 下，
+相同内容只保存一份；引用计数记录在 file_blobs 表中（见 crud.blob）。
+"""
+import os
+import time
+from pathlib import Path
+from typing import Iterator, Tuple
+from config import settings
+
+
+def blob_root() -> Path:
+    """内容存储根目录"""
+    return Path(settings.UPLOAD_DIR) / "blobs"
+
+
+def temp_dir() -> Path:
+    """上传临时目录（与内容存储位于同一文件系统，保证移动为原子操作）"""
+    path = Path(settings.UPLOAD_DIR) / "tmp"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def blob_path(sha256: str) -> Path:
+    """根据哈希计算存储路径，前两级目录各取两位十六进制分片"""
+    return blob_root() / sha256[:2] / sha256[2:4] / sha256
+
+
+def place_blob(temp_path: Path, sha256: str) -> bool:
+    """
+    将临时文件移入内容存储
+    Returns: 是否新写入（内容已存在时丢弃临时文件）
+    """
+    target = blob_path(sha256)
+    if target.exists():
+        temp_path.unlink(missing_ok=True)
+        return False
+    
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, target)
+    return True
+
+
+def remove_blob(sha256: str) -> bool:
+    """删除内容文件"""
+    try:
+        blob_path(sha256).unlink()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def iter_blob_files() -> Iterator[Tuple[str, Path, os.stat_result]]:
+    """遍历内容存储中的文件 Yields: (sha256, path, stat)"""
+    root = blob_root()
+    if not root.exists():
+        return
+    for path in root.glob("*/*/*"):
+        if path.is_file():
+            yield path.name, path, path.stat()
+
+
+def remove_stale_temp_files(grace_seconds: int, dry_run: bool = False) -> Tuple[int, int]:
+    """
+    清理中断上传遗留的临时文件
+    Returns: (文件数, 字节数)
+    """
+    count, size = 0, 0
+    deadline = time.time() - grace_seconds
+    for path in temp_dir().iterdir():
+        stat = path.stat()
+        if path.is_file() and stat.st_mtime < deadline:
+            count += 1
+            size += stat.st_size
+            if not dry_run:
+                path.unlink(missing_ok=True)
+    return count, size
@@ -0,0 +1,81 @@
+"""
+进程内缓存工具
+In-process cache utilities
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from config import settings
+
+
+class TTLCache:
+    """
+    带过期时间的LRU缓存
+    TTL cache with LRU eviction and hit/miss counters
+    """
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # clear()/invalidate() 时递增；读库前记录，写入时不一致则放弃，避免并发读把失效前的数据写回
+        self.generation = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，过期或不存在时返回default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+    
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """写入缓存；指定 generation 时仅在其后未发生 clear()/invalidate() 才写入"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """删除单个缓存项（同时使进行中的读库结果不再写入，失效较少，不区分键）"""
+        with self._lock:
+            self._data.pop(key, None)
+            self.generation += 1
+    
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+    
+    def stats(self) -> Dict[str, Optional[float]]:
+        """缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None
+            }
+
+
+# 已认证用户缓存（按令牌subject即用户名索引）
+user_cache = TTLCache(ttl=settings.AUTH_USER_CACHE_TTL, maxsize=settings.AUTH_USER_CACHE_SIZE)
+
+# 公开公示接口的响应缓存（序列化后的响应体及ETag），创建/更新公示时清空
+announcement_cache = TTLCache(ttl=settings.ANNOUNCEMENT_CACHE_TTL, maxsize=settings.ANNOUNCEMENT_CACHE_SIZE)
@@ -2,10 +2,51 @@
 Excel处理工具
 Excel handling utilities
 """
-from typing import List, Dict, Any
+import csv
+import logging
+import os
+import tempfile
+from typing import List, Dict, Any, Iterable, Iterator, Mapping, Optional, Tuple
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from io import BytesIO
+from openpyxl.utils import get_column_letter
+from io import BytesIO, StringIO
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# 申报模板表头
+APPLICATION_TEMPLATE_HEADERS = [
+    "申报单位名称",
+    "项目名称",
+    "项目负责人",
+    "负责人职称",
+    "团队成员",
+    "项目摘要",
+    "主要创新点",
+    "技术指标",
+    "应用价值",
+    "经济效益",
+    "社会效益",
+    "联系人",
+    "联系电话",
+    "电子邮箱"
+]
+
+# 模板列与申报字段的对应关系（联系人、联系电话、电子邮箱暂无对应字段，导入时忽略）
+APPLICATION_IMPORT_FIELDS = {
+    "项目名称": "title",
+    "项目负责人": "leader_name",
+    "负责人职称": "leader_title",
+    "团队成员": "team_members",
+    "项目摘要": "summary",
+    "主要创新点": "innovation_points",
+    "技术指标": "technical_details",
+    "应用价值": "application_value",
+    "经济效益": "economic_benefit",
+    "社会效益": "social_benefit"
+}
 
 
 def create_application_template() -> BytesIO:
@@ -22,26 +63,8 @@ def create_application_template() -> BytesIO:
     header_font = Font(bold=True, color="FFFFFF")
     header_alignment = Alignment(horizontal="center", vertical="center")
     
-    # 定义表头
-    headers = [
-        "申报单位名称",
-        "项目名称",
-        "项目负责人",
-        "负责人职称",
-        "团队成员",
-        "项目摘要",
-        "主要创新点",
-        "技术指标",
-        "应用价值",
-        "经济效益",
-        "社会效益",
-        "联系人",
-        "联系电话",
-        "电子邮箱"
-    ]
-    
     # 写入表头
-    for col, header in enumerate(headers, 1):
+    for col, header in enumerate(APPLICATION_TEMPLATE_HEADERS, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.fill = header_fill
         cell.font = header_font
@@ -92,67 +115,203 @@ def create_application_template() -> BytesIO:
     return output
 
 
-def export_applications_to_excel(applications: List[Dict[str, Any]]) -> BytesIO:
+def _cell_text(value: Any) -> Optional[str]:
+    """单元格内容转为文本，空白单元格返回None"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _column_headers(header_row: Iterable[Any], headers: List[str], required: Iterable[str]) -> List[Optional[str]]:
     """
-    导出申报列表到Excel
-    Export applications to Excel
+    按表头文本确定各列对应的模板列（列顺序不限，多余的列忽略）
+    缺少必需列时返回400
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "申报列表"
+    columns = [text if text in headers else None for text in map(_cell_text, header_row)]
+    missing = [header for header in required if header not in columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"缺少列: {'、'.join(missing)}，请按模板填写")
+    return columns
+
+
+def _iter_mapped_rows(
+    rows: Iterator[Iterable[Any]],
+    headers: List[str],
+    required: Iterable[str]
+) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """首行为表头，其余各行转为 {表头: 文本}，缺少的列为None，跳过整行为空的行"""
+    columns = _column_headers(next(rows, ()), headers, required)
+    for row_number, row in enumerate(rows, start=2):
+        values = dict.fromkeys(headers)
+        for header, value in zip(columns, row):
+            if header is not None:
+                values[header] = _cell_text(value)
+        if any(values.values()):
+            yield row_number, values
+
+
+def iter_sheet_rows(
+    path: str,
+    headers: List[str],
+    required: Iterable[str] = ()
+) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """
+    以只读流式模式逐行读取工作簿的第一个工作表
+    只在内存中保留当前行，可处理数万行的文件
+    Yields: (Excel行号, {表头: 文本})
+    """
+    # 以文件对象打开，上传的临时文件没有 .xlsx 扩展名
+    with open(path, "rb") as file:
+        wb = load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from _iter_mapped_rows(wb.worksheets[0].iter_rows(values_only=True), headers, required)
+        finally:
+            wb.close()
+
+
+def iter_csv_rows(
+    path: str,
+    headers: List[str],
+    required: Iterable[str] = ()
+) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """
+    读取CSV文件（UTF-8，或Excel另存的GBK编码）
+    Yields: (行号, {表头: 文本})
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    for encoding in ("utf-8-sig", "gb18030"):
+        try:
+            text = data.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        raise HTTPException(status_code=400, detail="无法识别CSV文件编码，请另存为UTF-8编码")
+    yield from _iter_mapped_rows(csv.reader(StringIO(text)), headers, required)
+
+
+def iter_application_import_rows(path: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """
+    逐行读取按申报模板填写的工作簿，模板各列均须存在
+    Yields: (Excel行号, {表头: 文本})，跳过整行为空的行
+    """
+    return iter_sheet_rows(path, APPLICATION_TEMPLATE_HEADERS, required=APPLICATION_TEMPLATE_HEADERS)
+
+
+# 申报导出表头及列宽
+APPLICATION_EXPORT_HEADERS = [
+    ("序号", 8),
+    ("项目名称", 35),
+    ("申报单位", 25),
+    ("项目负责人", 15),
+    ("申报状态", 15),
+    ("提交时间", 20),
+    ("当前阶段", 20),
+    ("评审平均分", 15),
+    ("最终结果", 15)
+]
+
+
+def create_applications_export_sheet() -> Tuple[Workbook, Any]:
+    """
+    创建申报导出工作簿（write-only模式）并写入表头
+    Create a write-only workbook for application export
+    
+    write-only 模式下每行追加后即序列化到临时文件，内存占用与行数无关
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title="申报列表")
+    
+    # 列宽须在写入任何行之前设置
+    for col, (_, width) in enumerate(APPLICATION_EXPORT_HEADERS, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
     
     # 标题样式
     header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF")
     header_alignment = Alignment(horizontal="center", vertical="center")
     
-    # 定义表头
-    headers = [
-        "序号",
-        "项目名称",
-        "申报单位",
-        "项目负责人",
-        "申报状态",
-        "提交时间",
-        "当前阶段",
-        "评审平均分",
-        "最终结果"
-    ]
-    
-    # 写入表头
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
+    header_row = []
+    for header, _ in APPLICATION_EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.fill = header_fill
         cell.font = header_font
         cell.alignment = header_alignment
+        header_row.append(cell)
+    ws.append(header_row)
     
-    # 写入数据
-    for idx, app in enumerate(applications, 1):
-        ws.cell(row=idx+1, column=1, value=idx)
-        ws.cell(row=idx+1, column=2, value=app.get('title', ''))
-        ws.cell(row=idx+1, column=3, value=app.get('unit_name', ''))
-        ws.cell(row=idx+1, column=4, value=app.get('leader_name', ''))
-        ws.cell(row=idx+1, column=5, value=app.get('status', ''))
-        ws.cell(row=idx+1, column=6, value=str(app.get('submission_time', '')))
-        ws.cell(row=idx+1, column=7, value=app.get('current_stage', ''))
-        
+    return wb, ws
+
+
+def append_application_rows(ws: Any, applications: Iterable[Mapping[str, Any]], start_index: int = 1) -> int:
+    """
+    向导出工作表追加申报行
+    Append application rows to the export sheet
+    
+    Returns: 下一行的序号
+    """
+    idx = start_index
+    for app in applications:
         # 评分
         score_summary = app.get('score_summary_json', {})
         avg_score = score_summary.get('average_score', '') if score_summary else ''
-        ws.cell(row=idx+1, column=8, value=avg_score)
         
-        ws.cell(row=idx+1, column=9, value=app.get('final_result', ''))
+        ws.append([
+            idx,
+            app.get('title', ''),
+            app.get('unit_name', ''),
+            app.get('leader_name', ''),
+            str(app.get('status', '')),
+            str(app.get('submission_time', '')),
+            app.get('current_stage', ''),
+            avg_score,
+            app.get('final_result', '')
+        ])
+        idx += 1
+    return idx
+
+
+def save_workbook_to_tempfile(wb: Workbook, suffix: str = ".xlsx") -> str:
+    """
+    将工作簿保存到临时文件，返回文件路径（由调用方负责删除）
+    Save workbook to a temporary file
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        wb.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def discard_export_workbook(wb: Workbook) -> None:
+    """
+    丢弃未保存的 write-only 导出工作簿（导出中途失败时调用，已保存的工作簿删除保存的文件即可）
+    Discard an unsaved write-only workbook
     
-    # 设置列宽
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 35
-    ws.column_dimensions['C'].width = 25
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    ws.column_dimensions['F'].width = 20
-    ws.column_dimensions['G'].width = 20
-    ws.column_dimensions['H'].width = 15
-    ws.column_dimensions['I'].width = 15
+    write-only 工作表的行数据暂存在 openpyxl 自建的临时文件中，只在保存时删除；
+    因此保存到临时文件后一并删除，只依赖公开接口
+    """
+    try:
+        os.remove(save_workbook_to_tempfile(wb))
+    except Exception:
+        logger.exception("丢弃导出工作簿失败，openpyxl 临时文件可能残留")
+
+
+def export_applications_to_excel(applications: Iterable[Mapping[str, Any]]) -> BytesIO:
+    """
+    导出申报列表到Excel
+    Export applications to Excel
+    
+    大批量导出请使用 create_applications_export_sheet + append_application_rows
+    逐批写入并保存到临时文件，避免整个文件驻留内存
+    """
+    wb, ws = create_applications_export_sheet()
+    append_application_rows(ws, applications)
     
     # 保存到BytesIO
     output = BytesIO()
@@ -2,13 +2,18 @@
 文件处理工具
 File handling utilities
 """
+import hashlib
 import os
 import uuid
+import anyio
 from pathlib import Path
 from typing import Optional
 from fastapi import UploadFile, HTTPException
 from config import settings
 
+# 上传文件分块大小（字节）
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 def get_file_extension(filename: str) -> str:
     """获取文件扩展名"""
@@ -28,44 +33,71 @@ def generate_unique_filename(original_filename: str) -> str:
     return unique_name
 
 
+def ensure_file_type(filename: str) -> None:
+    """验证文件类型，不支持时抛出400"""
+    if not validate_file_type(filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的文件类型。允许的类型: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+        )
+
+
+async def write_upload_to_temp(upload_file: UploadFile, upload_dir: Path) -> tuple[Path, int, str]:
+    """
+    将上传文件分块写入 upload_dir 下的临时文件
+    
+    按 UPLOAD_CHUNK_SIZE 分块读取（文件IO在线程中执行，不阻塞事件循环），
+    边写边计算SHA-256；累计大小超过限制时立即中止并删除临时文件。
+    单个上传的内存占用不超过一个分块。
+    
+    Returns: (temp_path, file_size, sha256)
+    """
+    temp_path = upload_dir / f"{uuid.uuid4().hex}.part"
+    file_size = 0
+    digest = hashlib.sha256()
+    try:
+        async with await anyio.open_file(temp_path, "wb") as f:
+            while chunk := await upload_file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                
+                # 检查文件大小
+                if file_size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"文件大小超过限制({settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB)"
+                    )
+                
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    
+    return temp_path, file_size, digest.hexdigest()
+
+
 async def save_upload_file(
     upload_file: UploadFile,
     subdir: str = "general"
-) -> tuple[str, str, int]:
+) -> tuple[str, str, int, str]:
     """
     保存上传文件
-    Returns: (filepath, filename, file_size)
+    Returns: (filepath, filename, file_size, sha256)
     """
     # 验证文件类型
-    if not validate_file_type(upload_file.filename):
-        raise HTTPException(
-            status_code=400,
-            detail=f"不支持的文件类型。允许的类型: {', '.join(settings.ALLOWED_EXTENSIONS)}"
-        )
+    ensure_file_type(upload_file.filename)
     
     # 创建上传目录
     upload_dir = Path(settings.UPLOAD_DIR) / subdir
     upload_dir.mkdir(parents=True, exist_ok=True)
     
-    # 生成唯一文件名
+    # 分块写入临时文件后重命名为唯一文件名
+    temp_path, file_size, sha256 = await write_upload_to_temp(upload_file, upload_dir)
     unique_filename = generate_unique_filename(upload_file.filename)
     file_path = upload_dir / unique_filename
+    os.replace(temp_path, file_path)
     
-    # 保存文件
-    content = await upload_file.read()
-    file_size = len(content)
-    
-    # 检查文件大小
-    if file_size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"文件大小超过限制({settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB)"
-        )
-    
-    with open(file_path, "wb") as f:
-        f.write(content)
-    
-    return str(file_path), unique_filename, file_size
+    return str(file_path), unique_filename, file_size, sha256
 
 
 def delete_file(filepath: str) -> bool:
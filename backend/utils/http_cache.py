@@ -0,0 +1,40 @@
+"""
+HTTP缓存工具
+ETag / Cache-Control helpers for cacheable JSON responses
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Request, Response
+
+
+@dataclass(frozen=True)
+class RenderedResponse:
+    """序列化后的响应体及其强ETag"""
+    body: bytes
+    etag: str
+    
+    @classmethod
+    def from_body(cls, body: bytes) -> "RenderedResponse":
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（按RFC 9110使用弱比较，忽略 W/ 前缀）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def cached_json_response(request: Request, rendered: RenderedResponse, max_age: int) -> Response:
+    """返回带 ETag 与 Cache-Control 的JSON响应，客户端已有相同版本时返回304"""
+    headers = {
+        "ETag": rendered.etag,
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+    }
+    if etag_matches(request.headers.get("if-none-match"), rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
@@ -0,0 +1,211 @@
+"""
+操作日志分区与归档
+Monthly partitioning, archiving and retention for the logs table
+
+- MySQL: logs 按 created_at 做 RANGE COLUMNS 月分区（p202601 存放 2026年1月的日志），末尾为 pmax；
+  按时间范围查询时只读取相关分区，过期月份整分区删除，不产生大批量 DELETE
+- 其他数据库（SQLite 开发环境）不分区，依靠 created_at 相关索引做范围查询，过期日志分批删除
+
+保留期（LOG_RETENTION_MONTHS）之前的日志按月写入 LOG_ARCHIVE_DIR/logs-YYYYMM.jsonl.gz
+（每行一条日志的JSON），归档文件写完后才删除数据库中的日志。
+用法见 backend/rotate_logs.py
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, func, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from config import settings
+from models import Log
+
+# 归档时每次从数据库读取的行数，以及非分区表每次删除的行数
+CHUNK_SIZE = 5000
+
+
+def month_start(value: datetime) -> datetime:
+    """所在月份的第一天零点"""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """月份加减"""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: datetime, last: datetime) -> List[datetime]:
+    """first 到 last（含）之间的各月第一天"""
+    months, month = [], month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(month: datetime) -> str:
+    return f"p{month:%Y%m}"
+
+
+def partition_until() -> datetime:
+    """分区需要覆盖到的月份（当前月份加 LOG_PARTITIONS_AHEAD）"""
+    return add_months(month_start(datetime.now()), settings.LOG_PARTITIONS_AHEAD)
+
+
+# ==================== MySQL 分区 ====================
+def partition_bounds(conn: Connection) -> Dict[str, Optional[datetime]]:
+    """logs 的现有分区及上界（pmax 为 None），未分区或非MySQL时返回空字典"""
+    if conn.dialect.name != "mysql":
+        return {}
+    rows = conn.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'logs' AND PARTITION_NAME IS NOT NULL"
+    )).all()
+    return {
+        name: None if description == "MAXVALUE" else datetime.fromisoformat(description.strip("'"))
+        for name, description in rows
+    }
+
+
+def _partition_definitions(months: List[datetime]) -> str:
+    definitions = [
+        f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d %H:%M:%S}')"
+        for month in months
+    ]
+    definitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ", ".join(definitions)
+
+
+def _prepare_for_partitioning(conn: Connection) -> None:
+    """分区表要求主键包含分区字段且不支持外键：删除外键，主键改为 (id, created_at)"""
+    inspector = inspect(conn)
+    for foreign_key in inspector.get_foreign_keys("logs"):
+        conn.execute(text(f"ALTER TABLE logs DROP FOREIGN KEY `{foreign_key['name']}`"))
+    conn.execute(update(Log).where(Log.created_at.is_(None)).values(created_at=datetime.now()))
+    if "created_at" not in inspector.get_pk_constraint("logs")["constrained_columns"]:
+        conn.execute(text(
+            "ALTER TABLE logs MODIFY created_at DATETIME NOT NULL COMMENT '创建时间', "
+            "DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)"
+        ))
+
+
+def partition_logs(conn: Connection, until: datetime) -> List[str]:
+    """
+    确保 logs 按月分区并覆盖到 until 所在月份（仅MySQL，其他数据库直接返回）
+    未分区时从已有日志的最早月份开始建立分区；已分区时从 pmax 中拆出新的月份
+    Returns: 新建的分区名
+    """
+    if conn.dialect.name != "mysql":
+        return []
+    last = month_start(until)
+    bounds = partition_bounds(conn)
+    if not bounds:
+        _prepare_for_partitioning(conn)
+        earliest = conn.scalar(select(func.min(Log.created_at)))
+        months = month_range(earliest or last, last)
+        conn.execute(text(f"ALTER TABLE logs PARTITION BY RANGE COLUMNS(created_at) ({_partition_definitions(months)})"))
+    else:
+        covered = max(bound for bound in bounds.values() if bound is not None)
+        months = month_range(covered, last)
+        if months:
+            conn.execute(text(f"ALTER TABLE logs REORGANIZE PARTITION pmax INTO ({_partition_definitions(months)})"))
+    return [partition_name(month) for month in months]
+
+
+def drop_partitions_before(conn: Connection, cutoff: datetime) -> List[str]:
+    """删除上界不晚于 cutoff 的分区（其中的日志均早于 cutoff）"""
+    expired = [name for name, bound in partition_bounds(conn).items() if bound is not None and bound <= cutoff]
+    if expired:
+        conn.execute(text(f"ALTER TABLE logs DROP PARTITION {', '.join(expired)}"))
+    return expired
+
+
+# ==================== 归档与保留期 ====================
+def archive_path(archive_dir: Path, month: datetime) -> Path:
+    """归档文件路径；同一月份重复归档（如上次删除中途失败）时另起文件，不覆盖已有归档"""
+    path = archive_dir / f"logs-{month:%Y%m}.jsonl.gz"
+    sequence = 1
+    while path.exists():
+        sequence += 1
+        path = archive_dir / f"logs-{month:%Y%m}.{sequence}.jsonl.gz"
+    return path
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+
+def count_month(conn: Connection, month: datetime) -> int:
+    """某月的日志条数"""
+    return conn.scalar(select(func.count()).select_from(Log).filter(
+        Log.created_at >= month, Log.created_at < add_months(month, 1)
+    ))
+
+
+def archive_month(conn: Connection, month: datetime, archive_dir: Path) -> int:
+    """
+    将某月的日志写入 gzip 压缩的 JSONL 文件（流式读取，先写临时文件再改名）
+    Returns: 归档条数，没有日志时不生成文件
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_path(archive_dir, month)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    result = conn.execution_options(stream_results=True, yield_per=CHUNK_SIZE).execute(
+        select(Log.__table__)
+        .filter(Log.created_at >= month, Log.created_at < add_months(month, 1))
+        .order_by(Log.created_at, Log.id)
+    )
+    count = 0
+    with gzip.open(temp_path, "wt", encoding="utf-8") as archive:
+        for row in result.mappings():
+            archive.write(json.dumps(dict(row), ensure_ascii=False, default=_json_default) + "\n")
+            count += 1
+    if count:
+        os.replace(temp_path, path)
+    else:
+        temp_path.unlink()
+    return count
+
+
+def delete_before(engine: Engine, cutoff: datetime) -> int:
+    """分批删除 cutoff 之前的日志（未分区的表），每批单独提交 Returns: 删除条数"""
+    deleted = 0
+    while True:
+        with engine.begin() as conn:
+            ids = list(conn.scalars(select(Log.id).filter(Log.created_at < cutoff).limit(CHUNK_SIZE)))
+            if not ids:
+                return deleted
+            conn.execute(delete(Log).where(Log.id.in_(ids)))
+        deleted += len(ids)
+
+
+def rotate_logs(engine: Engine, retain_months: int, archive_dir: Path, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    日志轮转：归档并删除保留期之前的日志，MySQL 上同时补齐未来月份的分区
+    dry_run 时只统计各月条数
+    """
+    cutoff = add_months(month_start(datetime.now()), -retain_months)
+    with engine.connect() as conn:
+        earliest = conn.scalar(select(func.min(Log.created_at)))
+    months = month_range(earliest, add_months(cutoff, -1)) if earliest and earliest < cutoff else []
+    
+    archived: Dict[str, int] = {}
+    for month in months:
+        with engine.connect() as conn:
+            count = count_month(conn, month) if dry_run else archive_month(conn, month, archive_dir)
+        if count:
+            archived[f"{month:%Y-%m}"] = count
+    
+    summary = {"cutoff": cutoff, "archived": archived, "dropped_partitions": [], "deleted": 0, "created_partitions": []}
+    if dry_run:
+        return summary
+    with engine.begin() as conn:
+        summary["dropped_partitions"] = drop_partitions_before(conn, cutoff)
+    summary["deleted"] = delete_before(engine, cutoff)
+    with engine.begin() as conn:
+        summary["created_partitions"] = partition_logs(conn, partition_until())
+    return summary
@@ -0,0 +1,127 @@
+"""
+异议缓冲写入
+Buffered objection intake with batched inserts and content deduplication
+
+公开异议接口只做校验、限流和去重后放入内存队列即返回，后台任务（utils.batch_writer）按
+OBJECTION_BATCH_SIZE 条或 OBJECTION_FLUSH_INTERVAL 秒批量写入数据库。
+
+去重分两层：
+- 进程内记住最近收到的 (公示ID, 内容哈希)，重复提交不入队
+- objections (announcement_id, content_hash) 唯一索引，批量写入时跳过与之冲突的重复行，
+  覆盖多进程及重启后的重复提交；其他写入错误照常记录
+
+应用关闭时停止接收并写完队列中的异议；进程异常退出时未写入的异议会丢失，
+丢失范围不超过一个写入周期。
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Dict
+from fastapi import HTTPException
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from config import settings
+from models import Objection
+from utils.batch_writer import BatchWriter
+from utils.cache import TTLCache
+
+
+def content_hash(content: str) -> str:
+    """异议内容哈希（忽略空白差异）"""
+    normalized = " ".join(content.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def insert_ignore_duplicates(dialect: str):
+    """
+    跳过重复异议的批量插入语句
+    只忽略唯一索引冲突；数据过长、外键不存在等错误仍然抛出（INSERT IGNORE 会把它们降级为警告）
+    """
+    if dialect == "sqlite":
+        return sqlite_insert(Objection).on_conflict_do_nothing(index_elements=["announcement_id", "content_hash"])
+    # 表上只有主键与该唯一索引，主键由数据库生成，冲突即为重复异议
+    statement = mysql_insert(Objection)
+    return statement.on_duplicate_key_update(id=statement.table.c.id)
+
+
+class ObjectionIntake:
+    """
+    异议缓冲队列
+    
+    - batch_size: 每次批量写入的最大条数
+    - flush_interval: 首条异议入队后最长等待多久写入（秒）
+    - max_queue: 缓冲上限，队列满时返回503
+    """
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        dedup_ttl: int
+    ):
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self._recent = TTLCache(ttl=dedup_ttl, maxsize=max(max_queue * 10, 1024))
+        self.writer = BatchWriter(
+            name="objection-intake",
+            session_factory=session_factory,
+            statement_factory=insert_ignore_duplicates,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+            on_failed=lambda row: self._recent.invalidate((row["announcement_id"], row["content_hash"]))
+        )
+    
+    def start(self) -> None:
+        """启动后台写入任务（应用启动时调用）"""
+        self.writer.start()
+    
+    async def stop(self) -> None:
+        """停止接收，写完队列中的异议后退出（应用关闭时调用）"""
+        await self.writer.stop()
+    
+    async def submit(self, values: Dict[str, Any]) -> bool:
+        """
+        受理一条异议
+        values 为 Objection 字段，须包含 announcement_id 与 content_hash
+        Returns: True 表示已入队；False 表示相同内容已提交过
+        """
+        key = (values["announcement_id"], values["content_hash"])
+        if self._recent.get(key):
+            self.duplicates += 1
+            return False
+        
+        row = {"status": "pending", "created_at": datetime.now(), "updated_at": datetime.now(), **values}
+        if not await self.writer.put(row):
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="系统繁忙，请稍后重试")
+        self._recent.set(key, True)
+        self.accepted += 1
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        """受理与写入统计"""
+        return {
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            **self.writer.stats()
+        }
+
+
+def _create_intake() -> ObjectionIntake:
+    from database import AsyncSessionLocal
+    return ObjectionIntake(
+        session_factory=AsyncSessionLocal,
+        batch_size=settings.OBJECTION_BATCH_SIZE,
+        flush_interval=settings.OBJECTION_FLUSH_INTERVAL,
+        max_queue=settings.OBJECTION_QUEUE_SIZE,
+        dedup_ttl=settings.OBJECTION_DEDUP_TTL
+    )
+
+
+# 全局异议缓冲队列
+objection_intake = _create_intake()
@@ -0,0 +1,116 @@
+"""
+密码哈希工作池
+Bounded worker pool for bcrypt hashing and verification
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+from fastapi import HTTPException
+from config import settings
+
+
+class PasswordHashPool:
+    """
+    将bcrypt计算派发到独立线程池，避免阻塞事件循环
+    bcrypt在计算期间释放GIL，因此线程池即可利用多核
+    
+    - max_workers: 并发计算上限，0表示在事件循环内同步执行
+    - max_queue: 排队上限，超过时返回503，0表示不限制
+    """
+    
+    def __init__(self, max_workers: int, max_queue: int = 0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        # pending/completed 由工作线程中的完成回调修改
+        self._lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+            if max_workers > 0 else None
+        )
+    
+    @property
+    def in_flight(self) -> int:
+        """正在计算的任务数"""
+        return min(self.pending, self.max_workers) if self._executor else 0
+    
+    @property
+    def queued(self) -> int:
+        """排队等待的任务数"""
+        return self.pending - self.in_flight if self._executor else 0
+    
+    async def map(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        批量执行（如导入用户时哈希全部密码），结果与输入顺序一致
+        全部任务一次提交，不受排队上限限制
+        """
+        items = list(items)
+        if self._executor is None:
+            self.completed += len(items)
+            return [func(item) for item in items]
+        
+        return await asyncio.gather(*(self._submit(func, item) for item in items))
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """在工作池中执行哈希函数"""
+        if self._executor is None:
+            self.completed += 1
+            return func(*args)
+        
+        if self.max_queue and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="系统繁忙，请稍后重试")
+        
+        future = self._submit(func, *args)
+        self.peak_queued = max(self.peak_queued, self.queued)
+        return await future
+    
+    def _submit(self, func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+        """
+        提交到线程池
+        pending 在线程中的任务结束（或排队中被取消）时才减少：等待方被取消（如客户端断开）时
+        已在计算的任务仍占用线程，不能提前释放排队名额
+        """
+        with self._lock:
+            self.pending += 1
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._task_done)
+        return asyncio.wrap_future(future)
+    
+    def _task_done(self, future: Future) -> None:
+        """线程池任务结束回调（在工作线程或取消方线程中执行）"""
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+    
+    def stats(self) -> Dict[str, int]:
+        """工作池运行统计"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+    
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+# 全局密码哈希工作池
+password_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+# 批量哈希工作池（导入用户），与登录使用的工作池分开，批量任务不占用登录的排队名额
+bulk_password_pool = PasswordHashPool(max_workers=settings.PASSWORD_BULK_HASH_WORKERS or os.cpu_count() or 1)
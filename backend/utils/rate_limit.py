@@ -0,0 +1,90 @@
+"""
+限流工具
+Per-client token bucket rate limiting
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+from fastapi import HTTPException, Request
+from config import settings
+
+
+class TokenBucketLimiter:
+    """
+    按键（如客户端IP）独立计数的令牌桶
+    每个键以 rate 个/秒 的速度补充令牌，最多积攒 capacity 个，每次请求消耗一个
+    
+    只保留最近活跃的 max_keys 个键，被淘汰的键下次访问时视为满桶
+    """
+    
+    def __init__(self, rate: float, capacity: int, max_keys: int = 100000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+    
+    def acquire(self, key: Hashable) -> float:
+        """
+        尝试消耗一个令牌
+        Returns: 0 表示允许；否则为需要等待的秒数
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.capacity), now))
+            tokens = min(float(self.capacity), tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+    
+    def check(self, key: Hashable) -> None:
+        """消耗一个令牌，令牌不足时返回429"""
+        wait = self.acquire(key)
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="提交过于频繁，请稍后重试",
+                headers={"Retry-After": str(max(1, round(wait)))}
+            )
+    
+    def stats(self) -> Dict[str, int]:
+        """限流统计"""
+        with self._lock:
+            return {"tracked_keys": len(self._buckets), "allowed": self.allowed, "rejected": self.rejected}
+
+
+def client_ip(request: Request) -> str:
+    """
+    客户端IP
+    请求来自可信反向代理（TRUSTED_PROXY_IPS）时取 X-Real-IP 或 X-Forwarded-For 的第一个地址
+    """
+    peer = request.client.host if request.client else ""
+    if peer in settings.TRUSTED_PROXY_IPS:
+        forwarded = request.headers.get("x-real-ip") or request.headers.get("x-forwarded-for", "").split(",")[0]
+        if forwarded.strip():
+            return forwarded.strip()
+    return peer
+
+
+# 公开异议提交限流（按客户端IP）
+objection_limiter = TokenBucketLimiter(
+    rate=settings.OBJECTION_RATE_PER_MINUTE / 60,
+    capacity=settings.OBJECTION_RATE_BURST
+)
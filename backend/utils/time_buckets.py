@@ -0,0 +1,95 @@
+"""
+时间分桶工具
+Date bucketing helpers for time-series statistics
+
+数据库只按日期（已存储的日期字段）分组，年/月/周汇总在此由日计数归并，
+不依赖数据库的日期函数，MySQL 与 SQLite 行为一致。
+"""
+from datetime import date, timedelta
+from enum import Enum
+from typing import Dict, Iterable, List, Tuple
+
+
+class Granularity(str, Enum):
+    """时间粒度"""
+    DAY = "day"
+    WEEK = "week"  # 自然周，周一为起点
+    MONTH = "month"
+    YEAR = "year"
+
+
+# 未指定起始日期时默认统计的桶数
+DEFAULT_BUCKETS = {
+    Granularity.DAY: 30,
+    Granularity.WEEK: 26,
+    Granularity.MONTH: 12,
+    Granularity.YEAR: 10,
+}
+
+# 单次查询允许的最大桶数
+MAX_BUCKETS = 1000
+
+
+def bucket_start(day: date, granularity: Granularity) -> date:
+    """日期所属桶的起始日期"""
+    if granularity == Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == Granularity.MONTH:
+        return day.replace(day=1)
+    if granularity == Granularity.YEAR:
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_bucket(start: date, granularity: Granularity) -> date:
+    """下一个桶的起始日期"""
+    if granularity == Granularity.WEEK:
+        return start + timedelta(weeks=1)
+    if granularity == Granularity.MONTH:
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    if granularity == Granularity.YEAR:
+        return date(start.year + 1, 1, 1)
+    return start + timedelta(days=1)
+
+
+def previous_buckets(end: date, granularity: Granularity, count: int) -> date:
+    """包含 end 在内、向前 count 个桶的起始日期"""
+    start = bucket_start(end, granularity)
+    for _ in range(count - 1):
+        start = bucket_start(start - timedelta(days=1), granularity)
+    return start
+
+
+def bucket_range(start: date, end: date, granularity: Granularity) -> List[date]:
+    """覆盖 [start, end] 的所有桶起始日期"""
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def count_buckets(start: date, end: date, granularity: Granularity) -> int:
+    """[start, end] 覆盖的桶数（不逐个生成，用于参数校验）"""
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == Granularity.DAY:
+        return (last - first).days + 1
+    if granularity == Granularity.WEEK:
+        return (last - first).days // 7 + 1
+    if granularity == Granularity.MONTH:
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return last.year - first.year + 1
+
+
+def fill_buckets(
+    daily_counts: Iterable[Tuple[date, int]],
+    start: date,
+    end: date,
+    granularity: Granularity
+) -> List[Dict]:
+    """将日计数归并到各桶，无数据的桶计为0"""
+    totals = {bucket: 0 for bucket in bucket_range(start, end, granularity)}
+    for day, count in daily_counts:
+        totals[bucket_start(day, granularity)] += count
+    return [{"bucket": bucket.isoformat(), "count": count} for bucket, count in totals.items()]
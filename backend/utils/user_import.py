@@ -0,0 +1,172 @@
+"""
+用户名单批量导入
+Bulk user provisioning from a CSV or Excel roster
+
+名单第一行为表头（列顺序不限）：用户名、姓名、初始密码为必需列，
+角色、电子邮箱、手机、所属单位、专家类别可选。
+
+- 用户名、邮箱是否已被使用以一次查询判断，名单内的重复也逐行报告
+- 所属单位按名称一次查询解析
+- 密码哈希交给批量哈希工作池（utils.password_pool.bulk_password_pool）并行计算
+- 合格的行以一条 executemany 插入并一次提交
+
+不合格的行不导入，按行号返回错误原因。
+"""
+import csv
+from typing import Any, Dict, List, Optional, Tuple
+from zipfile import BadZipFile
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import UserRole
+from schemas import UserCreate
+from crud.organization import get_organizations_by_names
+from crud.user import bulk_create_users, get_password_hash, get_taken_usernames_and_emails
+from utils.excel_utils import iter_csv_rows, iter_sheet_rows
+from utils.password_pool import bulk_password_pool
+
+USER_IMPORT_HEADERS = ["用户名", "姓名", "初始密码", "角色", "电子邮箱", "手机", "所属单位", "专家类别"]
+REQUIRED_HEADERS = ["用户名", "姓名", "初始密码"]
+
+# 名单列与用户字段的对应关系（角色、所属单位单独解析）
+USER_IMPORT_FIELDS = {
+    "用户名": "username",
+    "姓名": "real_name",
+    "初始密码": "password",
+    "电子邮箱": "email",
+    "手机": "mobile",
+    "专家类别": "expert_categories"
+}
+FIELD_HEADERS = {field: header for header, field in USER_IMPORT_FIELDS.items()}
+
+# 角色列可填写中文名称或角色代码，为空时为申报单位
+ROLE_LABELS = {
+    "管理员": UserRole.ADMIN,
+    "工作人员": UserRole.STAFF,
+    "推荐单位": UserRole.RECOMMENDER,
+    "申报单位": UserRole.APPLICANT,
+    "申报人": UserRole.APPLICANT,
+    "专家": UserRole.EXPERT,
+    "评委": UserRole.COMMITTEE,
+    "评审委员会": UserRole.COMMITTEE
+}
+
+# 单次导入的行数上限（bcrypt 哈希耗时随行数线性增长）
+MAX_IMPORT_ROWS = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_roster(path: str, filename: str) -> List[Tuple[int, Dict[str, Optional[str]]]]:
+    """读取名单文件（.csv 或 .xlsx） Returns: [(行号, {表头: 文本})]"""
+    reader = iter_csv_rows if filename.lower().endswith(".csv") else iter_sheet_rows
+    try:
+        return list(reader(path, USER_IMPORT_HEADERS, REQUIRED_HEADERS))
+    except (BadZipFile, InvalidFileException, KeyError, OSError, csv.Error):
+        raise HTTPException(status_code=400, detail="无法读取名单文件，请上传 .xlsx 或 .csv 格式的文件")
+
+
+def parse_role(value: Optional[str]) -> UserRole:
+    """角色列转为 UserRole"""
+    if not value:
+        return UserRole.APPLICANT
+    if value in ROLE_LABELS:
+        return ROLE_LABELS[value]
+    return UserRole(value.lower())
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    """校验错误转为以名单列名标注的说明"""
+    messages = []
+    for error in exc.errors():
+        field = error["loc"][0] if error["loc"] else ""
+        messages.append(f"{FIELD_HEADERS.get(field, field)}: {error['msg']}")
+    return messages
+
+
+async def import_users(db: AsyncSession, path: str, filename: str, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    导入用户名单，dry_run 时只校验不写入
+    Returns: 导入结果及逐行错误报告
+    """
+    rows = await run_in_threadpool(read_roster, path, filename)
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=400, detail=f"单次最多导入 {MAX_IMPORT_ROWS} 个用户，请拆分名单")
+    
+    unit_names = {values["所属单位"] for _, values in rows if values["所属单位"]}
+    organizations = await get_organizations_by_names(db, unit_names) if unit_names else {}
+    taken_usernames, taken_emails = await get_taken_usernames_and_emails(
+        db,
+        {values["用户名"] for _, values in rows if values["用户名"]},
+        {values["电子邮箱"] for _, values in rows if values["电子邮箱"]}
+    )
+    
+    users: List[UserCreate] = []
+    errors: List[Dict[str, Any]] = []
+    failed = 0
+    seen_usernames, seen_emails = set(), set()
+    for row_number, values in rows:
+        row_errors = []
+        try:
+            role = parse_role(values["角色"])
+        except ValueError:
+            role = UserRole.APPLICANT
+            row_errors.append(f"角色: 无法识别（{values['角色']}）")
+        
+        unit_name = values["所属单位"]
+        organization_id = None
+        if unit_name:
+            if unit_name in organizations:
+                organization_id = organizations[unit_name][0]
+            else:
+                row_errors.append(f"所属单位: 单位不存在（{unit_name}）")
+        
+        user = None
+        try:
+            user = UserCreate(
+                role=role,
+                organization_id=organization_id,
+                **{field: values[header] for header, field in USER_IMPORT_FIELDS.items()}
+            )
+        except ValidationError as exc:
+            row_errors.extend(_validation_messages(exc))
+        
+        # 数据库默认排序规则下用户名、邮箱比较不区分大小写
+        username = (values["用户名"] or "").lower()
+        email = (values["电子邮箱"] or "").lower()
+        if username and username in taken_usernames:
+            row_errors.append("用户名: 已存在")
+        elif username and username in seen_usernames:
+            row_errors.append("用户名: 与名单中前面的行重复")
+        if email and email in taken_emails:
+            row_errors.append("电子邮箱: 已被使用")
+        elif email and email in seen_emails:
+            row_errors.append("电子邮箱: 与名单中前面的行重复")
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        
+        if row_errors:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "errors": row_errors})
+        else:
+            users.append(user)
+    
+    if not dry_run and users:
+        password_hashes = await bulk_password_pool.map(get_password_hash, [user.password for user in users])
+        try:
+            await bulk_create_users(db, users, password_hashes)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="导入过程中有用户名或邮箱被占用，请重新导入")
+    return {
+        "total_rows": len(rows),
+        "imported": len(users),
+        "failed": failed,
+        "dry_run": dry_run,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }